@@ -0,0 +1,278 @@
+"""
+Precomputed dashboard aggregates and data artifacts.
+
+The dashboard opens on an overview of the articles in General Business journals that
+only needs counts, so those counts are computed here once per pipeline run and
+written as small JSON files that the dashboard renders its first view from. The
+per-article data it needs for filters and the other tabs is a slim compressed article
+index instead of the full CSV: one columnar record per article (no abstracts), per
+person, and per (person, article) authorship, from which it rebuilds its rows, loaded
+only when it is first needed. Abstracts are written to a separate compressed file
+that is only fetched when a user opens an article. Everything is written under the
+dashboard's public/ directory, so it is served next to the app.
+
+Counts follow the dashboard's own rules: articles are counted once per article_uuid
+(the first author row wins, which decides the article's department and the faculty
+member it is counted for), an article is in a top journal when it is ranked by UT
+Dallas or the Financial Times, and goals are counted from top 1-3 of sustainable
+articles.
+
+Usage:
+    python aggregates.py
+"""
+
+import gzip
+import json
+import os
+
+import pandas as pd
+
+import metrics
+import storage
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+# Served by the dashboard as /aggregates/...
+AGGREGATES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "public", "aggregates"
+)
+ARTICLE_INDEX_FILE = "article_index.json"
+ABSTRACTS_FILE = "abstracts.json"
+GOAL_COLUMNS = ["top 1", "top 2", "top 3"]
+RANKING_FLAGS = {
+    "financial_times": "Financial Times",
+    "ut_dallas": "UT Dallas",
+    "general_business": "General Business",
+}
+# The dashboard opens filtered to articles in General Business journals
+DEFAULT_VIEW = "General Business"
+# Everything the aggregates and the article index read (abstracts are left out)
+AGGREGATE_COLUMNS = [
+    "person_uuid",
+    "name",
+    "email",
+    "department",
+    "active",
+    "article_uuid",
+    "title",
+    "publication_year",
+    "doi",
+    "journal_title",
+    "journal_issn",
+    "is_sustain",
+    *GOAL_COLUMNS,
+    *RANKING_FLAGS.values(),
+]
+
+
+def write_json(obj, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(obj, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def prepare_articles(research_df):
+    """
+    One row per article with integer flags: sustainable, top_journal and one column
+    per ranking flag. Missing values count as 0, as in the dashboard.
+    """
+    articles = research_df.drop_duplicates(subset="article_uuid", keep="first").copy()
+    for column in ["is_sustain", *GOAL_COLUMNS, *RANKING_FLAGS.values()]:
+        if column not in articles.columns:
+            articles[column] = 0
+        articles[column] = (
+            pd.to_numeric(articles[column], errors="coerce").fillna(0).astype(int)
+        )
+    articles["sustainable"] = (articles["is_sustain"] == 1).astype(int)
+    articles["top_journal"] = (
+        (articles["UT Dallas"] == 1) | (articles["Financial Times"] == 1)
+    ).astype(int)
+    articles["year"] = articles["publication_year"].astype("string").fillna("")
+    articles["department"] = articles["department"].astype("string").fillna("")
+    return articles
+
+
+def goal_counts(articles):
+    """
+    {goal: number of sustainable articles listing it in top 1-3}, keyed by string.
+    """
+    sustainable = articles[articles["sustainable"] == 1]
+    goals = sustainable[GOAL_COLUMNS].to_numpy().ravel()
+    counts = pd.Series(goals[goals > 0]).value_counts().sort_index()
+    return {str(goal): int(count) for goal, count in counts.items()}
+
+
+def year_counts(articles):
+    """
+    Per publication year: article, sustainable and top-journal counts.
+    """
+    years = {}
+    for year, group in articles[articles["year"] != ""].groupby("year", sort=True):
+        years[str(year)] = {
+            "articles": int(len(group)),
+            "sustainable": int(group["sustainable"].sum()),
+            "top_journal": int(group["top_journal"].sum()),
+        }
+    return years
+
+
+def summary_counts(articles):
+    """
+    The overview's headline counts. Faculty are the authors the articles are counted
+    for, and engaging faculty those of them with a sustainable article.
+    """
+    return {
+        "articles": int(len(articles)),
+        "sustainable": int(articles["sustainable"].sum()),
+        "top_journal": int(articles["top_journal"].sum()),
+        "top_journal_sustainable": int(
+            (articles["top_journal"] & articles["sustainable"]).sum()
+        ),
+        "faculty": int(articles["person_uuid"].nunique()),
+        "engaging_faculty": int(
+            articles.loc[articles["sustainable"] == 1, "person_uuid"].nunique()
+        ),
+        "departments": int(
+            articles.loc[articles["department"] != "", "department"].nunique()
+        ),
+    }
+
+
+def filter_options(research_df):
+    """
+    The departments and years the dashboard's filters offer, over all author rows.
+    """
+    options = {}
+    for key, column in [("departments", "department"), ("years", "publication_year")]:
+        values = research_df[column].dropna().astype(str).str.strip()
+        options[key] = sorted(set(values[values != ""]))
+    return options
+
+
+def string_list(values):
+    return values.astype("string").fillna("").tolist()
+
+
+def article_index(research_df, articles):
+    """
+    Slim index for the dashboard, without abstracts: columnar "articles" and
+    "persons" tables, and "authorships" as pairs of row numbers into them (one per
+    author row of the research outputs).
+    """
+    persons = research_df.drop_duplicates(subset="person_uuid", keep="first")
+    authorships = research_df[["person_uuid", "article_uuid"]].dropna()
+    index = {
+        "articles": {
+            "article_uuid": articles["article_uuid"].tolist(),
+            "title": string_list(articles["title"]),
+            "year": articles["year"].tolist(),
+            "doi": string_list(articles["doi"]),
+            "journal_title": string_list(articles["journal_title"]),
+            "journal_issn": string_list(articles["journal_issn"]),
+            "is_sustain": articles["is_sustain"].tolist(),
+            "goals": articles[GOAL_COLUMNS].to_numpy().tolist(),
+            **{
+                flag: articles[column].tolist()
+                for flag, column in RANKING_FLAGS.items()
+            },
+        },
+        "persons": {
+            "person_uuid": persons["person_uuid"].tolist(),
+            "name": string_list(persons["name"]),
+            "email": string_list(persons["email"]),
+            "department": string_list(persons["department"]),
+            "active": string_list(persons["active"]),
+        },
+        "authorships": {
+            "article": pd.Index(articles["article_uuid"])
+            .get_indexer(authorships["article_uuid"])
+            .tolist(),
+            "person": pd.Index(persons["person_uuid"])
+            .get_indexer(authorships["person_uuid"])
+            .tolist(),
+        },
+    }
+    return index
+
+
+def article_abstracts(research_df):
+    """
+    {article_uuid: abstract} for the articles that have one.
+    """
+    abstracts = research_df.drop_duplicates(subset="article_uuid")[
+        ["article_uuid", "abstract"]
+    ].dropna()
+    abstracts = abstracts[~abstracts["abstract"].isin(["", "N/A"])]
+    return dict(zip(abstracts["article_uuid"], abstracts["abstract"]))
+
+
+def write_compressed(obj, path):
+    """
+    Writes `obj` as compact JSON compressed with gzip, and also with brotli when the
+    brotli package is installed. Returns the written paths.
+    """
+    payload = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    written = []
+    outputs = [(path + ".gz", lambda data: gzip.compress(data, compresslevel=9))]
+    try:
+        import brotli
+
+        outputs.append((path + ".br", lambda data: brotli.compress(data, quality=11)))
+    except ImportError:
+        pass
+    for output_path, compress in outputs:
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compress(payload))
+        os.replace(tmp_path, output_path)
+        written.append(output_path)
+    return written
+
+
+@metrics.timed
+def write_aggregates(research_df=None, output_dir=AGGREGATES_DIR):
+    """
+    Computes the aggregates of the dashboard's first view from `research_df` (by
+    default the research outputs store, read without abstracts) and writes them, with
+    the article index and the abstracts, to `output_dir`.
+    """
+    if research_df is None:
+        research_df = storage.read_research_outputs(columns=AGGREGATE_COLUMNS)
+        abstracts_df = storage.read_research_outputs(
+            columns=["article_uuid", "abstract"]
+        )
+    else:
+        abstracts_df = research_df
+    os.makedirs(output_dir, exist_ok=True)
+    articles = prepare_articles(research_df)
+    view = articles[articles[DEFAULT_VIEW] == 1]
+
+    outputs = {
+        "summary.json": {
+            **summary_counts(view),
+            "filters": filter_options(research_df),
+        },
+        "by_sdg.json": goal_counts(view),
+        "by_year.json": year_counts(view),
+    }
+    for filename, obj in outputs.items():
+        write_json(obj, os.path.join(output_dir, filename))
+    written = write_compressed(
+        article_index(research_df, articles),
+        os.path.join(output_dir, ARTICLE_INDEX_FILE),
+    )
+    written += write_compressed(
+        article_abstracts(abstracts_df), os.path.join(output_dir, ABSTRACTS_FILE)
+    )
+
+    sizes = ", ".join(
+        f"{os.path.basename(path)} {os.path.getsize(path) / 1024:.1f} KB"
+        for path in [os.path.join(output_dir, f) for f in outputs] + written
+    )
+    print(f"Dashboard aggregates saved to '{output_dir}': {sizes}")
+
+
+if __name__ == "__main__":
+    write_aggregates()
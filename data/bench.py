@@ -0,0 +1,110 @@
+"""
+Runs the offline benchmark suite and writes one results table.
+
+Every benchmark runs against local stand-ins only: the stub Experts API server
+(stub_experts_server.py), the fake chat model and embeddings and the synthetic
+datasets (fakes.py), so results are comparable between machines and commits. Each
+benchmark runs in its own scratch directory, so no caches or stores in the working
+tree are read or written.
+
+Usage:
+    python bench.py --scale small
+    python bench.py --scale medium --only fetch sdg --output before.csv
+"""
+
+import argparse
+import importlib
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+RESULTS_FILE = "bench_results.csv"
+# Keyword arguments of each bench_<name>.run() per scale
+SCALES = {
+    "small": {
+        "fetch": {"persons": 50, "latency": 0.01},
+        "extract": {"persons": 200},
+        "stream": {"persons": 200},
+        "parse": {"rows": 200, "repeat": 3},
+        "propagation": {"sizes": (10000,), "legacy_max": 10000},
+        "classify": {"articles": 20, "latency": 0.05, "pause": 0.05},
+        "sdg": {"articles": 20, "latency": 0.05},
+        "rankings": {"rows": 10000, "journals": 500},
+        "startup": {"repeat": 1},
+    },
+    "medium": {
+        "fetch": {"persons": 200, "latency": 0.05},
+        "extract": {"persons": 2000},
+        "stream": {"persons": 2000},
+        "parse": {"rows": 999, "repeat": 5},
+        "propagation": {"sizes": (100000,), "legacy_max": 100000},
+        "classify": {"articles": 100, "latency": 0.2, "pause": 0.2},
+        "sdg": {"articles": 100, "latency": 0.2},
+        "rankings": {"rows": 100000, "journals": 2000},
+        "startup": {"repeat": 3},
+    },
+    "large": {
+        "fetch": {"persons": 1000, "latency": 0.05},
+        "extract": {"persons": 10000},
+        "stream": {"persons": 10000},
+        "parse": {"rows": 5000, "repeat": 5},
+        "propagation": {"sizes": (1000000,), "legacy_max": 100000},
+        "classify": {"articles": 500, "latency": 0.5, "pause": 1.0},
+        "sdg": {"articles": 500, "latency": 0.5},
+        "rankings": {"rows": 1000000, "journals": 5000},
+        "startup": {"repeat": 5},
+    },
+}
+BENCHMARKS = list(SCALES["small"])
+
+
+def run_benchmark(name, kwargs):
+    """
+    Imports bench_<name> and runs it in a scratch directory. Returns its rows.
+    """
+    module = importlib.import_module(f"bench_{name}")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as scratch:
+        os.chdir(scratch)
+        try:
+            return module.run(**kwargs)
+        finally:
+            os.chdir(cwd)
+
+
+def run(scale="small", only=None):
+    rows = []
+    for name in only or BENCHMARKS:
+        print(f"Running {name} ({scale})...")
+        start = time.perf_counter()
+        try:
+            result = run_benchmark(name, SCALES[scale][name])
+        except Exception as e:
+            print(f"Benchmark {name} failed: {e}")
+            result = [{"benchmark": name, "variant": "failed", "error": str(e)}]
+        print(f"{name} finished in {time.perf_counter() - start:.1f}s")
+        rows.extend(dict(row, scale=scale) for row in result)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS)
+    parser.add_argument("--output", default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    results = pd.DataFrame(run(args.scale, args.only))
+    leading = ["scale", "benchmark", "variant", "n", "seconds"]
+    results = results[
+        [c for c in leading if c in results.columns]
+        + [c for c in results.columns if c not in leading]
+    ]
+    print(results.to_string(index=False, na_rep=""))
+    results.to_csv(args.output, index=False)
+    print(f"Results saved to '{args.output}'.")
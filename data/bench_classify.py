@@ -0,0 +1,186 @@
+"""
+Compares the serial relevance loop with the concurrent engine in
+determine.classify_sdg_relevance and with the batched screening in
+determine.classify_sdg_relevance_batched, using a local mock LLM with a fixed
+latency. Prompt tokens are estimated from the prompts actually sent.
+
+Usage:
+    python bench_classify.py --articles 200 --latency 0.5 --batch-size 10
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "mock-key")
+
+import determine
+import llm_engine
+from fakes import make_articles
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+
+def make_mock_llm(latency):
+    """
+    Returns a runnable that stands in for ChatOpenAI: it waits `latency` seconds
+    and answers with a deterministic relevance JSON.
+    """
+
+    def respond(prompt_value):
+        text = prompt_value.to_string()
+        return AIMessage(content='{"result": %d}' % (len(text) % 2))
+
+    def invoke(prompt_value):
+        time.sleep(latency)
+        return respond(prompt_value)
+
+    async def ainvoke(prompt_value):
+        await asyncio.sleep(latency)
+        return respond(prompt_value)
+
+    return RunnableLambda(invoke, afunc=ainvoke)
+
+
+def make_batch_mock_llm(latency, drop_every=7):
+    """
+    Returns a runnable that answers batched relevance prompts with a JSON array.
+    Every `drop_every`-th article of a response is left out, so the repair path
+    (re-querying missing items) is exercised.
+    """
+    counter = {"items": 0}
+
+    def respond(prompt_value):
+        text = prompt_value.to_string()
+        items = []
+        for article_id in re.findall(r"article_uuid: (\S+)", text):
+            counter["items"] += 1
+            if drop_every and counter["items"] % drop_every == 0:
+                continue
+            items.append('{"article_uuid": "%s", "result": %d}' % (article_id, 1))
+        return AIMessage(content="[" + ", ".join(items) + "]")
+
+    def invoke(prompt_value):
+        time.sleep(latency)
+        return respond(prompt_value)
+
+    async def ainvoke(prompt_value):
+        await asyncio.sleep(latency)
+        return respond(prompt_value)
+
+    return RunnableLambda(invoke, afunc=ainvoke)
+
+
+def count_prompt_tokens(chain, prompts):
+    """
+    Wraps `chain` so the estimated tokens of every prompt it receives are added up in
+    `prompts["tokens"]`.
+    """
+
+    async def ainvoke(inputs):
+        prompts["tokens"] += llm_engine.estimate_tokens(inputs["question"])
+        return await chain.ainvoke(inputs)
+
+    return RunnableLambda(chain.invoke, afunc=ainvoke)
+
+
+def classify_serial(df, mock_chain, pause):
+    """
+    The previous implementation: one blocking invoke per row after a fixed pause.
+    """
+    results = []
+    for _, row in df.iterrows():
+        research_string = f"title: {row['title']}\nabstract: {row['abstract']}"
+        question = determine.sustain_question.format(string=research_string)
+        time.sleep(pause)
+        output = mock_chain.invoke({"question": question})
+        results.append(determine.parse_relevance_output(output))
+    df["is_sustain"] = results
+    return df
+
+
+def run(articles=100, latency=0.5, pause=1.0, concurrency=16, batch_size=10):
+    mock_chain = determine.prompt_template | make_mock_llm(latency) | determine.parser
+    engine_prompts = {"tokens": 0}
+    batch_prompts = {"tokens": 0}
+
+    start = time.perf_counter()
+    serial_df = classify_serial(make_articles(articles), mock_chain, pause)
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine_df = determine.classify_sdg_relevance(
+        make_articles(articles),
+        concurrency=concurrency,
+        sustain_chain=count_prompt_tokens(mock_chain, engine_prompts),
+        use_cache=False,
+    )
+    engine_time = time.perf_counter() - start
+
+    batch_chain = (
+        determine.batch_prompt_template
+        | make_batch_mock_llm(latency)
+        | determine.parser
+    )
+    start = time.perf_counter()
+    batched_df = determine.classify_sdg_relevance_batched(
+        make_articles(articles),
+        batch_size=batch_size,
+        concurrency=concurrency,
+        batch_chain=count_prompt_tokens(batch_chain, batch_prompts),
+        use_cache=False,
+    )
+    batched_time = time.perf_counter() - start
+    assert batched_df["is_sustain"].tolist() == [1] * articles
+
+    assert serial_df["is_sustain"].tolist() == engine_df["is_sustain"].tolist()
+    return [
+        {
+            "benchmark": "classify",
+            "variant": "serial",
+            "n": articles,
+            "seconds": serial_time,
+        },
+        {
+            "benchmark": "classify",
+            "variant": "async",
+            "n": articles,
+            "seconds": engine_time,
+            "prompt_tokens": engine_prompts["tokens"],
+        },
+        {
+            "benchmark": "classify",
+            "variant": f"batched x{batch_size}",
+            "n": articles,
+            "seconds": batched_time,
+            "prompt_tokens": batch_prompts["tokens"],
+        },
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--pause", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = run(
+        args.articles, args.latency, args.pause, args.concurrency, args.batch_size
+    )
+    serial, engine, batched = rows
+    print(f"Serial loop:    {serial['seconds']:.2f}s")
+    print(
+        f"Async engine:   {engine['seconds']:.2f}s, {engine['prompt_tokens']} prompt tokens"
+    )
+    print(
+        f"Batched screen: {batched['seconds']:.2f}s, {batched['prompt_tokens']} prompt tokens"
+    )
+    print(f"Speedup:        {serial['seconds'] / engine['seconds']:.1f}x (async)")
+    print(
+        f"Token saving:   {1 - batched['prompt_tokens'] / engine['prompt_tokens']:.0%} (batched)"
+    )
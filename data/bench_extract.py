@@ -0,0 +1,198 @@
+"""
+Compares the previous per-item dict walking and row-wise title/subtitle join with the
+compiled field-path extractor and vectorized join, on a synthetic Pure API payload
+of research outputs and persons. Reports throughput in records per second.
+
+Usage:
+    python bench_extract.py --persons 2000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+import data
+from stub_experts_server import outputs_for_person
+
+
+def legacy_process_research_outputs(outputs, person_uuid):
+    """
+    The previous extraction: a chain of .get() calls per field, per item.
+    """
+    processed = []
+    for item in outputs:
+        journal_association = item.get("journalAssociation", {})
+        journal_title = journal_association.get("title", {}).get("value", "N/A")
+        journal_issn = journal_association.get("issn", {}).get("value", "N/A")
+        processed.append(
+            {
+                "person_uuid": person_uuid,
+                "article_uuid": item.get("uuid", ""),
+                "title": item.get("title", {}).get("value", "No Title"),
+                "subtitle": item.get("subTitle", {}).get("value", "N/A"),
+                "publication_year": (
+                    item.get("publicationStatuses", [{}])[0]
+                    .get("publicationDate", {})
+                    .get("year", "N/A")
+                ),
+                "doi": next(
+                    (
+                        ev.get("doi")
+                        for ev in item.get("electronicVersions", [])
+                        if ev.get("doi")
+                    ),
+                    "No DOI",
+                ),
+                "abstract": item.get("abstract", {})
+                .get("text", [{}])[0]
+                .get("value", "N/A"),
+                "journal_title": journal_title,
+                "journal_issn": journal_issn,
+            }
+        )
+    return processed
+
+
+def legacy_articles(payload):
+    records = []
+    for person_uuid, outputs in payload:
+        records.extend(legacy_process_research_outputs(outputs, person_uuid))
+    df = pd.DataFrame(records)
+    df["title"] = df.apply(
+        lambda row: (
+            f"{row['title']}: {row['subtitle']}"
+            if row["subtitle"] != "N/A" and row["subtitle"].strip() != ""
+            else row["title"]
+        ),
+        axis=1,
+        result_type="reduce",
+    )
+    return df.drop(columns=["subtitle"])
+
+
+def compiled_articles(payload):
+    person_ids = []
+    items = []
+    for person_uuid, outputs in payload:
+        person_ids.extend([person_uuid] * len(outputs))
+        items.extend(outputs)
+    df = pd.DataFrame({"person_uuid": person_ids, **data.extract_articles(items)})
+    df["title"] = data.combine_title_subtitle(df["title"], df["subtitle"])
+    return df.drop(columns=["subtitle"])
+
+
+def make_person_items(n):
+    return [
+        {
+            "uuid": f"person-{i}",
+            "externalId": f"user{i}@illinois.edu",
+            "name": {"firstName": f"First{i}", "lastName": f"Last{i % 500}"},
+            "staffOrganisationAssociations": [
+                {"organisationalUnit": {"name": {"text": [{"value": "Finance"}]}}},
+                {"organisationalUnit": {"name": {"text": [{"value": "Accountancy"}]}}},
+            ][: 1 + i % 2],
+            "profileInformations": (
+                [{"value": {"text": [{"value": f"<p>Interest {i}</p>"}]}}]
+                if i % 3
+                else []
+            ),
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_persons(items):
+    rows = []
+    for item in items:
+        profile_info = item.get("profileInformations", [])
+        rows.append(
+            {
+                "uuid": item.get("uuid", "N/A"),
+                "email": item.get("externalId", "N/A"),
+                "name": f"{item.get('name', {}).get('firstName', '')} {item.get('name', {}).get('lastName', '')}".strip(),
+                "organization": data.organisational_unit_names(item) or ["N/A"],
+                "about": (
+                    profile_info[0]
+                    .get("value", {})
+                    .get("text", [{}])[0]
+                    .get("value", "N/A")
+                    if profile_info
+                    else "N/A"
+                ),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def compiled_persons(items):
+    columns = data.extract_persons(items)
+    return pd.DataFrame(
+        {
+            "uuid": columns["uuid"],
+            "email": columns["email"],
+            "name": (
+                pd.Series(columns["first_name"], dtype=object).astype(str)
+                + " "
+                + pd.Series(columns["last_name"], dtype=object).astype(str)
+            ).str.strip(),
+            "organization": [units or ["N/A"] for units in columns["organization"]],
+            "about": columns["about"],
+        }
+    )
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(persons=2000):
+    payload = [
+        (f"person-{i}", outputs_for_person(f"person-{i}")) for i in range(persons)
+    ]
+    person_items = make_person_items(persons * 10)
+    rows = []
+    for name, legacy, compiled, inputs, count in (
+        (
+            "extract articles",
+            legacy_articles,
+            compiled_articles,
+            payload,
+            sum(len(outputs) for _, outputs in payload),
+        ),
+        (
+            "extract persons",
+            legacy_persons,
+            compiled_persons,
+            person_items,
+            len(person_items),
+        ),
+    ):
+        legacy_df, legacy_time = timed(legacy, inputs)
+        compiled_df, compiled_time = timed(compiled, inputs)
+        pd.testing.assert_frame_equal(legacy_df, compiled_df)
+        for variant, seconds in (("legacy", legacy_time), ("compiled", compiled_time)):
+            rows.append(
+                {
+                    "benchmark": name,
+                    "variant": variant,
+                    "n": count,
+                    "seconds": seconds,
+                    "records_per_second": count / seconds,
+                }
+            )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--persons", type=int, default=2000)
+    args = parser.parse_args()
+
+    for row in run(args.persons):
+        print(
+            f"{row['benchmark']:<17} {row['variant']:<9} {row['n']:>8} records "
+            f"{row['seconds']:7.3f}s {row['records_per_second']:>12,.0f} records/s"
+        )
@@ -0,0 +1,87 @@
+"""
+Compares the previous serial, unpooled research-output fetch loop with the pooled
+concurrent fetcher, against the local stub Experts API.
+
+Usage:
+    python bench_fetch.py --persons 100 --latency 0.05 --workers 8
+"""
+
+import argparse
+import time
+
+import requests
+
+import data
+import experts_client
+from stub_experts_server import start_stub_server
+
+
+def fetch_serial(base_url, person_ids):
+    """
+    The previous loop: a fresh connection per request and one person at a time.
+    """
+    all_outputs = []
+    for person_uuid in person_ids:
+        url = f"{base_url}/persons/{person_uuid}/research-outputs"
+        params = {"apiKey": "", "size": 1000, "offset": 0}
+        while True:
+            response = requests.get(url, params=params)
+            if response.status_code != 200:
+                break
+            items = response.json().get("items", [])
+            all_outputs.extend(data.process_research_outputs(items, person_uuid))
+            if len(items) < params["size"]:
+                break
+            params["offset"] += params["size"]
+    return all_outputs
+
+
+def run(persons=100, latency=0.05, workers=8, throttle_every=0):
+    server, base_url = start_stub_server(latency=latency, throttle_every=throttle_every)
+    person_ids = [f"person-{i}" for i in range(persons)]
+    try:
+        start = time.perf_counter()
+        serial = fetch_serial(base_url, person_ids)
+        serial_time = time.perf_counter() - start
+
+        client = experts_client.ExpertsClient(base_url=base_url, backoff=0.01)
+        start = time.perf_counter()
+        pooled = data.fetch_research_outputs_for_persons(
+            person_ids, client=client, max_workers=workers
+        )
+        pooled_time = time.perf_counter() - start
+        stats = client.latency_stats()
+        client.close()
+    finally:
+        server.shutdown()
+
+    if not throttle_every:
+        assert serial == pooled
+    return [
+        {
+            "benchmark": "fetch",
+            "variant": "serial",
+            "n": persons,
+            "seconds": serial_time,
+        },
+        {
+            "benchmark": "fetch",
+            "variant": f"pooled x{workers}",
+            "n": persons,
+            "seconds": pooled_time,
+            "p95_latency": stats.get("p95"),
+            "retries": stats["retries"],
+        },
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--persons", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    args = parser.parse_args()
+
+    for row in run(args.persons, args.latency, args.workers, args.throttle_every):
+        print(row)
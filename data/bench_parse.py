@@ -0,0 +1,169 @@
+"""
+Compares the previous whole-page BeautifulSoup parse of the faculty listing with
+faculty_parser on each available backend, on synthetic listing pages of increasing
+size. Every backend must return the same columns as the previous parser.
+
+Usage:
+    python bench_parse.py --rows 999 --repeat 5
+"""
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+import faculty_parser
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><title>Faculty Profiles</title>{scripts}</head>
+<body>
+<nav>{nav}</nav>
+<select id="pagination-top"><option value="999" selected>All</option></select>
+<select id="display-type"><option value="list" selected>List</option></select>
+<table class="results">
+<tbody>
+<tr><th>Name</th><th>Department</th><th>Phone</th><th>Email</th></tr>
+{rows}
+</tbody>
+</table>
+<footer>{footer}</footer>
+</body>
+</html>
+"""
+
+DEPARTMENTS = ["Finance", "Accountancy", "Business Administration"]
+
+
+def make_row(i):
+    if i % 50 == 7:
+        # Layout row spanning the table
+        return '<tr><td colspan="4">Emeriti are listed separately.</td></tr>'
+    link = (
+        f'<a href="/profile/person-{i}">Person {i} &amp; Co</a>'
+        if i % 40
+        else f"Person {i}"
+    )
+    title = "" if i % 9 == 0 else f"<br>Professor of {DEPARTMENTS[i % 3]}"
+    contact = (
+        f'<a href="mailto:user{i}@illinois.edu"> user{i}@illinois.edu </a>'
+        if i % 25
+        else "Not listed"
+    )
+    return (
+        f"<tr>\n<td>{link}{title}</td>\n<td> {DEPARTMENTS[i % 3]} </td>\n"
+        f"<td>217-333-{i:04d}</td>\n<td>{contact}</td>\n</tr>"
+    )
+
+
+def make_page(rows):
+    return PAGE_TEMPLATE.format(
+        scripts="".join(f"<script>var x{i} = {i};</script>" for i in range(200)),
+        nav="".join(f'<a href="/section/{i}">Section {i}</a>' for i in range(500)),
+        rows="\n".join(make_row(i) for i in range(rows)),
+        footer="".join(f"<p>Footer paragraph {i}</p>" for i in range(300)),
+    )
+
+
+def legacy_parse_faculty_table(html):
+    """
+    The previous parser: html.parser over the whole page, repeated find() per cell
+    and a list of dicts.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_="results")
+    data_list = []
+
+    if table:
+        tbody = table.find("tbody")
+        if tbody:
+            rows = tbody.find_all("tr")
+            if rows and rows[0].find_all("th"):
+                rows = rows[1:]
+            for row in rows:
+                cols = row.find_all("td")
+                if len(cols) < 4:
+                    continue
+                name_department = cols[0].get_text(separator="|").split("|")
+                name = name_department[0].strip()
+                description = (
+                    name_department[1].strip()
+                    if len(name_department) > 1
+                    else "Description not found"
+                )
+                department = cols[1].get_text(strip=True)
+                contact = (
+                    cols[3].find("a").get_text(strip=True)
+                    if cols[3].find("a")
+                    else "Contact not found"
+                )
+                url_link = (
+                    cols[0].find("a")["href"] if cols[0].find("a") else "URL not found"
+                )
+
+                data_list.append(
+                    {
+                        "name": name,
+                        "department": department,
+                        "description": description,
+                        "contact": contact,
+                        "url": url_link,
+                    }
+                )
+    return data_list
+
+
+def to_columns(records):
+    return {
+        column: [record[column] for record in records]
+        for column in faculty_parser.FACULTY_COLUMNS
+    }
+
+
+def timed(func, *args, repeat=1):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def run(rows=999, repeat=5, sizes=None):
+    results = []
+    for n in sizes or [rows, rows * 4]:
+        page = make_page(n)
+        expected, legacy_time = timed(legacy_parse_faculty_table, page, repeat=repeat)
+        expected = to_columns(expected)
+        variants = [("legacy bs4", legacy_time)]
+        for backend in faculty_parser.available_backends():
+            columns, seconds = timed(
+                faculty_parser.parse_faculty_table, page, backend, repeat=repeat
+            )
+            assert columns == expected, backend
+            variants.append((backend, seconds))
+        for variant, seconds in variants:
+            results.append(
+                {
+                    "benchmark": "parse faculty listing",
+                    "variant": variant,
+                    "n": n,
+                    "seconds": seconds,
+                    "page_kb": len(page) / 1024,
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=999)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for row in run(args.rows, args.repeat):
+        print(
+            f"{row['variant']:<11} {row['n']:>6} rows ({row['page_kb']:6.0f} KB) "
+            f"{row['seconds'] * 1000:8.1f} ms"
+        )
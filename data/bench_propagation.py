@@ -0,0 +1,123 @@
+"""
+Benchmarks SDG propagation in main.update_sdg_classifications against the previous
+row-by-row implementation on synthetic author-article data, and checks that both
+produce identical frames.
+
+Usage:
+    python bench_propagation.py --sizes 10000 100000 1000000 --legacy-max 100000
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("OPENAI_API_KEY", "mock-key")
+
+import main
+from fakes import make_research_rows
+
+
+def make_classified(df, seed=1):
+    """
+    Results for the articles still unclassified after propagation, as returned by
+    the determine stage (one row per article).
+    """
+    rng = np.random.default_rng(seed)
+    articles = df[df["is_sustain"].isna()].drop_duplicates("article_uuid").copy()
+    articles["is_sustain"] = rng.integers(0, 2, len(articles))
+    for column in ["top 1", "top 2", "top 3"]:
+        articles[column] = rng.integers(0, 18, len(articles))
+    return articles
+
+
+def legacy_propagate(existing_sdg_df):
+    for article_id, group in existing_sdg_df.groupby("article_uuid"):
+        classified_rows = group[~group["is_sustain"].isna()]
+        if not classified_rows.empty:
+            sample_row = classified_rows.iloc[0]
+            is_sustain_value = sample_row["is_sustain"]
+            top1_value = sample_row.get("top 1", 0) if "top 1" in sample_row else 0
+            top2_value = sample_row.get("top 2", 0) if "top 2" in sample_row else 0
+            top3_value = sample_row.get("top 3", 0) if "top 3" in sample_row else 0
+            for idx in group.index:
+                if pd.isna(existing_sdg_df.loc[idx, "is_sustain"]):
+                    existing_sdg_df.loc[idx, "is_sustain"] = is_sustain_value
+                    if "top 1" in existing_sdg_df.columns:
+                        existing_sdg_df.loc[idx, "top 1"] = top1_value
+                        existing_sdg_df.loc[idx, "top 2"] = top2_value
+                        existing_sdg_df.loc[idx, "top 3"] = top3_value
+    return existing_sdg_df
+
+
+def legacy_apply(existing_sdg_df, articles_to_process):
+    classification_map = {}
+    for _, row in articles_to_process.iterrows():
+        classification_map[row["article_uuid"]] = {
+            "is_sustain": row["is_sustain"],
+            "top 1": row.get("top 1", 0),
+            "top 2": row.get("top 2", 0),
+            "top 3": row.get("top 3", 0),
+        }
+    for article_id, values in classification_map.items():
+        existing_sdg_df.loc[
+            existing_sdg_df["article_uuid"] == article_id,
+            ["is_sustain", "top 1", "top 2", "top 3"],
+        ] = [
+            values["is_sustain"],
+            values["top 1"],
+            values["top 2"],
+            values["top 3"],
+        ]
+    return existing_sdg_df
+
+
+def time_stage(propagate, apply, df):
+    start = time.perf_counter()
+    df = propagate(df)
+    classified = make_classified(df)
+    df = apply(df, classified)
+    return df, time.perf_counter() - start
+
+
+def run(sizes=(10000, 100000, 1000000), legacy_max=100000):
+    rows = []
+    for n in sizes:
+        base = make_research_rows(n)
+        new_df, new_time = time_stage(
+            main.propagate_classifications, main.apply_classifications, base.copy()
+        )
+        rows.append(
+            {
+                "benchmark": "propagation",
+                "variant": "vectorized",
+                "n": n,
+                "seconds": new_time,
+            }
+        )
+        if n <= legacy_max:
+            old_df, old_time = time_stage(legacy_propagate, legacy_apply, base.copy())
+            pd.testing.assert_frame_equal(old_df, new_df)
+            rows.append(
+                {
+                    "benchmark": "propagation",
+                    "variant": "legacy",
+                    "n": n,
+                    "seconds": old_time,
+                }
+            )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--legacy-max", type=int, default=100000)
+    args = parser.parse_args()
+
+    results = pd.DataFrame(run(args.sizes, args.legacy_max))
+    print(results.pivot(index="n", columns="variant", values="seconds").to_string())
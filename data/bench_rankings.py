@@ -0,0 +1,134 @@
+"""
+Benchmarks journal ranking matching (journal_match.match_journals) against the
+previous exact-lowercase matcher on synthetic research rows that cite a synthetic
+coded journals table. The new matcher runs with an empty fuzzy match cache and again
+with the cache written by the first run; every variant reports rows per second and
+the share of rows matched to a coded journal. A cold run must be no slower than the
+previous matcher.
+
+Usage:
+    python bench_rankings.py --rows 100000 --journals 2000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import fakes
+import journal_match
+
+
+def legacy_match(research_df, journals_df):
+    """
+    The matcher apply_journal_rankings used before journal_match: lowercased,
+    stripped titles looked up in a dict built with iterrows, and a mask scan per
+    matched journal. Returns the frame with the ranking columns and the number of
+    rows matched.
+    """
+    ranking_columns = journal_match.RANKING_COLUMNS
+    for column in ranking_columns:
+        research_df[column] = 0
+
+    def clean_journal_name(name):
+        if not isinstance(name, str):
+            return ""
+        return name.lower().strip()
+
+    research_df["Journal Name Clean"] = research_df["journal_title"].apply(
+        clean_journal_name
+    )
+    journals_df["Journal Clean"] = journals_df["journal_title"].apply(
+        clean_journal_name
+    )
+
+    journal_rankings = {}
+    for _, row in journals_df.iterrows():
+        journal_rankings[row["Journal Clean"]] = {
+            "Financial Times": row.get("Financial Times", 0),
+            "UT Dallas": row.get("UT Dallas", 0),
+            "General Business": row.get("General Business", 0),
+        }
+
+    matched_rows = 0
+    for journal_name in research_df["Journal Name Clean"].unique():
+        if journal_name in journal_rankings:
+            mask = research_df["Journal Name Clean"] == journal_name
+            matched_rows += int(mask.sum())
+            for ranking_type in ranking_columns:
+                research_df.loc[mask, ranking_type] = journal_rankings[journal_name][
+                    ranking_type
+                ]
+
+    research_df = research_df.drop(columns=["Journal Name Clean"])
+    return research_df, matched_rows
+
+
+def result_row(variant, rows, seconds, matched_rows, **extra):
+    return {
+        "benchmark": "rankings",
+        "variant": variant,
+        "n": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else float("nan"),
+        "match_rate": matched_rows / rows if rows else float("nan"),
+        **extra,
+    }
+
+
+def run(rows=100000, journals=2000):
+    research_df = fakes.make_journal_rows(rows, journals)
+    journals_df = fakes.make_journals(journals)
+    result = []
+
+    start = time.perf_counter()
+    legacy_df, matched_rows = legacy_match(research_df.copy(), journals_df.copy())
+    result.append(
+        result_row("legacy", rows, time.perf_counter() - start, matched_rows)
+    )
+    assert len(legacy_df) == rows
+
+    with tempfile.TemporaryDirectory(prefix="bench_rankings_") as scratch:
+        cache_path = os.path.join(scratch, journal_match.MATCH_CACHE_FILE)
+        for variant in ["cold cache", "warm cache"]:
+            start = time.perf_counter()
+            rankings, report = journal_match.match_journals(
+                research_df, journals_df, cache_path=cache_path
+            )
+            seconds = time.perf_counter() - start
+            methods = report["method"].value_counts()
+            matched_rows = int(report.loc[report["method"] != "none", "articles"].sum())
+            result.append(
+                result_row(
+                    variant,
+                    rows,
+                    seconds,
+                    matched_rows,
+                    distinct_journals=len(report),
+                    fuzzy_matches=int(methods.get("fuzzy", 0)),
+                    unmatched=int(methods.get("none", 0)),
+                )
+            )
+    assert len(rankings) == rows
+    legacy_seconds, cold_seconds = result[0]["seconds"], result[1]["seconds"]
+    assert cold_seconds <= legacy_seconds, (
+        f"cold fuzzy matching took {cold_seconds:.2f}s, "
+        f"the legacy matcher {legacy_seconds:.2f}s"
+    )
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--journals", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = pd.DataFrame(run(args.rows, args.journals))
+    print(
+        results[
+            ["variant", "n", "seconds", "rows_per_second", "match_rate"]
+        ].to_string(index=False)
+    )
@@ -0,0 +1,114 @@
+"""
+Times end-to-end SDG classification (determine.classify_articles) in every mode with
+the fake chat model and embeddings from fakes.py, so the real chains, prompts, SDG
+index, caches and embedding store all run, offline. Each mode starts from empty
+caches in a scratch directory; a second run of the last mode shows the warm cache.
+
+Usage:
+    python bench_sdg.py --articles 50 --latency 0.2
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "mock-key")
+
+import determine
+import fakes
+import llm_cache
+import metrics
+
+
+def token_count(kind):
+    counters = metrics.get_metrics().counters
+    return counters.get(
+        metrics.metric_key(
+            "llm_tokens_total", {"kind": kind, "model": fakes.FAKE_MODEL_NAME}
+        ),
+        0,
+    )
+
+
+def classify(articles, mode):
+    """
+    Classifies `articles` synthetic articles in `mode`. Returns the result frame,
+    the seconds taken and the prompt and completion tokens sent.
+    """
+    prompt_tokens, completion_tokens = token_count("prompt"), token_count("completion")
+    start = time.perf_counter()
+    df = determine.classify_articles(fakes.make_articles(articles), mode=mode)
+    seconds = time.perf_counter() - start
+    return (
+        df,
+        seconds,
+        token_count("prompt") - prompt_tokens,
+        token_count("completion") - completion_tokens,
+    )
+
+
+def run(articles=50, latency=0.2, relevance_rate=fakes.DEFAULT_RELEVANCE_RATE):
+    fakes.install_fakes(latency=latency, relevance_rate=relevance_rate)
+    cwd = os.getcwd()
+    scratch = tempfile.TemporaryDirectory(prefix="bench_sdg_")
+    rows = []
+    results = {}
+    try:
+        for mode in determine.SDG_MODES:
+            # Fresh LLM cache and embedding store for every mode
+            os.makedirs(os.path.join(scratch.name, mode))
+            os.chdir(os.path.join(scratch.name, mode))
+            if llm_cache._cache is not None:
+                llm_cache._cache.close()
+                llm_cache._cache = None
+            df, seconds, prompt_tokens, completion_tokens = classify(articles, mode)
+            results[mode] = df
+            rows.append(
+                {
+                    "benchmark": "sdg",
+                    "variant": mode,
+                    "n": articles,
+                    "seconds": seconds,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                }
+            )
+
+        df, seconds, prompt_tokens, completion_tokens = classify(articles, mode)
+        rows.append(
+            {
+                "benchmark": "sdg",
+                "variant": f"{mode} (warm cache)",
+                "n": articles,
+                "seconds": seconds,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+            }
+        )
+    finally:
+        if llm_cache._cache is not None:
+            llm_cache._cache.close()
+            llm_cache._cache = None
+        os.chdir(cwd)
+        scratch.cleanup()
+
+    # The fake model answers consistently, so every mode must agree
+    columns = ["is_sustain", "top 1", "top 2", "top 3"]
+    expected = results["two-stage"][columns].astype(int).values.tolist()
+    for mode, df in results.items():
+        assert df[columns].astype(int).values.tolist() == expected, mode
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument(
+        "--relevance-rate", type=float, default=fakes.DEFAULT_RELEVANCE_RATE
+    )
+    args = parser.parse_args()
+
+    for row in run(args.articles, args.latency, args.relevance_rate):
+        print(row)
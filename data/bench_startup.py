@@ -0,0 +1,68 @@
+"""
+Measures classifier cold start: importing main and determine, and building each
+ClassifierService component on first use. Every measurement runs in a fresh
+interpreter so module caches do not hide the cost.
+
+Usage:
+    python bench_startup.py --repeat 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROBE = """
+import json, os, sys, time
+os.environ.setdefault("OPENAI_API_KEY", "mock-key")
+start = time.perf_counter()
+import main
+main_seconds = time.perf_counter() - start
+start = time.perf_counter()
+import determine
+determine_seconds = time.perf_counter() - start
+service = determine.get_service()
+service.chain
+service.goal_chain
+service.index
+report = service.cold_start_report()
+report["import main"] = main_seconds
+report["import determine"] = determine_seconds
+sys.stdout.write("\\n" + json.dumps(report))
+"""
+
+
+def measure():
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(repeat=3):
+    samples = [measure() for _ in range(repeat)]
+    rows = []
+    for name in samples[0]:
+        rows.append(
+            {
+                "benchmark": "startup",
+                "variant": name,
+                "n": repeat,
+                "seconds": min(sample[name] for sample in samples),
+            }
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for row in run(args.repeat):
+        print(row)
@@ -0,0 +1,106 @@
+"""
+Compares the peak Python memory of building the whole research outputs DataFrame
+before writing it with streaming bounded batches of persons into the Parquet stores,
+against the local stub Experts API. Both runs must produce identical stores.
+
+Usage:
+    python bench_stream.py --persons 2000 --batch-size 64
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import data
+import experts_client
+import storage
+from fakes import make_persons
+from stub_experts_server import start_stub_server
+
+
+def write_dataframe(df_person, workers):
+    df = data.fetch_and_process_research_outputs(
+        return_df=True, max_workers=workers, df_person=df_person
+    )
+    storage.write_research_outputs(df)
+    storage.write_normalized_tables(df)
+
+
+def write_streaming(df_person, workers, batch_size):
+    data.stream_research_outputs(df_person, max_workers=workers, batch_size=batch_size)
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    stores = [
+        pd.read_parquet(path)
+        for path in (
+            storage.RESEARCH_STORE,
+            storage.ARTICLES_STORE,
+            storage.AUTHORSHIPS_STORE,
+        )
+    ]
+    return stores, seconds, peak
+
+
+def run(persons=2000, batch_size=data.STREAM_BATCH_PERSONS, workers=8):
+    server, base_url = start_stub_server(latency=0)
+    data._client = experts_client.ExpertsClient(base_url=base_url, backoff=0.01)
+    df_person = make_persons(persons)
+    cwd = os.getcwd()
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            results = {}
+            for variant, func, args in (
+                ("dataframe", write_dataframe, (df_person, workers)),
+                (
+                    f"streaming x{batch_size}",
+                    write_streaming,
+                    (df_person, workers, batch_size),
+                ),
+            ):
+                results[variant], seconds, peak = measure(func, *args)
+                rows.append(
+                    {
+                        "benchmark": "research outputs to store",
+                        "variant": variant,
+                        "n": persons,
+                        "seconds": seconds,
+                        "peak_mb": peak / 2**20,
+                    }
+                )
+    finally:
+        os.chdir(cwd)
+        data._client.close()
+        data._client = None
+        server.shutdown()
+
+    expected, streamed = results.values()
+    for expected_table, streamed_table in zip(expected, streamed):
+        pd.testing.assert_frame_equal(expected_table, streamed_table)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--persons", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=data.STREAM_BATCH_PERSONS)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    for row in run(args.persons, args.batch_size, args.workers):
+        print(
+            f"{row['variant']:<14} {row['n']:>6} persons {row['seconds']:7.2f}s "
+            f"peak {row['peak_mb']:8.1f} MB"
+        )
@@ -1,28 +1,41 @@
+import getpass
 import os
+import re
+import sys
 import pandas as pd
 import json
 import time
-from tenacity import retry, stop_after_attempt, wait_exponential
+import numpy as np
 from dotenv import load_dotenv
+import embedding_store
+import llm_cache
+import llm_engine
+import metrics
+import scheduler
 
 # Load environment variables from .env file
 load_dotenv()
-openai_api_key = os.getenv("OPENAI_API_KEY")
+
+# Models and SDG index; the clients themselves are built on first use
+# (see ClassifierService below)
+MODEL_NAME = "o3-mini"
+EMBEDDING_MODEL = "text-embedding-3-large"
+FAISS_INDEX_DIR = "faiss_sustainability_goals"
+# Adaptive scheduler (see scheduler.py) shared by every LLM call
+LLM_SCHEDULER = "llm"
+# Values of the "sdg_status" column set by the classifiers ("pending" marks
+# articles that were never attempted, see main.py)
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+
 # ------------------------------
 # PART 1: Sustainability Relevance Classification
 # ------------------------------
 
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers.json import SimpleJsonOutputParser
 
-# Initialize your LLM (update temperature/model parameters as needed)
-llm = ChatOpenAI(
-    # temperature=0,
-    model_name="o3-mini",
-    openai_api_key=openai_api_key,
-)
-
 sustain_question = """
 Your task is to determine whether the following research title and abstract relate directly to any of the 17 United Nations Sustainable Development Goals (SDGs). 
 Relevance requires that the research substantially contributes to or discusses sustainability goals, either through direct application or by providing foundational insights, tools, or frameworks that support the goals. 
@@ -69,49 +82,164 @@ prompt_template = ChatPromptTemplate.from_messages(
 
 parser = SimpleJsonOutputParser()
 
-chain = prompt_template | llm | parser
+# Text that identifies the relevance prompt in the LLM result cache
+sustain_template_text = system_template + "\n" + sustain_question
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
 def invoke_with_retry(chain, question):
-    try:
-        return chain.invoke({"question": question})
-    except Exception as e:
-        print(f"Attempt failed: {str(e)}")
-        raise
+    """
+    Invokes `chain` when the LLM scheduler allows, retrying failed attempts.
+    """
+    return get_service().scheduler.call(chain.invoke, {"question": question})
+
+
+async def ainvoke_with_retry(chain, question):
+    return await get_service().scheduler.acall(chain.ainvoke, {"question": question})
+
 
+class MalformedOutputError(ValueError):
+    """
+    An LLM reply without the expected JSON answer. The article is marked failed
+    (not negative) and the reply is not cached, so the next run asks again.
+    """
 
-def classify_sdg_relevance(df):
+
+def parse_relevance_output(output):
     """
-    Iterates through the DataFrame (which must contain 'title' and 'abstract' columns)
-    and adds an "is_sustain" column with 1 for relevance and 0 for non-relevance.
+    Converts a relevance chain output (dict or JSON string) into 0 or 1.
+    Raises MalformedOutputError if the output has no 0/1 "result".
     """
-    results = []
-    for index, row in df.iterrows():
+    if isinstance(output, str):
         try:
-            title = row["title"]
-            abstract = row["abstract"]
-            research_string = f"title: {title}\nabstract: {abstract}"
-            question = sustain_question.format(string=research_string)
-            time.sleep(1)
-            try:
-                output = invoke_with_retry(chain, question)
-                if isinstance(output, dict):
-                    result = int(output.get("result", 0))
-                elif isinstance(output, str):
-                    try:
-                        result_dict = json.loads(output)
-                        result = int(result_dict.get("result", 0))
-                    except json.JSONDecodeError:
-                        result = 0
-                else:
-                    result = 0
-                results.append(result)
-            except Exception as e:
-                results.append(0)
-        except Exception as e:
-            results.append(0)
+            output = json.loads(output)
+        except json.JSONDecodeError as e:
+            raise MalformedOutputError(f"Reply is not JSON: {output[:80]!r}") from e
+    result = output.get("result") if isinstance(output, dict) else None
+    if result not in (0, 1, "0", "1"):
+        raise MalformedOutputError(f"Reply has no 0/1 result: {str(output)[:80]!r}")
+    return int(result)
+
+
+def checked_output(output, parse):
+    """
+    Returns `output`, or the MalformedOutputError raised by `parse(output)`, so a
+    malformed reply is handled like a failed request.
+    """
+    if isinstance(output, Exception):
+        return output
+    try:
+        parse(output)
+    except MalformedOutputError as e:
+        return e
+    return output
+
+
+def report_failures(stage, outputs):
+    """
+    Prints how many requests of `stage` failed (their articles are left for the
+    next run) and whether the LLM scheduler gave up.
+    """
+    failed = sum(isinstance(output, Exception) for output in outputs)
+    if failed:
+        print(f"{stage}: {failed} requests failed; left unclassified for the next run")
+    if get_service().scheduler.broken:
+        print(f"{stage}: LLM circuit open, classification paused")
+
+
+def set_status(df, errors):
+    """
+    Sets "sdg_status" and "sdg_error" from `errors`, aligned with the rows of `df`:
+    None where the article was classified, otherwise the exception (or the name of
+    the problem) that left it unclassified.
+    """
+    df["sdg_status"] = [STATUS_OK if e is None else STATUS_FAILED for e in errors]
+    df["sdg_error"] = [
+        None if e is None else e if isinstance(e, str) else type(e).__name__
+        for e in errors
+    ]
+
+
+@metrics.timed
+def classify_sdg_relevance(
+    df,
+    concurrency=llm_engine.DEFAULT_CONCURRENCY,
+    requests_per_minute=llm_engine.DEFAULT_REQUESTS_PER_MINUTE,
+    tokens_per_minute=llm_engine.DEFAULT_TOKENS_PER_MINUTE,
+    sustain_chain=None,
+    use_cache=True,
+):
+    """
+    Classifies every row of the DataFrame (which must contain 'title' and 'abstract' columns)
+    and adds an "is_sustain" column with 1 for relevance and 0 for non-relevance
+    (NaN, to be retried by the next run, when the request failed).
+    Requests are sent concurrently (at most `concurrency` in flight) and throttled by a
+    requests/tokens-per-minute limiter; results keep the original row order.
+    Previously classified title/abstract pairs are answered from the LLM result cache.
+    """
+    service = get_service()
+    cache = llm_cache.get_cache() if use_cache else None
+    if cache:
+        cache.invalidate_stale("relevance", sustain_template_text)
+    research_strings = [
+        f"title: {title}\nabstract: {abstract}"
+        for title, abstract in zip(df["title"], df["abstract"])
+    ]
+
+    outputs = [None] * len(research_strings)
+    pending = []
+    for i, research_string in enumerate(research_strings):
+        cached = (
+            cache.get(service.model_name, sustain_template_text, research_string)
+            if cache
+            else None
+        )
+        if cached is not None:
+            outputs[i] = cached
+        else:
+            pending.append(i)
+
+    questions = [sustain_question.format(string=research_strings[i]) for i in pending]
+    if questions and sustain_chain is None:
+        sustain_chain = service.chain
+
+    async def invoke(question):
+        return await ainvoke_with_retry(sustain_chain, question)
+
+    fresh_outputs = llm_engine.run_chain(
+        invoke,
+        questions,
+        token_counts=[llm_engine.estimate_tokens(q) for q in questions],
+        concurrency=concurrency,
+        limiter=service.rate_limiter(requests_per_minute, tokens_per_minute),
+    )
+    for i, output in zip(pending, fresh_outputs):
+        outputs[i] = checked_output(output, parse_relevance_output)
+        if cache and not isinstance(outputs[i], Exception):
+            cache.set(
+                "relevance",
+                service.model_name,
+                sustain_template_text,
+                research_strings[i],
+                output,
+            )
+    if cache:
+        cache.commit()
+        print(
+            f"Relevance cache: {len(research_strings) - len(pending)} hits, {len(pending)} misses"
+        )
+
+    # Entries cached before replies were validated may still be malformed
+    outputs = [checked_output(output, parse_relevance_output) for output in outputs]
+    results = [
+        # Left unclassified so the next run retries it
+        np.nan if isinstance(output, Exception) else parse_relevance_output(output)
+        for output in outputs
+    ]
+    report_failures("Relevance", outputs)
     df["is_sustain"] = results
+    set_status(
+        df, [output if isinstance(output, Exception) else None for output in outputs]
+    )
     return df
 
 
@@ -119,25 +247,9 @@ def classify_sdg_relevance(df):
 # PART 2: Determine Specific SDG Goals Using FAISS and a Second Prompt
 # ------------------------------
 
-import getpass
-from dotenv import load_dotenv
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
-
-# Load environment variables if needed
-load_dotenv()
-
-if not os.getenv("OPENAI_API_KEY"):
-    os.environ["OPENAI_API_KEY"] = getpass.getpass("Enter your OpenAI API key: ")
-
-embeddings = OpenAIEmbeddings(
-    model="text-embedding-3-large",
-    openai_api_key="",
-)
-
-loaded_faiss = FAISS.load_local(
-    "faiss_sustainability_goals", embeddings, allow_dangerous_deserialization=True
-)
+# Abstracts per embed_documents request and SDG candidates retrieved per article
+EMBEDDING_BATCH_SIZE = 64
+CANDIDATE_GOALS_K = 5
 
 goal_prompt = """
 You are an expert in sustainability research alignment. Given the following research article and a list of candidate United Nations Sustainable Development Goals (SDGs) with their full descriptions, determine which of these goals are truly relevant to the research.
@@ -161,77 +273,887 @@ goal_prompt_template = ChatPromptTemplate.from_messages(
 )
 
 goal_parser = SimpleJsonOutputParser()
-goal_chain = goal_prompt_template | llm | goal_parser
 
+# Text that identifies the goal prompt in the LLM result cache
+goal_template_text = goal_system_template + "\n" + goal_prompt
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def invoke_goal_chain_with_retry(chain, research_text, candidate_goals):
-    try:
-        return chain.invoke(
-            {"research_text": research_text, "candidate_goals": candidate_goals}
+
+# ------------------------------
+# Lazily constructed clients and index
+# ------------------------------
+
+
+def get_openai_api_key():
+    """
+    Returns the OpenAI API key from the environment (or .env), prompting for it only
+    when running interactively.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and sys.stdin.isatty():
+        api_key = getpass.getpass("Enter your OpenAI API key: ")
+        os.environ["OPENAI_API_KEY"] = api_key
+    if not api_key:
+        raise RuntimeError(
+            "OPENAI_API_KEY is not set; add it to the environment or .env"
         )
-    except Exception as e:
-        print(f"Goal chain attempt failed: {str(e)}")
-        raise
+    return api_key
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    Records the latency, errors and token usage of every chat model call in the run
+    metrics, and passes the provider's rate-limit headers to the LLM scheduler.
+    """
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        registry = metrics.get_metrics()
+        start = self.started.pop(run_id, None)
+        if start is not None:
+            registry.observe(
+                "llm_request_seconds",
+                time.perf_counter() - start,
+                model=self.model_name,
+            )
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        for kind in ("prompt", "completion"):
+            registry.inc(
+                "llm_tokens_total",
+                usage.get(f"{kind}_tokens") or 0,
+                model=self.model_name,
+                kind=kind,
+            )
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                headers = getattr(message, "response_metadata", {}).get("headers")
+                if headers:
+                    scheduler.get_scheduler(LLM_SCHEDULER).update_from_headers(headers)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self.started.pop(run_id, None)
+        metrics.get_metrics().inc(
+            "llm_errors_total", model=self.model_name, error=type(error).__name__
+        )
+
+
+class ClassifierService:
+    """
+    Holds the chat model, embeddings, SDG index and chains. Each one is built on first
+    use and reused afterwards, so importing this module stays cheap and cached runs
+    never construct the clients at all. `timings` records the build time of each
+    component (the cold-start cost).
+    """
+
+    def __init__(
+        self,
+        model_name=MODEL_NAME,
+        embedding_model=EMBEDDING_MODEL,
+        index_dir=FAISS_INDEX_DIR,
+    ):
+        self.model_name = model_name
+        self.embedding_model = embedding_model
+        self.index_dir = index_dir
+        self.scheduler = scheduler.get_scheduler(LLM_SCHEDULER)
+        self.limiters = {}
+        self.timings = {}
+        self._components = {}
+        self._nested = 0.0
+
+    def _get(self, name, build):
+        if name not in self._components:
+            # Time spent building dependencies is charged to them, not to `name`
+            outer, self._nested = self._nested, 0.0
+            start = time.perf_counter()
+            self._components[name] = build()
+            elapsed = time.perf_counter() - start
+            self.timings[name] = elapsed - self._nested
+            self._nested = outer + elapsed
+            print(f"Initialized {name} in {self.timings[name]:.2f}s")
+        return self._components[name]
+
+    @property
+    def llm(self):
+        def build():
+            from langchain_openai import ChatOpenAI
+
+            return ChatOpenAI(
+                model_name=self.model_name,
+                openai_api_key=get_openai_api_key(),
+                # Rate-limit headers feed the scheduler (see LLMMetricsHandler)
+                include_response_headers=True,
+                callbacks=[LLMMetricsHandler(self.model_name)],
+            )
+
+        return self._get("llm", build)
+
+    @property
+    def embeddings(self):
+        def build():
+            from langchain_openai import OpenAIEmbeddings
+
+            return OpenAIEmbeddings(
+                model=self.embedding_model, openai_api_key=get_openai_api_key()
+            )
+
+        return self._get("embeddings", build)
+
+    @property
+    def index(self):
+        def build():
+            from langchain_community.vectorstores import FAISS
+
+            return FAISS.load_local(
+                self.index_dir, self.embeddings, allow_dangerous_deserialization=True
+            )
+
+        return self._get("faiss index", build)
+
+    @property
+    def chain(self):
+        return self._get("relevance chain", lambda: prompt_template | self.llm | parser)
+
+    @property
+    def goal_chain(self):
+        return self._get(
+            "goal chain", lambda: goal_prompt_template | self.llm | goal_parser
+        )
+
+    @property
+    def fused_chain(self):
+        return self._get(
+            "fused chain", lambda: fused_prompt_template | self.llm | parser
+        )
+
+    @property
+    def batch_chain(self):
+        return self._get(
+            "batch chain", lambda: batch_prompt_template | self.llm | parser
+        )
+
+    def rate_limiter(self, requests_per_minute, tokens_per_minute):
+        """
+        Returns the rate limiter for these limits, shared by every stage and repair
+        round of the run so they all draw on one per-minute budget.
+        """
+        key = (requests_per_minute, tokens_per_minute)
+        if key not in self.limiters:
+            self.limiters[key] = llm_engine.RateLimiter(*key)
+        return self.limiters[key]
+
+    def cold_start_report(self):
+        """
+        Returns the build time of each component initialized so far and their total.
+        """
+        report = {name: round(seconds, 3) for name, seconds in self.timings.items()}
+        report["total"] = round(sum(self.timings.values()), 3)
+        return report
+
+
+_service = None
+
+
+def get_service():
+    """
+    Returns the shared ClassifierService, creating it (but none of its clients) on the
+    first call.
+    """
+    global _service
+    if _service is None:
+        _service = ClassifierService()
+    return _service
+
+
+async def ainvoke_goal_chain_with_retry(chain, research_text, candidate_goals):
+    return await get_service().scheduler.acall(
+        chain.ainvoke,
+        {"research_text": research_text, "candidate_goals": candidate_goals},
+    )
+
+
+@metrics.timed
+def embed_texts(texts, batch_size=EMBEDDING_BATCH_SIZE):
+    """
+    Embeds texts in chunked `embed_documents` calls and returns a float32 matrix
+    with one row per text.
+    """
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        request_start = time.perf_counter()
+        vectors.extend(
+            get_service().embeddings.embed_documents(texts[start : start + batch_size])
+        )
+        metrics.get_metrics().observe(
+            "embedding_request_seconds", time.perf_counter() - request_start
+        )
+    return np.asarray(vectors, dtype="float32").reshape(len(texts), -1)
+
+
+@metrics.timed
+def search_candidate_goals(vectors, k=CANDIDATE_GOALS_K):
+    """
+    Runs a single multi-query search of the SDG index for a matrix of article vectors.
+    Returns one list of (document, distance) pairs per row, nearest first.
+    """
+    if len(vectors) == 0:
+        return []
+    import faiss
+
+    loaded_faiss = get_service().index
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    if getattr(loaded_faiss, "_normalize_L2", False):
+        vectors = vectors.copy()
+        faiss.normalize_L2(vectors)
+    distances, indices = loaded_faiss.index.search(vectors, k)
+    candidates = []
+    for row_distances, row_indices in zip(distances, indices):
+        row = []
+        for distance, idx in zip(row_distances, row_indices):
+            if idx == -1:
+                continue
+            doc_id = loaded_faiss.index_to_docstore_id[idx]
+            row.append((loaded_faiss.docstore.search(doc_id), float(distance)))
+        candidates.append(row)
+    return candidates
+
+
+def format_candidate_goals(results):
+    """
+    Formats (document, score) pairs as the candidate goal list of the goal prompt.
+    """
+    candidate_goals_entries = []
+    for doc, score in results:
+        goal_number = doc.metadata.get("goal_number")
+        if goal_number is not None:
+            entry = f"Goal {goal_number}: {doc.page_content}"
+            candidate_goals_entries.append(entry)
+    return "\n\n".join(candidate_goals_entries)
+
+
+@metrics.timed
+def embed_articles(df, batch_size=EMBEDDING_BATCH_SIZE):
+    """
+    Returns the embedding matrix for the rows of `df`. Vectors are read from the local
+    embedding store, and only articles that are new or whose title/abstract changed
+    are sent to the embeddings API.
+    """
+    research_texts = [
+        f"title: {title}\nabstract: {abstract}"
+        for title, abstract in zip(df["title"], df["abstract"])
+    ]
+    if "article_uuid" not in df.columns:
+        return embed_texts(research_texts, batch_size=batch_size)
+
+    hashes = [
+        embedding_store.content_hash(title, abstract)
+        for title, abstract in zip(df["title"], df["abstract"])
+    ]
+    store = embedding_store.EmbeddingStore()
+    return store.vectors_for(
+        df["article_uuid"].astype(str),
+        hashes,
+        lambda positions: embed_texts(
+            [research_texts[i] for i in positions], batch_size=batch_size
+        ),
+    )
+
+
+def retrieve_candidate_goals(df, k=CANDIDATE_GOALS_K):
+    """
+    Batched retrieval stage: embeds (or loads stored vectors for) every article in `df`,
+    then looks up the top-k SDG candidates for all of them with one index search.
+    """
+    return search_candidate_goals(embed_articles(df), k=k)
+
+
+def parse_goal_output(output):
+    """
+    Converts a goal chain output (dict or JSON string) into a list of goal numbers.
+    """
+    selected_goals = []
+    if isinstance(output, dict) and "goals" in output:
+        selected_goals = output["goals"]
+    elif isinstance(output, str):
+        try:
+            result_dict = json.loads(output)
+            selected_goals = result_dict.get("goals", [])
+        except json.JSONDecodeError:
+            selected_goals = []
+    if not isinstance(selected_goals, list):
+        selected_goals = []
+    return selected_goals
 
 
-def determine_relevant_goals(df):
+@metrics.timed
+def determine_relevant_goals(
+    df,
+    use_cache=True,
+    concurrency=llm_engine.DEFAULT_CONCURRENCY,
+    requests_per_minute=llm_engine.DEFAULT_REQUESTS_PER_MINUTE,
+    tokens_per_minute=llm_engine.DEFAULT_TOKENS_PER_MINUTE,
+):
     """
     For each article marked as sustainable (is_sustain == 1), determine the top relevant SDG goals.
     The results are added as new columns: "top 1", "top 2", and "top 3".
+    Candidate goals for all uncached articles are retrieved in one batched stage before
+    the goal chain runs concurrently. Cached answers are keyed on the research text
+    alone, since the FAISS candidates are derived from it, so a hit skips both
+    retrieval and the LLM call. Articles whose goal request failed are reset to NaN
+    so the next run classifies them again.
     """
+    service = get_service()
+    cache = llm_cache.get_cache() if use_cache else None
+    if cache:
+        cache.invalidate_stale("goals", goal_template_text)
+
+    research_texts = [
+        f"title: {title}\nabstract: {abstract}"
+        for title, abstract in zip(df["title"], df["abstract"])
+    ]
+    is_sustain = df["is_sustain"].tolist()
+    outputs = [None] * len(df)
+    pending = []
+    for i, research_text in enumerate(research_texts):
+        if is_sustain[i] != 1:
+            continue
+        if cache:
+            outputs[i] = cache.get(
+                service.model_name, goal_template_text, research_text
+            )
+        if outputs[i] is None:
+            pending.append(i)
+
+    try:
+        candidates = retrieve_candidate_goals(df.iloc[pending]) if pending else []
+    except Exception as e:
+        print(f"Candidate goal retrieval failed: {str(e)}")
+        candidates = [e] * len(pending)
+
+    goal_requests = [
+        (i, format_candidate_goals(results))
+        for i, results in zip(pending, candidates)
+        if not isinstance(results, Exception)
+    ]
+    goal_chain = service.goal_chain if goal_requests else None
+
+    async def invoke(request):
+        i, candidate_goals = request
+        return await ainvoke_goal_chain_with_retry(
+            goal_chain, research_texts[i], candidate_goals
+        )
+
+    fresh_outputs = llm_engine.run_chain(
+        invoke,
+        goal_requests,
+        token_counts=[
+            llm_engine.estimate_tokens(research_texts[i] + candidate_goals)
+            for i, candidate_goals in goal_requests
+        ],
+        concurrency=concurrency,
+        limiter=service.rate_limiter(requests_per_minute, tokens_per_minute),
+    )
+    for i, results in zip(pending, candidates):
+        if isinstance(results, Exception):
+            outputs[i] = results
+    for (i, _), output in zip(goal_requests, fresh_outputs):
+        outputs[i] = output
+        if cache and not isinstance(output, Exception):
+            cache.set(
+                "goals",
+                service.model_name,
+                goal_template_text,
+                research_texts[i],
+                output,
+            )
+    report_failures("Goals", [outputs[i] for i in pending])
+
+    # Relevance failures keep the error recorded by the relevance stage
+    if "sdg_error" in df.columns:
+        errors = [
+            error if isinstance(error, str) else None for error in df["sdg_error"]
+        ]
+    else:
+        errors = [None] * len(df)
     top1_list = []
     top2_list = []
     top3_list = []
-    for index, row in df.iterrows():
-        if row["is_sustain"] == 1:
-            try:
-                title = row["title"]
-                abstract = row["abstract"]
-                research_text = f"title: {title}\nabstract: {abstract}"
-                results = loaded_faiss.similarity_search_with_score(research_text, k=5)
-                candidate_goals_entries = []
-                for doc, score in results:
-                    goal_number = doc.metadata.get("goal_number")
-                    if goal_number is not None:
-                        entry = f"Goal {goal_number}: {doc.page_content}"
-                        candidate_goals_entries.append(entry)
-                candidate_goals = "\n\n".join(candidate_goals_entries)
-                time.sleep(1)
-                output = invoke_goal_chain_with_retry(
-                    goal_chain, research_text, candidate_goals
-                )
-                selected_goals = []
-                if isinstance(output, dict) and "goals" in output:
-                    selected_goals = output["goals"]
-                elif isinstance(output, str):
-                    try:
-                        result_dict = json.loads(output)
-                        selected_goals = result_dict.get("goals", [])
-                    except json.JSONDecodeError:
-                        selected_goals = []
-                if not isinstance(selected_goals, list):
-                    selected_goals = []
-                top1 = selected_goals[0] if len(selected_goals) > 0 else 0
-                top2 = selected_goals[1] if len(selected_goals) > 1 else 0
-                top3 = selected_goals[2] if len(selected_goals) > 2 else 0
-                top1_list.append(top1)
-                top2_list.append(top2)
-                top3_list.append(top3)
-            except Exception as e:
-                top1_list.append(0)
-                top2_list.append(0)
-                top3_list.append(0)
-        else:
-            top1_list.append(0)
-            top2_list.append(0)
-            top3_list.append(0)
+    for i, output in enumerate(outputs):
+        if isinstance(output, Exception) or pd.isna(is_sustain[i]):
+            # Not classified yet: retried as a whole by the next run
+            if isinstance(output, Exception):
+                errors[i] = output
+            elif errors[i] is None:
+                errors[i] = "MissingRelevance"
+            is_sustain[i] = np.nan
+            top1_list.append(np.nan)
+            top2_list.append(np.nan)
+            top3_list.append(np.nan)
+            continue
+        errors[i] = None
+        selected_goals = parse_goal_output(output) if output is not None else []
+        top1_list.append(selected_goals[0] if len(selected_goals) > 0 else 0)
+        top2_list.append(selected_goals[1] if len(selected_goals) > 1 else 0)
+        top3_list.append(selected_goals[2] if len(selected_goals) > 2 else 0)
+    if cache:
+        cache.commit()
+        cache.flush_stats()
+    df["is_sustain"] = is_sustain
     df["top 1"] = top1_list
     df["top 2"] = top2_list
     df["top 3"] = top3_list
+    set_status(df, errors)
+    return df
+
+
+# ------------------------------
+# PART 3: Fused Single-Call Classification
+# ------------------------------
+
+# One line per SDG, shared with the relevance prompt
+SDG_SUMMARIES = [
+    line for line in sustain_question.splitlines() if re.match(r"\d+\. ", line)
+]
+SDG_NAMES = {
+    int(line.split(".")[0]): line.split(". ", 1)[1].split(":")[0]
+    for line in SDG_SUMMARIES
+}
+
+fused_question = (
+    """
+Your task is to determine whether the following research title and abstract relate directly to any of the 17 United Nations Sustainable Development Goals (SDGs) and, if so, which goals.
+Relevance requires that the research substantially contributes to or discusses sustainability goals, either through direct application or by providing foundational insights, tools, or frameworks that support the goals.
+
+The 17 UN Sustainable Development Goals (SDGs) and descriptions for articles are:
+"""
+    + "\n".join(SDG_SUMMARIES)
+    + """
+
+Research Title and Abstract:
+{research_text}
+
+Goals closest to this research by text similarity (most similar first): {candidate_goals}
+
+Please analyze the research title and abstract to determine if it relates to any of the SDGs. Focus on direct contributions to sustainability goals. Avoid over-strict exclusion while maintaining meaningful relevance.
+If it is relevant, set "result" to 1 and list the relevant goal numbers in order of importance, most relevant first, at most three. Use the closest goals above as a guide, not a limit.
+If it is not relevant, set "result" to 0 and return an empty list.
+Do not provide any reasoning in your response. Only respond in the following structured JSON format:
+
+{{"result": 1, "goals": [13, 7, 12]}}  // For relevance, with ranked goals
+{{"result": 0, "goals": []}}  // For non-relevance
+"""
+)
+
+fused_system_template = (
+    "You are a sustainability expert specializing in assessing the relevance of research "
+    "to the United Nations Sustainable Development Goals (SDGs). Given a research article and "
+    "candidate SDG goals, decide whether it relates to any SDG and rank the relevant goals. "
+    "Your response should be in JSON format as specified."
+)
+
+fused_prompt_template = ChatPromptTemplate.from_messages(
+    [("system", fused_system_template), ("user", "{question}")]
+)
+
+# Text that identifies the fused prompt in the LLM result cache
+fused_template_text = fused_system_template + "\n" + fused_question
+
+
+def format_candidate_goal_numbers(results):
+    """
+    Formats (document, score) pairs as a short ranked list such as
+    "13 (Climate Action), 7 (Affordable and Clean Energy)".
+    """
+    goals = []
+    for doc, score in results:
+        goal_number = doc.metadata.get("goal_number")
+        if goal_number is not None:
+            name = SDG_NAMES.get(int(goal_number))
+            goals.append(f"{goal_number} ({name})" if name else str(goal_number))
+    return ", ".join(goals)
+
+
+def parse_fused_output(output):
+    """
+    Converts a fused chain output into (is_sustain, goals); goals is empty unless the
+    article is relevant. Raises MalformedOutputError if the output has no 0/1 "result".
+    """
+    if isinstance(output, str):
+        try:
+            output = json.loads(output)
+        except json.JSONDecodeError as e:
+            raise MalformedOutputError(f"Reply is not JSON: {output[:80]!r}") from e
+    is_sustain = parse_relevance_output(output)
+    return is_sustain, parse_goal_output(output) if is_sustain == 1 else []
+
+
+@metrics.timed
+def classify_sdg_fused(
+    df,
+    concurrency=llm_engine.DEFAULT_CONCURRENCY,
+    requests_per_minute=llm_engine.DEFAULT_REQUESTS_PER_MINUTE,
+    tokens_per_minute=llm_engine.DEFAULT_TOKENS_PER_MINUTE,
+    fused_chain=None,
+    use_cache=True,
+):
+    """
+    Fused alternative to classify_sdg_relevance followed by determine_relevant_goals:
+    retrieves FAISS candidate goals for every article in one batch, then makes a single
+    LLM call per article that returns both the relevance decision and the ranked goals.
+    The prompt carries the short SDG list and the candidate goal numbers rather than
+    the full goal documents, so it costs about as much as the relevance prompt alone.
+    Adds the same "is_sustain", "top 1", "top 2" and "top 3" columns (NaN for articles
+    whose request failed, so the next run retries them).
+    """
+    service = get_service()
+    cache = llm_cache.get_cache() if use_cache else None
+    if cache:
+        cache.invalidate_stale("fused", fused_template_text)
+    research_texts = [
+        f"title: {title}\nabstract: {abstract}"
+        for title, abstract in zip(df["title"], df["abstract"])
+    ]
+
+    outputs = [None] * len(research_texts)
+    pending = []
+    for i, research_text in enumerate(research_texts):
+        if cache:
+            outputs[i] = cache.get(
+                service.model_name, fused_template_text, research_text
+            )
+        if outputs[i] is None:
+            pending.append(i)
+
+    try:
+        candidates = retrieve_candidate_goals(df.iloc[pending]) if pending else []
+    except Exception as e:
+        print(f"Candidate goal retrieval failed: {str(e)}")
+        candidates = [e] * len(pending)
+
+    sent = []
+    questions = []
+    for i, results in zip(pending, candidates):
+        if isinstance(results, Exception):
+            # Marked failed, so the next run retries it
+            outputs[i] = results
+            continue
+        sent.append(i)
+        questions.append(
+            fused_question.format(
+                research_text=research_texts[i],
+                candidate_goals=format_candidate_goal_numbers(results),
+            )
+        )
+    if questions and fused_chain is None:
+        fused_chain = service.fused_chain
+
+    async def invoke(question):
+        return await ainvoke_with_retry(fused_chain, question)
+
+    fresh_outputs = llm_engine.run_chain(
+        invoke,
+        questions,
+        token_counts=[llm_engine.estimate_tokens(q) for q in questions],
+        concurrency=concurrency,
+        limiter=service.rate_limiter(requests_per_minute, tokens_per_minute),
+    )
+    for i, output in zip(sent, fresh_outputs):
+        output = checked_output(output, parse_fused_output)
+        outputs[i] = output
+        if isinstance(output, Exception):
+            continue
+        if cache:
+            cache.set(
+                "fused",
+                service.model_name,
+                fused_template_text,
+                research_texts[i],
+                output,
+            )
+    if cache:
+        cache.commit()
+        cache.flush_stats()
+        print(
+            f"Fused cache: {len(research_texts) - len(pending)} hits, {len(pending)} misses"
+        )
+
+    report_failures("Fused", [outputs[i] for i in pending])
+
+    is_sustain_list = []
+    top_lists = ([], [], [])
+    outputs = [
+        checked_output(output, parse_fused_output) if output is not None else None
+        for output in outputs
+    ]
+    for output in outputs:
+        if isinstance(output, Exception):
+            # Left unclassified so the next run retries it
+            is_sustain_list.append(np.nan)
+            for top_list in top_lists:
+                top_list.append(np.nan)
+            continue
+        is_sustain, goals = (
+            parse_fused_output(output) if output is not None else (0, [])
+        )
+        is_sustain_list.append(is_sustain)
+        for rank, top_list in enumerate(top_lists):
+            top_list.append(goals[rank] if len(goals) > rank else 0)
+    df["is_sustain"] = is_sustain_list
+    df["top 1"], df["top 2"], df["top 3"] = top_lists
+    set_status(
+        df, [output if isinstance(output, Exception) else None for output in outputs]
+    )
     return df
 
 
+# ------------------------------
+# PART 4: Batched Relevance Screening
+# ------------------------------
+
+# Articles packed into one batched relevance request, and how many times articles
+# missing from (or malformed in) a response are re-queried in smaller batches
+RELEVANCE_BATCH_SIZE = 10
+MAX_BATCH_REPAIRS = 2
+
+batch_question = (
+    """
+Your task is to determine, for each of the following research articles, whether its title and abstract relate directly to any of the 17 United Nations Sustainable Development Goals (SDGs).
+Relevance requires that the research substantially contributes to or discusses sustainability goals, either through direct application or by providing foundational insights, tools, or frameworks that support the goals.
+If relevant, return 1; if not relevant, return 0.
+
+The 17 UN Sustainable Development Goals (SDGs) and descriptions for articles are:
+"""
+    + "\n".join(SDG_SUMMARIES)
+    + """
+
+Research Articles:
+{articles}
+
+Please analyze each research title and abstract independently to determine if it relates to any of the SDGs. Focus on direct contributions to sustainability goals. Avoid over-strict exclusion while maintaining meaningful relevance. Do not provide any reasoning in your response. Return one entry for every article, using its article_uuid exactly as given, as a JSON array in the following structured format:
+
+[{{"article_uuid": "first-uuid", "result": 1}}, {{"article_uuid": "second-uuid", "result": 0}}]
+"""
+)
+
+batch_system_template = (
+    "You are an sustainability expert specializing in assessing the relevance of research "
+    "to the United Nations Sustainable Development Goals (SDGs). Given several research titles "
+    "and abstracts, your task is to determine for each one if the research relates to any of "
+    "the 17 SDGs. Your response should be in JSON format as specified."
+)
+
+batch_prompt_template = ChatPromptTemplate.from_messages(
+    [("system", batch_system_template), ("user", "{question}")]
+)
+
+# Text that identifies the batched prompt in the LLM result cache
+batch_template_text = batch_system_template + "\n" + batch_question
+
+
+def format_article_batch(article_ids, research_strings):
+    return "\n\n".join(
+        f"article_uuid: {article_id}\n{research_string}"
+        for article_id, research_string in zip(article_ids, research_strings)
+    )
+
+
+def parse_batch_output(output, expected_ids):
+    """
+    Extracts {article_uuid: 0 or 1} from a batched relevance output. Items with an
+    unknown id or a result other than 0/1 are dropped, so the caller can re-query them.
+    """
+    if isinstance(output, str):
+        try:
+            output = json.loads(output)
+        except json.JSONDecodeError:
+            return {}
+    if isinstance(output, dict):
+        # Tolerate the array being wrapped in an object, e.g. {"results": [...]}
+        output = next((v for v in output.values() if isinstance(v, list)), [])
+    if not isinstance(output, list):
+        return {}
+    expected = set(expected_ids)
+    results = {}
+    for item in output:
+        if not isinstance(item, dict):
+            continue
+        article_id = str(item.get("article_uuid"))
+        result = item.get("result")
+        if article_id in expected and result in (0, 1, "0", "1"):
+            results[article_id] = int(result)
+    return results
+
+
+@metrics.timed
+def classify_sdg_relevance_batched(
+    df,
+    batch_size=RELEVANCE_BATCH_SIZE,
+    concurrency=llm_engine.DEFAULT_CONCURRENCY,
+    requests_per_minute=llm_engine.DEFAULT_REQUESTS_PER_MINUTE,
+    tokens_per_minute=llm_engine.DEFAULT_TOKENS_PER_MINUTE,
+    batch_chain=None,
+    use_cache=True,
+    max_repairs=MAX_BATCH_REPAIRS,
+):
+    """
+    Batched alternative to classify_sdg_relevance for bulk backfills: packs
+    `batch_size` title/abstract pairs into each request so the long SDG preamble is
+    sent once per batch. Responses are validated per article; articles that are
+    missing or malformed are re-queried in batches half the size, up to
+    `max_repairs` times, and are left unclassified (NaN) for the next run if still
+    unresolved.
+    Answers cached by either relevance prompt are reused.
+    """
+    service = get_service()
+    cache = llm_cache.get_cache() if use_cache else None
+    if cache:
+        cache.invalidate_stale("relevance-batch", batch_template_text)
+    research_strings = [
+        f"title: {title}\nabstract: {abstract}"
+        for title, abstract in zip(df["title"], df["abstract"])
+    ]
+    if "article_uuid" in df.columns and df["article_uuid"].is_unique:
+        article_ids = df["article_uuid"].astype(str).tolist()
+    else:
+        article_ids = [str(i) for i in range(len(df))]
+
+    results = [None] * len(research_strings)
+    errors = [None] * len(research_strings)
+    pending = []
+    for i, research_string in enumerate(research_strings):
+        cached = None
+        if cache:
+            cached = cache.get(service.model_name, batch_template_text, research_string)
+            if cached is None:
+                cached = cache.get(
+                    service.model_name, sustain_template_text, research_string
+                )
+        try:
+            results[i] = None if cached is None else parse_relevance_output(cached)
+        except MalformedOutputError:
+            results[i] = None
+        if results[i] is None:
+            pending.append(i)
+    cached_count = len(research_strings) - len(pending)
+    if pending and batch_chain is None:
+        batch_chain = service.batch_chain
+
+    async def invoke(question):
+        return await ainvoke_with_retry(batch_chain, question)
+
+    requests_sent = 0
+    size = batch_size
+    for attempt in range(max_repairs + 1):
+        if not pending or service.scheduler.broken:
+            break
+        batches = [
+            pending[start : start + size] for start in range(0, len(pending), size)
+        ]
+        questions = [
+            batch_question.format(
+                articles=format_article_batch(
+                    [article_ids[i] for i in batch],
+                    [research_strings[i] for i in batch],
+                )
+            )
+            for batch in batches
+        ]
+        outputs = llm_engine.run_chain(
+            invoke,
+            questions,
+            token_counts=[llm_engine.estimate_tokens(q) for q in questions],
+            concurrency=concurrency,
+            limiter=service.rate_limiter(requests_per_minute, tokens_per_minute),
+        )
+        requests_sent += len(questions)
+        report_failures("Batched relevance", outputs)
+
+        unresolved = []
+        for batch, output in zip(batches, outputs):
+            answers = (
+                {}
+                if isinstance(output, Exception)
+                else parse_batch_output(output, [article_ids[i] for i in batch])
+            )
+            for i in batch:
+                if article_ids[i] not in answers:
+                    unresolved.append(i)
+                    errors[i] = (
+                        output if isinstance(output, Exception) else "MissingFromBatch"
+                    )
+                    continue
+                results[i] = answers[article_ids[i]]
+                errors[i] = None
+                if cache:
+                    cache.set(
+                        "relevance-batch",
+                        service.model_name,
+                        batch_template_text,
+                        research_strings[i],
+                        {"result": results[i]},
+                    )
+        if unresolved and attempt < max_repairs:
+            print(
+                f"Re-querying {len(unresolved)} articles missing from batch responses"
+            )
+        pending = unresolved
+        size = max(1, size // 2)
+
+    if cache:
+        cache.commit()
+    print(
+        f"Batched relevance: {cached_count} cached, {requests_sent} requests, "
+        f"{len(pending)} unresolved"
+    )
+    for i in pending:
+        if errors[i] is None:
+            # Never sent: the circuit opened before their batch
+            errors[i] = "CircuitOpenError"
+    df["is_sustain"] = [np.nan if result is None else result for result in results]
+    set_status(df, errors)
+    return df
+
+
+# ------------------------------
+# Classification modes accepted by classify_articles
+# ------------------------------
+
+SDG_MODES = ["two-stage", "fused", "batched"]
+
+
+@metrics.timed
+def articles_in_flight(mode="two-stage", concurrency=llm_engine.DEFAULT_CONCURRENCY):
+    """
+    Number of articles one round of `concurrency` requests classifies in `mode`;
+    batched relevance screening sends RELEVANCE_BATCH_SIZE articles per request.
+    """
+    return concurrency * (RELEVANCE_BATCH_SIZE if mode == "batched" else 1)
+
+
+def classify_articles(df, mode="two-stage"):
+    """
+    Adds "is_sustain", "top 1", "top 2" and "top 3" to `df` using the chosen mode:
+    "two-stage" (relevance prompt, then goal prompt for relevant articles), "fused"
+    (one prompt per article after candidate retrieval) or "batched" (relevance
+    screened several articles per prompt, then the goal prompt).
+    Also sets "sdg_status" ("ok", or "failed" for articles left unclassified) and
+    "sdg_error" (the error class of the failed request).
+    """
+    if mode == "fused":
+        return classify_sdg_fused(df)
+    if mode == "batched":
+        df = classify_sdg_relevance_batched(df)
+    else:
+        df = classify_sdg_relevance(df)
+    print("Categorizing SDG")
+    return determine_relevant_goals(df)
+
+
 # if __name__ == "__main__":
 #     # Example usage: process a CSV file with columns "title" and "abstract"
 #     # Uncomment and modify the lines below as needed.
@@ -0,0 +1,225 @@
+import hashlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+# Article vectors from text-embedding-3-large, one float32 row per stored version
+DEFAULT_MATRIX_FILE = "article_embeddings.npy"
+# Sidecar index: article_uuid, content_hash, row
+DEFAULT_INDEX_FILE = "article_embeddings_index.csv"
+# Rows copied at a time when a matrix has to be rewritten
+COPY_CHUNK_ROWS = 65536
+
+
+def content_hash(title, abstract):
+    """
+    Hash of the text that gets embedded, used to detect changed articles.
+    """
+    return hashlib.sha256(f"{title}\x1f{abstract}".encode("utf-8")).hexdigest()
+
+
+def open_matrix(path=DEFAULT_MATRIX_FILE):
+    """
+    Memory-maps the embedding matrix read-only, for tools (similarity search,
+    deduplication) that should not load it into RAM.
+    """
+    return np.load(path, mmap_mode="r")
+
+
+def append_rows(path, vectors):
+    """
+    Appends float32 rows to the `.npy` matrix at `path` in place and returns the
+    row number of the first one. The rows are written after the existing data
+    and synced before the header's shape is rewritten, so an interrupted append
+    leaves the stored rows intact. Matrices whose header has no room for the
+    larger shape are rewritten once through a copy.
+    """
+    with open(path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        if fortran_order or dtype != vectors.dtype or shape[1:] != vectors.shape[1:]:
+            raise ValueError(
+                f"Cannot append {vectors.dtype} rows of shape {vectors.shape[1:]} "
+                f"to '{path}' ({dtype} {shape})"
+            )
+        data_offset = f.tell()
+        start = shape[0]
+        f.seek(data_offset + start * vectors[0].nbytes)
+        f.write(vectors.tobytes())
+        # Drop rows left over from an append that was interrupted before its header
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+
+        header = io.BytesIO()
+        header_fields = {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (start + len(vectors),) + shape[1:],
+        }
+        if version == (1, 0):
+            np.lib.format.write_array_header_1_0(header, header_fields)
+        else:
+            np.lib.format.write_array_header_2_0(header, header_fields)
+        if len(header.getvalue()) == data_offset:
+            f.seek(0)
+            f.write(header.getvalue())
+            f.flush()
+            os.fsync(f.fileno())
+            return start
+
+    # The header has no spare room (older numpy): rewrite the matrix once; numpy
+    # pads new headers so the shape can grow in place from then on
+    rewrite_with_rows(path, start, vectors)
+    return start
+
+
+def rewrite_with_rows(path, rows, vectors):
+    """
+    Copies the first `rows` rows of the matrix at `path` plus `vectors` into a new
+    file that replaces it.
+    """
+    old = open_matrix(path)
+    tmp_path = path + ".tmp"
+    matrix = np.lib.format.open_memmap(
+        tmp_path,
+        mode="w+",
+        dtype="float32",
+        shape=(rows + len(vectors),) + old.shape[1:],
+    )
+    for offset in range(0, rows, COPY_CHUNK_ROWS):
+        end = min(offset + COPY_CHUNK_ROWS, rows)
+        matrix[offset:end] = old[offset:end]
+    matrix[rows:] = vectors
+    matrix.flush()
+    del matrix, old
+    os.replace(tmp_path, path)
+
+
+def load_index(path=DEFAULT_INDEX_FILE):
+    """
+    Reads the sidecar index as a DataFrame with article_uuid, content_hash and row.
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame(
+            {
+                "article_uuid": pd.Series(dtype=str),
+                "content_hash": pd.Series(dtype=str),
+                "row": pd.Series(dtype="int64"),
+            }
+        )
+    return pd.read_csv(path, dtype={"article_uuid": str, "content_hash": str})
+
+
+class EmbeddingStore:
+    """
+    Persistent store of article embeddings: a float32 `.npy` matrix plus a sidecar
+    CSV mapping (article_uuid, content_hash) to a matrix row.
+
+    Vectors are only ever appended, so a crash between writing the matrix and the
+    index leaves at worst some unreferenced rows. A changed article gets a new row
+    and its index entry is repointed.
+    """
+
+    def __init__(self, matrix_path=DEFAULT_MATRIX_FILE, index_path=DEFAULT_INDEX_FILE):
+        self.matrix_path = matrix_path
+        self.index_path = index_path
+        index_df = load_index(index_path)
+        self.index = {
+            uuid: (digest, int(row))
+            for uuid, digest, row in zip(
+                index_df["article_uuid"], index_df["content_hash"], index_df["row"]
+            )
+        }
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup(self, article_uuids, hashes):
+        """
+        Returns the matrix row of each article, or -1 if it is missing or its
+        content hash has changed.
+        """
+        rows = []
+        for uuid, digest in zip(article_uuids, hashes):
+            entry = self.index.get(uuid)
+            rows.append(entry[1] if entry and entry[0] == digest else -1)
+        return np.asarray(rows, dtype="int64")
+
+    def add(self, article_uuids, hashes, vectors):
+        """
+        Appends vectors to the matrix and points the index entries at them.
+        """
+        vectors = np.asarray(vectors, dtype="float32")
+        if len(vectors) == 0:
+            return
+        if os.path.exists(self.matrix_path):
+            start = append_rows(self.matrix_path, vectors)
+        else:
+            start = 0
+            np.save(self.matrix_path, vectors)
+
+        for i, (uuid, digest) in enumerate(zip(article_uuids, hashes)):
+            self.index[uuid] = (digest, start + i)
+        self.save_index()
+
+    def save_index(self):
+        index_df = pd.DataFrame(
+            [(uuid, digest, row) for uuid, (digest, row) in self.index.items()],
+            columns=["article_uuid", "content_hash", "row"],
+        )
+        tmp_path = self.index_path + ".tmp"
+        index_df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.index_path)
+
+    def vectors_for(self, article_uuids, hashes, embed_fn):
+        """
+        Returns a float32 matrix with one row per article. Only articles that are
+        new or changed are passed to `embed_fn` (a list of positions -> vectors),
+        and their vectors are stored for later runs.
+        """
+        article_uuids = list(article_uuids)
+        hashes = list(hashes)
+        rows = self.lookup(article_uuids, hashes)
+
+        missing = {}
+        for i in np.flatnonzero(rows == -1):
+            missing.setdefault(article_uuids[i], i)
+        metrics.get_metrics().inc(
+            "embedding_store_lookups_total", len(rows) - len(missing), result="hit"
+        )
+        metrics.get_metrics().inc(
+            "embedding_store_lookups_total", len(missing), result="miss"
+        )
+        if missing:
+            positions = list(missing.values())
+            print(
+                f"Embedding {len(positions)} new or changed articles "
+                f"({len(article_uuids) - int((rows == -1).sum())} reused from store)."
+            )
+            self.add(
+                [article_uuids[i] for i in positions],
+                [hashes[i] for i in positions],
+                embed_fn(positions),
+            )
+            rows = self.lookup(article_uuids, hashes)
+
+        if len(rows) == 0:
+            return np.empty((0, 0), dtype="float32")
+        vectors = np.asarray(open_matrix(self.matrix_path)[rows], dtype="float32")
+        # The same article_uuid twice with different text: embed the extra versions
+        # directly rather than storing them
+        unresolved = np.flatnonzero(rows == -1)
+        if len(unresolved):
+            vectors[unresolved] = embed_fn(list(unresolved))
+        return vectors
@@ -0,0 +1,156 @@
+"""
+Evaluates the fused single-call classifier against the two-stage path on a labelled
+sample: relevance agreement (accuracy, precision, recall, Cohen's kappa) and goal
+agreement (top-1 match and top-3 overlap on articles both paths find relevant).
+
+The reference labels are the stored two-stage classifications (`is_sustain`,
+`top 1`..`top 3`) of a CSV/Parquet sample, or of the research outputs store by
+default. With --rerun-reference the two-stage path is run live on the sample too.
+
+Usage:
+    python eval_fused.py --sample 200
+    python eval_fused.py --labels labelled_sample.csv --rerun-reference
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+import determine
+import storage
+
+TOP_COLUMNS = ["top 1", "top 2", "top 3"]
+DISAGREEMENTS_FILE = "fused_eval_disagreements.csv"
+
+
+def load_labels(path=None, sample=200, seed=0):
+    """
+    Loads labelled articles (title, abstract and the SDG columns) and draws a sample
+    of at most `sample` unique articles.
+    """
+    if path is None:
+        df = storage.read_research_outputs(
+            columns=["article_uuid", "title", "abstract", "is_sustain"] + TOP_COLUMNS
+        )
+    elif path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    df = df.dropna(subset=["is_sustain"])
+    if "article_uuid" in df.columns:
+        df = df.drop_duplicates(subset="article_uuid")
+    df = df.sample(n=min(sample, len(df)), random_state=seed)
+    return df.reset_index(drop=True)
+
+
+def goal_sets(df):
+    return [
+        {int(goal) for goal in row if pd.notna(goal) and int(goal) != 0}
+        for row in df[TOP_COLUMNS].itertuples(index=False)
+    ]
+
+
+def agreement(reference, candidate):
+    """
+    Compares two classified frames (same rows, same order) and returns the metrics.
+    """
+    ref = reference["is_sustain"].astype(int).to_numpy()
+    cand = candidate["is_sustain"].astype(int).to_numpy()
+    n = len(ref)
+    true_pos = int(((ref == 1) & (cand == 1)).sum())
+    observed = float((ref == cand).mean()) if n else 0.0
+    expected = (
+        (ref.mean() * cand.mean() + (1 - ref.mean()) * (1 - cand.mean())) if n else 0.0
+    )
+
+    both = (ref == 1) & (cand == 1)
+    ref_goals, cand_goals = goal_sets(reference), goal_sets(candidate)
+    ref_top1 = reference["top 1"].fillna(0).astype(int).to_numpy()
+    cand_top1 = candidate["top 1"].fillna(0).astype(int).to_numpy()
+    overlaps = [
+        len(ref_goals[i] & cand_goals[i]) / len(ref_goals[i] | cand_goals[i])
+        for i in range(n)
+        if both[i] and (ref_goals[i] | cand_goals[i])
+    ]
+    return {
+        "articles": n,
+        "relevance_accuracy": round(observed, 4),
+        "relevance_precision": round(true_pos / max(int((cand == 1).sum()), 1), 4),
+        "relevance_recall": round(true_pos / max(int((ref == 1).sum()), 1), 4),
+        "cohen_kappa": (
+            round(float((observed - expected) / (1 - expected)), 4)
+            if expected < 1
+            else 1.0
+        ),
+        "both_relevant": int(both.sum()),
+        "top1_agreement": (
+            round(float((ref_top1[both] == cand_top1[both]).mean()), 4)
+            if both.any()
+            else None
+        ),
+        "top3_jaccard": round(sum(overlaps) / len(overlaps), 4) if overlaps else None,
+    }
+
+
+def disagreements(reference, candidate):
+    """
+    Rows where relevance or the top-1 goal differ, with both answers side by side.
+    """
+    columns = ["is_sustain"] + TOP_COLUMNS
+    merged = reference.drop(columns=columns).copy()
+    for column in columns:
+        merged[f"{column} (two-stage)"] = reference[column].to_numpy()
+        merged[f"{column} (fused)"] = candidate[column].to_numpy()
+    differs = (
+        reference["is_sustain"].to_numpy() != candidate["is_sustain"].to_numpy()
+    ) | (
+        reference["top 1"].fillna(0).to_numpy()
+        != candidate["top 1"].fillna(0).to_numpy()
+    )
+    return merged.loc[differs].drop(columns=["abstract"], errors="ignore")
+
+
+def run(labels=None, sample=200, seed=0, rerun_reference=False):
+    reference = load_labels(labels, sample, seed)
+    inputs = reference[["title", "abstract"]].copy()
+    if "article_uuid" in reference.columns:
+        inputs["article_uuid"] = reference["article_uuid"]
+    print(f"Evaluating fused classifier on {len(reference)} labelled articles...")
+
+    timings = {}
+    if rerun_reference:
+        start = time.perf_counter()
+        reference = determine.determine_relevant_goals(
+            determine.classify_sdg_relevance(inputs.copy(), use_cache=False),
+            use_cache=False,
+        )
+        timings["two_stage_seconds"] = round(time.perf_counter() - start, 2)
+    start = time.perf_counter()
+    fused = determine.classify_sdg_fused(inputs.copy(), use_cache=False)
+    timings["fused_seconds"] = round(time.perf_counter() - start, 2)
+
+    metrics = agreement(reference, fused)
+    metrics.update(timings)
+    disagreements(reference, fused).to_csv(DISAGREEMENTS_FILE, index=False)
+    return metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--labels", help="CSV/Parquet sample with title, abstract and SDG columns"
+    )
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--rerun-reference",
+        action="store_true",
+        help="Run the two-stage path live on the sample instead of using stored labels",
+    )
+    args = parser.parse_args()
+
+    metrics = run(args.labels, args.sample, args.seed, args.rerun_reference)
+    for name, value in metrics.items():
+        print(f"{name}: {value}")
+    print(f"Disagreements written to '{DISAGREEMENTS_FILE}'.")
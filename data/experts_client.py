@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from scheduler import AdaptiveScheduler, parse_retry_after
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+# Point EXPERTS_API_URL at a local stub server to run without the live API
+BASE_URL = os.getenv("EXPERTS_API_URL", "https://experts.illinois.edu/ws/api/524")
+DEFAULT_POOL_SIZE = 16
+DEFAULT_TIMEOUT = 60
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Responses slower than this (seconds) slow the scheduler down
+LATENCY_TARGET = 10.0
+
+
+class ExpertsClient:
+    """
+    Thread-safe Experts API client on a pooled keep-alive `requests.Session`.
+
+    Requests are paced by an adaptive scheduler (see scheduler.py) that slows down on
+    throttling, errors and rate-limit headers, and pauses the run when the API keeps
+    failing. Throttled (429) and transient 5xx responses are retried, honouring
+    Retry-After when the server sends it. Every request's latency is recorded so a
+    run can report per-request stats.
+    """
+
+    def __init__(
+        self,
+        api_key="",
+        base_url=BASE_URL,
+        pool_size=DEFAULT_POOL_SIZE,
+        max_retries=5,
+        backoff=1.0,
+        max_backoff=60.0,
+        timeout=DEFAULT_TIMEOUT,
+        scheduler=None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.scheduler = scheduler or AdaptiveScheduler(
+            "experts",
+            latency_target=LATENCY_TARGET,
+            backoff=backoff,
+            max_backoff=max_backoff,
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.retries = 0
+        self.throttled = 0
+
+    def request(self, method, path, params=None, **kwargs):
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        params = dict(params or {})
+        params.setdefault("apiKey", self.api_key)
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            self.scheduler.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, params=params, **kwargs)
+            except requests.RequestException as e:
+                self._record(time.perf_counter() - start)
+                self.scheduler.record_failure()
+                if attempt == self.max_retries:
+                    # Earlier attempts are only counted, as retries
+                    print(
+                        f"Request to {url} failed after {attempt + 1} attempts ({e})."
+                    )
+                    raise
+                self._count_retry()
+                continue
+            latency = time.perf_counter() - start
+            self._record(latency)
+            self.scheduler.update_from_headers(response.headers)
+
+            if response.status_code == 429:
+                with self.lock:
+                    self.throttled += 1
+                metrics.get_metrics().inc("http_throttled_total", service="experts")
+                self.scheduler.record_throttle(
+                    parse_retry_after(response.headers.get("Retry-After"))
+                )
+            elif response.status_code in RETRY_STATUSES:
+                self.scheduler.record_failure()
+            else:
+                self.scheduler.record_success(latency)
+                return response
+            if attempt == self.max_retries:
+                print(
+                    f"Request to {url} failed after {attempt + 1} attempts "
+                    f"(HTTP {response.status_code})."
+                )
+                return response
+            # The scheduler holds the next attempt back for the backoff
+            self._count_retry()
+
+    def get(self, path, params=None, **kwargs):
+        return self.request("GET", path, params=params, **kwargs)
+
+    def post(self, path, params=None, **kwargs):
+        return self.request("POST", path, params=params, **kwargs)
+
+    def _record(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+        metrics.get_metrics().observe(
+            "http_request_seconds", latency, service="experts"
+        )
+
+    def _count_retry(self):
+        with self.lock:
+            self.retries += 1
+        metrics.get_metrics().inc("http_retries_total", service="experts")
+
+    def latency_stats(self):
+        """
+        Returns request count, retry counts and latency percentiles in seconds.
+        """
+        with self.lock:
+            latencies = sorted(self.latencies)
+            retries = self.retries
+            throttled = self.throttled
+        stats = {"requests": len(latencies), "retries": retries, "throttled": throttled}
+        if latencies:
+
+            def percentile(p):
+                return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+            stats.update(
+                {
+                    "mean": sum(latencies) / len(latencies),
+                    "p50": percentile(0.50),
+                    "p95": percentile(0.95),
+                    "max": latencies[-1],
+                }
+            )
+        return stats
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,179 @@
+"""
+Parses the faculty directory listing (`table.results`) into columns.
+
+Only the results table is handed to the HTML parser: it is cut out of the page
+source first, so the navigation, scripts and footer around it are never parsed.
+Each row is walked once, and the values are appended straight to per-column lists.
+The parser backend is pluggable: selectolax or lxml when installed, BeautifulSoup
+otherwise (set FACULTY_PARSER_BACKEND to force one).
+"""
+
+import importlib.util
+import os
+import re
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+# In order of preference
+BACKENDS = ["selectolax", "lxml", "bs4"]
+PARSER_BACKEND = os.getenv("FACULTY_PARSER_BACKEND")
+FACULTY_COLUMNS = ["name", "department", "description", "contact", "url"]
+
+RESULTS_TABLE_START = re.compile(
+    r"<table\b[^>]*\bclass\s*=\s*[\"'][^\"']*\bresults\b[^\"']*[\"'][^>]*>", re.I
+)
+TABLE_TAG = re.compile(r"<(/?)table\b", re.I)
+
+
+def available_backends():
+    return [name for name in BACKENDS if importlib.util.find_spec(name) is not None]
+
+
+def default_backend():
+    if PARSER_BACKEND:
+        return PARSER_BACKEND
+    return available_backends()[0]
+
+
+def extract_results_table(html):
+    """
+    Returns the source of the first `table.results` element (nested tables
+    included), or None if the page has none.
+    """
+    start = RESULTS_TABLE_START.search(html)
+    if not start:
+        return None
+    depth = 0
+    for tag in TABLE_TAG.finditer(html, start.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[start.start() : html.index(">", tag.end()) + 1]
+    # Unclosed table: let the parser close it at the end of the page
+    return html[start.start() :]
+
+
+def _append_row(columns, first_texts, url, department, contact):
+    """
+    Appends one row given the text nodes and first link of the name cell, the
+    department text and the contact link text (None when the cell has no link).
+    """
+    # Name and description are the first two text nodes of the first cell
+    name_description = "|".join(first_texts).split("|")
+    columns["name"].append(name_description[0].strip())
+    columns["description"].append(
+        name_description[1].strip()
+        if len(name_description) > 1
+        else "Description not found"
+    )
+    columns["department"].append(department)
+    columns["contact"].append(contact if contact is not None else "Contact not found")
+    columns["url"].append(url if url is not None else "URL not found")
+
+
+def _parse_selectolax(table_html, columns):
+    from selectolax.parser import HTMLParser
+
+    table = HTMLParser(table_html).css_first("table.results")
+    tbody = table.css_first("tbody") if table else None
+    if tbody is None:
+        return
+    rows = tbody.css("tr")
+    if rows and rows[0].css_first("th") is not None:
+        rows = rows[1:]
+    for row in rows:
+        cells = row.css("td")
+        if len(cells) < 4:
+            continue
+        first_texts = []
+        url = None
+        for node in cells[0].traverse(include_text=True):
+            if node.tag == "-text":
+                first_texts.append(node.text_content)
+            elif node.tag == "a" and url is None:
+                url = node.attributes.get("href")
+        link = cells[3].css_first("a")
+        _append_row(
+            columns,
+            first_texts,
+            url,
+            cells[1].text(strip=True),
+            link.text(strip=True) if link is not None else None,
+        )
+
+
+def _stripped_text(element):
+    return "".join(text.strip() for text in element.itertext())
+
+
+def _parse_lxml(table_html, columns):
+    import lxml.html
+
+    table = lxml.html.fragment_fromstring(table_html)
+    tbody = table.find(".//tbody")
+    if tbody is None:
+        return
+    rows = list(tbody.iter("tr"))
+    if rows and rows[0].find(".//th") is not None:
+        rows = rows[1:]
+    for row in rows:
+        cells = list(row.iter("td"))
+        if len(cells) < 4:
+            continue
+        first_link = next(cells[0].iter("a"), None)
+        contact_link = next(cells[3].iter("a"), None)
+        _append_row(
+            columns,
+            list(cells[0].itertext()),
+            first_link.get("href") if first_link is not None else None,
+            _stripped_text(cells[1]),
+            _stripped_text(contact_link) if contact_link is not None else None,
+        )
+
+
+def _parse_bs4(table_html, columns):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(
+        table_html,
+        "html.parser",
+        parse_only=SoupStrainer("table", class_="results"),
+    )
+    table = soup.find("table")
+    tbody = table.find("tbody") if table else None
+    if tbody is None:
+        return
+    rows = tbody.find_all("tr")
+    if rows and rows[0].find("th") is not None:
+        rows = rows[1:]
+    for row in rows:
+        cells = row.find_all("td")
+        if len(cells) < 4:
+            continue
+        first_link = cells[0].find("a")
+        contact_link = cells[3].find("a")
+        _append_row(
+            columns,
+            list(cells[0].strings),
+            first_link.get("href") if first_link is not None else None,
+            cells[1].get_text(strip=True),
+            contact_link.get_text(strip=True) if contact_link is not None else None,
+        )
+
+
+PARSERS = {"selectolax": _parse_selectolax, "lxml": _parse_lxml, "bs4": _parse_bs4}
+
+
+def parse_faculty_table(html, backend=None):
+    """
+    Parses the faculty rows of the `table.results` listing in `html`.
+    Returns:
+        {column: list of values} for FACULTY_COLUMNS, or None if the page has no
+        listing.
+    """
+    table_html = extract_results_table(html)
+    if table_html is None:
+        return None
+    columns = {column: [] for column in FACULTY_COLUMNS}
+    PARSERS[backend or default_backend()](table_html, columns)
+    return columns
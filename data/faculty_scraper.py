@@ -0,0 +1,214 @@
+"""
+Scrapes the Gies faculty directory.
+
+The listing is first fetched over plain HTTP (with If-None-Match) and its
+`table.results` parsed directly (see faculty_parser); only when that page does not
+carry the listing is a headless Chrome driven through the pagination and display
+selects, using explicit waits. The parsed directory is cached with the page's ETag and content hash, so an
+unchanged page is never parsed twice.
+
+Usage:
+    python faculty_scraper.py
+    python faculty_scraper.py --fixture fixtures/faculty_profiles.html
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import pandas as pd
+import requests
+
+import faculty_parser
+import metrics
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+FACULTY_PROFILES_URL = (
+    "https://giesbusiness.illinois.edu/faculty-research/faculty-profiles"
+)
+DIRECTORY_CACHE_FILE = "faculty_directory_cache.json"
+HTTP_TIMEOUT = 30
+# Explicit wait limit for the browser fallback
+PAGE_LOAD_TIMEOUT = 30
+# How often the browser fallback re-checks whether the listing has settled
+ROW_POLL_INTERVAL = 0.5
+# Fewer rows than this on the static page means the listing is rendered client-side
+MIN_STATIC_ROWS = 100
+
+
+def content_hash(html):
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def load_directory_cache(path=DIRECTORY_CACHE_FILE):
+    """
+    Returns {"etag", "content_hash", "source", "records"} or None if nothing cached.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_directory_cache(cache, path=DIRECTORY_CACHE_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def parse_cached(html, cache, source, etag=None):
+    """
+    Parses `html` unless its content hash matches the cache, in which case the cached
+    records are returned. Returns (records, cache entry for this page).
+    """
+    digest = content_hash(html)
+    if cache and cache.get("content_hash") == digest:
+        print(f"Faculty directory unchanged ({source}); using cached records.")
+        return cache["records"], dict(cache, etag=etag or cache.get("etag"))
+    records = faculty_parser.parse_faculty_table(html)
+    entry = {
+        "etag": etag,
+        "content_hash": digest,
+        "source": source,
+        "records": records,
+    }
+    return records, entry
+
+
+@metrics.timed
+def fetch_directory_http(url=FACULTY_PROFILES_URL, cache=None, session=None):
+    """
+    Fast path: fetches the listing page over HTTP, sending the cached ETag.
+    Returns (records, cache entry), with records None if the page does not carry
+    a usable listing (for example when it is rendered by JavaScript).
+    """
+    session = session or requests.Session()
+    headers = {}
+    if cache and cache.get("source") == "http" and cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    response = session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    if response.status_code == 304:
+        print("Faculty directory not modified (ETag); using cached records.")
+        return cache["records"], cache
+    response.raise_for_status()
+
+    records, entry = parse_cached(
+        response.text, cache, "http", etag=response.headers.get("ETag")
+    )
+    if records is None or len(records["name"]) < MIN_STATIC_ROWS:
+        return None, None
+    return records, entry
+
+
+class RowsSettled:
+    """
+    Wait condition: the results table is present and its row count is the same on
+    two consecutive polls (the listing has finished re-rendering). Returns the count.
+    """
+
+    def __init__(self, by, selector):
+        self.by = by
+        self.selector = selector
+        self.last_count = None
+
+    def __call__(self, driver):
+        count = len(driver.find_elements(self.by, self.selector))
+        settled = count > 0 and count == self.last_count
+        self.last_count = count
+        return count if settled else False
+
+
+def scrape_faculty_profiles(driver):
+    """
+    Shows the whole listing as a table in the browser and returns the page source.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import Select, WebDriverWait
+
+    wait = WebDriverWait(driver, PAGE_LOAD_TIMEOUT, poll_frequency=ROW_POLL_INTERVAL)
+
+    # Wait for and set the pagination dropdown to show more results
+    select_pagination = wait.until(
+        EC.element_to_be_clickable((By.ID, "pagination-top"))
+    )
+    Select(select_pagination).select_by_value("999")
+
+    # Wait for and set the display type to "list"
+    select_display_type = wait.until(
+        EC.element_to_be_clickable((By.ID, "display-type"))
+    )
+    Select(select_display_type).select_by_value("list")
+
+    # Wait until the table has re-rendered with the new settings
+    rows = wait.until(RowsSettled(By.CSS_SELECTOR, "table.results tbody tr"))
+    print(f"Faculty listing rendered with {rows} rows.")
+    return driver.page_source
+
+
+@metrics.timed
+def fetch_directory_selenium(url=FACULTY_PROFILES_URL, cache=None):
+    """
+    Fallback: renders the listing in headless Chrome. The driver binary is resolved
+    by Selenium Manager (bundled with Selenium), so nothing is downloaded per run.
+    Returns (records, cache entry).
+    """
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get(f"{url}#page-1")
+        html = scrape_faculty_profiles(driver)
+    finally:
+        driver.quit()
+    return parse_cached(html, cache, "selenium")
+
+
+@metrics.timed
+def scrape_faculty_directory(
+    url=FACULTY_PROFILES_URL, cache_path=DIRECTORY_CACHE_FILE, session=None
+):
+    """
+    Scrapes the faculty directory (HTTP fast path, then headless browser) and
+    returns it as a pandas DataFrame.
+    """
+    cache = load_directory_cache(cache_path)
+    try:
+        records, entry = fetch_directory_http(url, cache, session)
+    except requests.RequestException as e:
+        print(f"HTTP fetch of the faculty directory failed: {e}")
+        records, entry = None, None
+    if records is None:
+        print("No static faculty listing; falling back to headless Chrome.")
+        records, entry = fetch_directory_selenium(url, cache)
+    if records is None:
+        raise RuntimeError(f"No faculty listing found at {url}.")
+    if entry is not cache:
+        save_directory_cache(entry, cache_path)
+    return pd.DataFrame(records, columns=faculty_parser.FACULTY_COLUMNS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixture", help="Parse a saved listing page instead")
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture) as f:
+            df = pd.DataFrame(
+                faculty_parser.parse_faculty_table(f.read()),
+                columns=faculty_parser.FACULTY_COLUMNS,
+            )
+    else:
+        df = scrape_faculty_directory()
+    print(f"{len(df)} faculty profiles")
+    print(df.head().to_string())
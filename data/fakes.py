@@ -0,0 +1,282 @@
+"""
+Offline stand-ins for benchmarks: a deterministic fake chat model and embeddings that
+plug into the existing determine chains, and synthetic dataset generators.
+
+The fake chat model recognises the relevance, goal, fused and batched prompts and
+answers in their JSON formats. Relevance is a stable hash of the article title, and
+the chosen goals are the first one to three candidates offered in the prompt, so
+every classification mode agrees with the others article by article.
+
+Usage (in a benchmark):
+    fakes.install_fakes(latency=0.2)
+    determine.classify_articles(fakes.make_articles(1000), mode="fused")
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+FAKE_MODEL_NAME = "fake-chat"
+# Share of synthetic articles the fake model calls relevant
+DEFAULT_RELEVANCE_RATE = 0.3
+# Dimension of text-embedding-3-large, which the SDG index was built with
+EMBEDDING_DIM = 3072
+DEPARTMENTS = ["Finance", "Accountancy", "Business Administration"]
+
+TITLE_LINE = re.compile(r"^title: (.*)$", re.M)
+BATCH_ARTICLE = re.compile(r"^article_uuid: (\S+)\ntitle: (.*)$", re.M)
+GOAL_ENTRY = re.compile(r"^Goal (\d+):", re.M)
+CLOSEST_GOALS = re.compile(r"most similar first\): (.*)$", re.M)
+
+
+def stable_fraction(text):
+    """
+    A number in [0, 1) that depends only on `text`.
+    """
+    digest = hashlib.md5(text.encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) / 16**8
+
+
+def fake_relevance(title, relevance_rate=DEFAULT_RELEVANCE_RATE):
+    return int(stable_fraction(title) < relevance_rate)
+
+
+def fake_goals(title, candidates):
+    """
+    The first one to three candidate goals, as many as the title's hash decides.
+    """
+    count = 1 + int(stable_fraction(title[::-1]) * 3)
+    return [int(goal) for goal in candidates[:count]]
+
+
+def fake_answer(prompt, relevance_rate=DEFAULT_RELEVANCE_RATE):
+    """
+    The JSON answer to any of the classifier prompts.
+    """
+    batch = BATCH_ARTICLE.findall(prompt)
+    if batch:
+        return (
+            "["
+            + ", ".join(
+                '{"article_uuid": "%s", "result": %d}'
+                % (article_uuid, fake_relevance(title, relevance_rate))
+                for article_uuid, title in batch
+            )
+            + "]"
+        )
+    titles = TITLE_LINE.findall(prompt)
+    title = titles[-1] if titles else prompt
+    if "Candidate SDG Goals:" in prompt:
+        return '{"goals": %s}' % fake_goals(title, GOAL_ENTRY.findall(prompt))
+    closest = CLOSEST_GOALS.search(prompt)
+    is_sustain = fake_relevance(title, relevance_rate)
+    if closest:
+        candidates = re.findall(r"(\d+)(?: \(|,|$)", closest.group(1))
+        goals = fake_goals(title, candidates) if is_sustain else []
+        return '{"result": %d, "goals": %s}' % (is_sustain, goals)
+    return '{"result": %d}' % is_sustain
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model for the classifier chains. Each call waits `latency`
+    seconds and reports estimated token usage, so callbacks and metrics see it like
+    a real model.
+    """
+
+    latency: float = 0.0
+    relevance_rate: float = DEFAULT_RELEVANCE_RATE
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    def _result(self, messages):
+        prompt = "\n".join(str(message.content) for message in messages)
+        answer = fake_answer(prompt, self.relevance_rate)
+        usage = {
+            "prompt_tokens": max(1, len(prompt) // 4),
+            "completion_tokens": max(1, len(answer) // 4),
+        }
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=answer))],
+            llm_output={"token_usage": usage},
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic unit vectors of the SDG index's dimension, seeded by the text.
+    Each embed_documents call waits `latency` seconds.
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM, latency=0.0):
+        self.dim = dim
+        self.latency = latency
+
+    def _vector(self, text):
+        seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:16], 16)
+        vector = np.random.default_rng(seed).standard_normal(self.dim)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def install_fakes(latency=0.0, embedding_latency=0.0, relevance_rate=None):
+    """
+    Swaps the fake chat model and embeddings into determine's ClassifierService, so
+    every chain (and the SDG index, loaded with the fake embeddings) runs offline.
+    Returns the service.
+    """
+    import determine
+
+    service = determine.get_service()
+    service.model_name = FAKE_MODEL_NAME
+    # The index lives next to the code; benchmarks may run in a scratch directory
+    service.index_dir = os.path.join(
+        os.path.dirname(os.path.abspath(determine.__file__)), determine.FAISS_INDEX_DIR
+    )
+    service._components.clear()
+    service.timings.clear()
+    service.limiters.clear()
+    service.scheduler.reset()
+    service._components["llm"] = FakeChatModel(
+        latency=latency,
+        relevance_rate=(
+            DEFAULT_RELEVANCE_RATE if relevance_rate is None else relevance_rate
+        ),
+        callbacks=[determine.LLMMetricsHandler(FAKE_MODEL_NAME)],
+    )
+    service._components["embeddings"] = FakeEmbeddings(latency=embedding_latency)
+    return service
+
+
+# -------------------------------------------------------------------
+# Synthetic datasets
+# -------------------------------------------------------------------
+
+
+def make_articles(n, abstract_repeat=20):
+    """
+    Unclassified articles with article_uuid, title and abstract.
+    """
+    return pd.DataFrame(
+        {
+            "article_uuid": [f"article-{i:05d}" for i in range(n)],
+            "title": [f"Synthetic article {i}" for i in range(n)],
+            "abstract": [
+                f"Abstract text for article {i}. " * abstract_repeat for i in range(n)
+            ],
+        }
+    )
+
+
+def make_persons(n):
+    """
+    Merged faculty rows for `n` persons named like the stub Experts API's persons.
+    """
+    return pd.DataFrame(
+        {
+            "uuid": [f"person-{i}" for i in range(n)],
+            "name": [f"Person {i}" for i in range(n)],
+            "email": [f"user{i}@illinois.edu" for i in range(n)],
+            "department": [DEPARTMENTS[i % 2] for i in range(n)],
+            "active": [i % 5 != 0 for i in range(n)],
+        }
+    )
+
+
+def make_research_rows(n_rows, authors_per_article=3, unclassified=0.3, seed=0):
+    """
+    Synthetic person_research_outputs rows: each article appears once per co-author,
+    and a share of the author rows are missing their classification.
+    """
+    rng = np.random.default_rng(seed)
+    n_articles = max(1, n_rows // authors_per_article)
+    article_ids = rng.integers(0, n_articles, n_rows)
+    is_sustain = rng.integers(0, 2, n_rows).astype(float)
+    top = rng.integers(1, 18, (n_rows, 3)).astype(float)
+    top[is_sustain == 0] = 0
+    missing = rng.random(n_rows) < unclassified
+    is_sustain[missing] = np.nan
+    top[missing] = np.nan
+    return pd.DataFrame(
+        {
+            "person_uuid": [f"p{i % 500}" for i in range(n_rows)],
+            "article_uuid": [f"a{i}" for i in article_ids],
+            "title": [f"Title {i}" for i in article_ids],
+            "is_sustain": is_sustain,
+            "top 1": top[:, 0],
+            "top 2": top[:, 1],
+            "top 3": top[:, 2],
+        }
+    )
+
+
+def make_journals(n, seed=0):
+    """
+    A coded journals table (as read from journals.xlsx) with `n` journals.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "journal_title": [f"Journal of Synthetic Studies {i}" for i in range(n)],
+            "Financial Times": rng.integers(0, 2, n),
+            "UT Dallas": rng.integers(0, 2, n),
+            "General Business": rng.integers(0, 2, n),
+        }
+    )
+
+
+def make_journal_rows(n_rows, n_journals, variant_share=0.2, seed=0):
+    """
+    Research rows citing the synthetic journals. A share of the rows spell the title
+    with different case, punctuation or a typo, so the exact and fuzzy matchers both
+    have work to do; ISSNs are given for half of the journals.
+    """
+    rng = np.random.default_rng(seed)
+    # A quarter more journal ids than are coded, so some rows stay unmatched
+    journal_ids = rng.integers(0, n_journals + n_journals // 4, n_rows)
+    titles = []
+    for journal_id in journal_ids:
+        title = f"Journal of Synthetic Studies {journal_id}"
+        roll = rng.random()
+        if roll < variant_share / 2:
+            title = title.upper().replace(" OF ", " of the ")
+        elif roll < variant_share:
+            title = title.replace("Synthetic", "Synthetc")
+        titles.append(title)
+    return pd.DataFrame(
+        {
+            "journal_title": titles,
+            "journal_issn": [
+                f"{1000 + j:04d}-{j % 10000:04d}" if j % 2 == 0 else "N/A"
+                for j in journal_ids
+            ],
+        }
+    )
@@ -0,0 +1,60 @@
+"""
+Compiled field-path extraction for nested Experts API items.
+
+A field spec maps output columns to a dotted path into each item ("title.value",
+"publicationStatuses.0.publicationDate.year"; integer segments index lists) and a
+default used when any step of the path is missing. compile_extractor generates one
+Python function that walks every path for every item in a single loop and returns
+the values column by column, ready for a DataFrame.
+"""
+
+# A missing key, a short list or a None/non-container along the path
+LOOKUP_ERRORS = (KeyError, IndexError, TypeError, AttributeError)
+
+
+def parse_path(path):
+    """
+    Splits a dotted path into subscripts: digit segments become list indexes.
+    """
+    return [int(part) if part.isdigit() else part for part in path.split(".")]
+
+
+def compile_extractor(fields):
+    """
+    Compiles `fields` ({column: (path or callable, default)}) into a function
+    `extract(items)` returning {column: [value per item]}. A callable receives the
+    item and its result is used as is, falling back to the default on lookup errors.
+    """
+    columns = list(fields)
+    defaults = [fields[column][1] for column in columns]
+    getters = {}
+    lines = [
+        "def extract(items):",
+        f"    values = tuple([] for _ in range({len(columns)}))",
+    ]
+    for i in range(len(columns)):
+        lines.append(f"    append_{i} = values[{i}].append")
+    lines.append("    for item in items:")
+    for i, column in enumerate(columns):
+        path = fields[column][0]
+        if callable(path):
+            getters[f"getter_{i}"] = path
+            expression = f"getter_{i}(item)"
+        else:
+            expression = "item" + "".join(f"[{part!r}]" for part in parse_path(path))
+        lines += [
+            "        try:",
+            f"            append_{i}({expression})",
+            "        except LOOKUP_ERRORS:",
+            f"            append_{i}(defaults[{i}])",
+        ]
+    lines.append("    return values")
+
+    namespace = {"LOOKUP_ERRORS": LOOKUP_ERRORS, "defaults": defaults, **getters}
+    exec(compile("\n".join(lines), "<field_paths>", "exec"), namespace)
+    extract_values = namespace["extract"]
+
+    def extract(items):
+        return dict(zip(columns, extract_values(items)))
+
+    return extract
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+RANKING_COLUMNS = ["Financial Times", "UT Dallas", "General Business"]
+# Fuzzy match decisions, reused until journals.xlsx changes
+MATCH_CACHE_FILE = "journal_match_cache.json"
+# One row per distinct journal in the research outputs and how it was matched
+MATCH_REPORT_FILE = "journal_match_report.csv"
+# Minimum trigram Jaccard similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.85
+
+
+def normalize_journal_name(name):
+    """
+    Normalized matching key: ASCII-folded, lowercase, "&" spelled out, punctuation
+    removed, a leading "the" dropped and whitespace collapsed.
+    """
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    name = name.lower().replace("&", " and ")
+    name = re.sub(r"[^a-z0-9]+", " ", name).strip()
+    if name.startswith("the "):
+        name = name[4:]
+    return name
+
+
+def normalize_issn(value):
+    """
+    Returns the ISSN as NNNN-NNNC, or "" if the value is not a valid-looking ISSN.
+    """
+    if not isinstance(value, str):
+        return ""
+    digits = re.sub(r"[^0-9Xx]", "", value).upper()
+    if len(digits) != 8:
+        return ""
+    return f"{digits[:4]}-{digits[4:]}"
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyJournalIndex:
+    """
+    Trigram index over the normalized names of the coded journals. A query's trigram
+    overlap with every journal is counted from the postings of its trigrams, and only
+    journals that can still reach the threshold are scored: a Jaccard similarity of
+    at least threshold needs at least threshold * |query| shared trigrams and a
+    trigram count within a factor of threshold of the query's.
+    """
+
+    def __init__(self, keys, threshold=FUZZY_THRESHOLD):
+        self.keys = list(keys)
+        self.threshold = threshold
+        grams = [trigrams(key) for key in self.keys]
+        postings = {}
+        for i, journal_grams in enumerate(grams):
+            for gram in journal_grams:
+                postings.setdefault(gram, []).append(i)
+        self.postings = {
+            gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()
+        }
+        self.sizes = np.array([len(journal_grams) for journal_grams in grams])
+
+    def best_match(self, key):
+        """
+        Returns (journal key, similarity) of the closest coded journal that can reach
+        the threshold, or (None, 0.0).
+        """
+        query = trigrams(key)
+        hits = [self.postings[gram] for gram in query if gram in self.postings]
+        if not hits:
+            return None, 0.0
+        overlap = np.bincount(np.concatenate(hits), minlength=len(self.keys))
+        # The small tolerance keeps float rounding from dropping exact-threshold pairs
+        reachable = (
+            (overlap >= self.threshold * len(query) - 1e-9)
+            & (self.sizes >= self.threshold * len(query) - 1e-9)
+            & (self.sizes <= len(query) / self.threshold + 1e-9)
+        )
+        candidates = np.flatnonzero(reachable)
+        if not len(candidates):
+            return None, 0.0
+        shared = overlap[candidates]
+        scores = shared / (len(query) + self.sizes[candidates] - shared)
+        best = int(np.argmax(scores))
+        return self.keys[candidates[best]], float(scores[best])
+
+
+def load_match_cache(journals_hash, path=MATCH_CACHE_FILE):
+    """
+    Loads cached fuzzy decisions, discarding them if the coded journals changed.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        cache = json.load(f)
+    if cache.get("journals_hash") != journals_hash:
+        return {}
+    return cache.get("decisions", {})
+
+
+def save_match_cache(journals_hash, decisions, path=MATCH_CACHE_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"journals_hash": journals_hash, "decisions": decisions}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def match_journals(
+    research_df, journals_df, threshold=FUZZY_THRESHOLD, cache_path=MATCH_CACHE_FILE
+):
+    """
+    Matches every distinct journal of `research_df` (journal_title, journal_issn) to
+    the coded journals: by ISSN learned from name matches, then exact normalized
+    name, then fuzzy name match (cached between runs).
+
+    Returns the ranking columns aligned with `research_df` and a match report with
+    one row per distinct journal.
+    """
+    rankings = journals_df.copy()
+    rankings["journal_key"] = rankings["journal_title"].map(normalize_journal_name)
+    for column in RANKING_COLUMNS:
+        if column not in rankings.columns:
+            rankings[column] = 0
+        # Blank or text cells (e.g. "Y") become missing rather than failing the cast
+        rankings[column] = pd.to_numeric(rankings[column], errors="coerce").astype(
+            "Int64"
+        )
+    # Later rows win, as they did with the dict built from journals.xlsx
+    rankings = rankings.drop_duplicates("journal_key", keep="last").set_index(
+        "journal_key"
+    )
+
+    issn_column = (
+        research_df["journal_issn"]
+        if "journal_issn" in research_df.columns
+        else pd.Series("", index=research_df.index)
+    )
+    journals = pd.DataFrame(
+        {"journal_title": research_df["journal_title"], "journal_issn": issn_column}
+    )
+    distinct = (
+        journals.groupby(["journal_title", "journal_issn"], dropna=False)
+        .size()
+        .rename("articles")
+        .reset_index()
+    )
+    distinct["name_key"] = distinct["journal_title"].map(normalize_journal_name)
+    distinct["issn_key"] = distinct["journal_issn"].map(normalize_issn)
+
+    # ISSNs whose name matched exactly somewhere identify the journal everywhere
+    exact = distinct["name_key"].isin(rankings.index) & (distinct["name_key"] != "")
+    issn_map = (
+        distinct.loc[exact & (distinct["issn_key"] != "")]
+        .drop_duplicates("issn_key")
+        .set_index("issn_key")["name_key"]
+    )
+
+    journals_hash = hashlib.sha256(
+        pd.util.hash_pandas_object(
+            rankings[RANKING_COLUMNS].reset_index()
+        ).values.tobytes()
+    ).hexdigest()
+    cache = load_match_cache(journals_hash, cache_path)
+    fuzzy_index = None
+
+    matched, methods, scores = [], [], []
+    for name_key, issn_key, is_exact in zip(
+        distinct["name_key"], distinct["issn_key"], exact
+    ):
+        if issn_key and issn_key in issn_map.index:
+            matched.append(issn_map[issn_key])
+            methods.append("issn")
+            scores.append(1.0)
+        elif is_exact:
+            matched.append(name_key)
+            methods.append("exact")
+            scores.append(1.0)
+        elif not name_key:
+            matched.append(None)
+            methods.append("none")
+            scores.append(0.0)
+        else:
+            if name_key not in cache:
+                if fuzzy_index is None:
+                    fuzzy_index = FuzzyJournalIndex(rankings.index, threshold)
+                best, score = fuzzy_index.best_match(name_key)
+                cache[name_key] = {
+                    "journal": best if score >= threshold else None,
+                    "score": round(score, 4),
+                }
+            decision = cache[name_key]
+            matched.append(decision["journal"])
+            methods.append("fuzzy" if decision["journal"] else "none")
+            scores.append(decision["score"])
+    save_match_cache(journals_hash, cache, cache_path)
+
+    distinct["matched_journal"] = matched
+    distinct["method"] = methods
+    distinct["score"] = scores
+
+    # One keyed merge broadcasts the rankings to every article row
+    lookup = distinct.merge(
+        rankings[RANKING_COLUMNS],
+        left_on="matched_journal",
+        right_index=True,
+        how="left",
+    )
+    ranked = journals.merge(
+        lookup[["journal_title", "journal_issn", "matched_journal"] + RANKING_COLUMNS],
+        on=["journal_title", "journal_issn"],
+        how="left",
+    )
+    ranked.index = research_df.index
+    # Unmatched journals are unranked (0); a matched journal keeps its coded cells
+    ranked.loc[ranked["matched_journal"].isna(), RANKING_COLUMNS] = 0
+    ranked = ranked[RANKING_COLUMNS].astype("Int64")
+
+    report = distinct.drop(columns=["name_key", "issn_key"])
+    report["matched_journal"] = report["matched_journal"].map(rankings["journal_title"])
+    return ranked, report
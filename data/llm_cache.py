@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import metrics
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+DEFAULT_CACHE_FILE = "llm_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 200000
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 365
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(model, template_text, research_string):
+    """
+    Content address of one LLM call: model name, prompt template text and the
+    research string that fills it.
+    """
+    return text_hash("\x1f".join([model, template_text, research_string]))
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of parsed LLM outputs.
+
+    Entries are grouped by `namespace` (one per prompt) and remember the hash of
+    the template that produced them, so editing one prompt only drops that
+    prompt's entries. Old and least recently used entries are evicted once the
+    cache grows past `max_entries` / `max_bytes` or entries exceed `max_age_days`.
+    """
+
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_FILE,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        max_bytes=DEFAULT_MAX_BYTES,
+        max_age_days=DEFAULT_MAX_AGE_DAYS,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                template_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+        )
+        self.conn.commit()
+        self.evict()
+
+    def get(self, model, template_text, research_string):
+        key = make_key(model, template_text, research_string)
+        row = self.conn.execute(
+            "SELECT value FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            metrics.get_metrics().inc("llm_cache_lookups_total", result="miss")
+            return None
+        self.hits += 1
+        metrics.get_metrics().inc("llm_cache_lookups_total", result="hit")
+        self.conn.execute(
+            "UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key)
+        )
+        return json.loads(row[0])
+
+    def set(self, namespace, model, template_text, research_string, value):
+        key = make_key(model, template_text, research_string)
+        payload = json.dumps(value)
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                namespace,
+                text_hash(template_text),
+                model,
+                payload,
+                len(payload),
+                now,
+                now,
+            ),
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def invalidate_stale(self, namespace, template_text):
+        """
+        Deletes entries of `namespace` that were produced by a different template.
+        Returns the number of entries removed.
+        """
+        cursor = self.conn.execute(
+            "DELETE FROM entries WHERE namespace = ? AND template_hash != ?",
+            (namespace, text_hash(template_text)),
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def evict(self):
+        """
+        Applies the age limit, then drops least recently used entries until the
+        cache is within its entry and size limits.
+        """
+        cutoff = time.time() - self.max_age_days * 86400
+        self.conn.execute("DELETE FROM entries WHERE created < ?", (cutoff,))
+        count, total = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed ASC"
+            ).fetchall()
+            stale = []
+            for key, size in rows:
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                count -= 1
+                total -= size
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+        self.conn.commit()
+
+    def stats(self):
+        """
+        Returns hit/miss counters for this session and the lifetime totals.
+        """
+        totals = dict(self.conn.execute("SELECT name, value FROM stats").fetchall())
+        count, total = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "total_hits": totals.get("hits", 0) + self.hits,
+            "total_misses": totals.get("misses", 0) + self.misses,
+            "entries": count,
+            "bytes": total,
+        }
+
+    def flush_stats(self):
+        """
+        Adds this session's counters to the persisted totals and resets them.
+        """
+        for name, value in (("hits", self.hits), ("misses", self.misses)):
+            self.conn.execute(
+                "INSERT INTO stats VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, value),
+            )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self.flush_stats()
+        self.evict()
+        self.conn.close()
+
+
+_cache = None
+
+
+def get_cache(path=None):
+    """
+    Returns the process-wide cache, opening it on first use.
+    The location can be overridden with the LLM_CACHE_FILE environment variable.
+    """
+    global _cache
+    if _cache is None:
+        _cache = LLMCache(path or os.getenv("LLM_CACHE_FILE", DEFAULT_CACHE_FILE))
+        # Lifetime hit totals and the cache size, read when the run report is written
+        metrics.get_metrics().register_collector("llm_cache", _cache.stats)
+    return _cache
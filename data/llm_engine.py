@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+# -------------------------------------------------------------------
+# Default client-side limits (override per call as needed)
+# -------------------------------------------------------------------
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200000
+
+
+def estimate_tokens(text):
+    """
+    Rough token estimate for rate limiting (about 4 characters per token).
+    """
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills at
+    `rate` tokens per second. `acquire` waits until enough tokens are available.
+    A bucket keeps its level across event loops, so one can be shared by several
+    run_chain calls.
+    """
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = None
+        self.loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        # Requests larger than the bucket would wait forever, so cap them
+        amount = min(float(amount), self.capacity)
+        # asyncio locks belong to one loop, and each run_chain starts a new one
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.lock = asyncio.Lock()
+            self.loop = loop
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Combines a requests-per-minute bucket and a tokens-per-minute bucket.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+    ):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+
+    async def acquire(self, tokens):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+
+async def run_chain_async(
+    invoke,
+    inputs,
+    token_counts=None,
+    concurrency=DEFAULT_CONCURRENCY,
+    requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+    tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+    limiter=None,
+):
+    """
+    Runs the coroutine function `invoke` over every item of `inputs` with at most
+    `concurrency` requests in flight, throttled by `limiter` (a RateLimiter shared
+    between calls), or by a new limiter with the given per-minute limits.
+    Returns a list aligned with `inputs`; failed items hold the raised exception.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    if limiter is None:
+        limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    if token_counts is None:
+        token_counts = [1] * len(inputs)
+
+    async def worker(item, tokens):
+        async with semaphore:
+            await limiter.acquire(tokens)
+            try:
+                return await invoke(item)
+            except Exception as e:
+                return e
+
+    return await asyncio.gather(
+        *(worker(item, tokens) for item, tokens in zip(inputs, token_counts))
+    )
+
+
+def run_chain(invoke, inputs, **kwargs):
+    """
+    Synchronous wrapper around `run_chain_async` for the pipeline scripts.
+    """
+    return asyncio.run(run_chain_async(invoke, inputs, **kwargs))
@@ -1,17 +1,29 @@
+import argparse
+import functools
 import os
+import time
 import pandas as pd
+import aggregates
 import data
-import determine
+import metrics
+import progress_journal
+import storage
 
+# Pipeline stages in run order (used for resuming and checkpoints)
+STAGES = ["faculty", "research", "sdg", "rankings", "aggregates"]
+FACULTY_FILE = "merged_output.csv"
+JOURNALS_FILE = "journals.xlsx"
 
-def update_merged_faculty():
+
+@metrics.timed
+def update_merged_faculty(persist=True):
     # Get new merged data from API+Selenium
     new_merged_df = data.combine_api_and_selenium(return_df=True)
 
     # Add active status to new data
     new_merged_df["active"] = True
 
-    output_file = "merged_output.csv"
+    output_file = FACULTY_FILE
 
     if os.path.exists(output_file):
         existing_df = pd.read_csv(output_file)
@@ -31,18 +43,60 @@ def update_merged_faculty():
         ]
 
         # Combine existing (with updated active status) and new faculty
-        combined_df = pd.concat([existing_df, new_faculty])
+        combined_df = pd.concat([existing_df, new_faculty], ignore_index=True)
     else:
         combined_df = new_merged_df
 
-    combined_df.to_csv(output_file, index=False)
-    print(f"Updated merged faculty data saved to '{output_file}'.")
+    if persist:
+        combined_df.to_csv(output_file, index=False)
+        print(f"Updated merged faculty data saved to '{output_file}'.")
     return combined_df
 
 
-def update_research_outputs():
-    new_research_df = data.fetch_and_process_research_outputs(return_df=True)
-    faculty_df = pd.read_csv("merged_output.csv")
+def load_research_sync_state(incremental=True):
+    """
+    Returns the incremental sync marks, or an empty state (full fetch) when
+    incremental sync is off or there is no existing dataset to append to.
+    """
+    if incremental and storage.research_outputs_exist():
+        return data.load_sync_state()
+    return {}
+
+
+@metrics.timed
+def update_research_outputs(
+    incremental=True, faculty_df=None, sync_state=None, persist=True, return_df=True
+):
+    """
+    Fetches research outputs and appends genuinely new articles to the dataset.
+    With `incremental`, persons synced before only fetch outputs modified since their
+    last high-water mark; a full fetch is done when there is no existing dataset.
+
+    `faculty_df` defaults to the merged faculty file. With `persist=False` nothing is
+    written, and a caller-supplied `sync_state` must be saved by the caller once the
+    results are stored.
+
+    Without `return_df`, a full fetch into an empty dataset is streamed straight into
+    the stores in bounded batches (see data.stream_research_outputs) and None is
+    returned. Updates of an existing dataset are merged with it in memory.
+    """
+    if sync_state is None:
+        sync_state = load_research_sync_state(incremental)
+    print(f"Incremental sync marks found for {len(sync_state)} persons.")
+
+    if faculty_df is None:
+        faculty_df = pd.read_csv(FACULTY_FILE)
+
+    if not return_df and persist and not storage.research_outputs_exist():
+        # Nothing to merge with: stream the full fetch into the stores
+        data.stream_research_outputs(faculty_df, sync_state=sync_state)
+        data.save_sync_state(sync_state)
+        return None
+
+    existing_df = storage.read_research_outputs()
+    new_research_df = data.fetch_and_process_research_outputs(
+        return_df=True, sync_state=sync_state, df_person=faculty_df
+    )
 
     # Join active status from faculty to research outputs
     new_research_df = pd.merge(
@@ -57,10 +111,7 @@ def update_research_outputs():
     # Drop the redundant uuid column from the join
     new_research_df = new_research_df.drop(columns=["uuid"])
 
-    output_file = "person_research_outputs.csv"
-    if os.path.exists(output_file):
-        existing_df = pd.read_csv(output_file)
-
+    if existing_df is not None:
         # Count existing articles before update
         existing_article_count = existing_df.drop_duplicates(
             subset="article_uuid"
@@ -82,9 +133,9 @@ def update_research_outputs():
         )
 
         # Preserve both article_uuid and person_uuid relationships
-        combined_df = pd.concat([existing_df, new_research_df]).drop_duplicates(
-            subset=["article_uuid", "person_uuid"], keep="first"
-        )
+        combined_df = pd.concat(
+            [existing_df, new_research_df], ignore_index=True
+        ).drop_duplicates(subset=["article_uuid", "person_uuid"], keep="first")
 
         # Ensure only one active column is present
         if "active_faculty" in combined_df.columns:
@@ -97,26 +148,196 @@ def update_research_outputs():
         )
     else:
         combined_df = new_research_df
-        # Rename column if needed
+        # Ensure only one active column is present (the person details already
+        # carry it, so renaming would duplicate the column)
         if "active_faculty" in combined_df.columns:
-            combined_df = combined_df.rename(columns={"active_faculty": "active"})
+            if "active" in combined_df.columns:
+                combined_df = combined_df.drop(columns=["active_faculty"])
+            else:
+                combined_df = combined_df.rename(columns={"active_faculty": "active"})
 
         new_article_count = new_research_df.drop_duplicates(
             subset="article_uuid"
         ).shape[0]
         print(f"Created new dataset with {new_article_count} unique articles.")
 
-    combined_df.to_csv(output_file, index=False)
-    print(f"Updated research outputs saved to '{output_file}'.")
+    if persist:
+        storage.write_research_outputs(combined_df)
+        print(f"Updated research outputs saved to '{storage.RESEARCH_STORE}'.")
+        storage.write_normalized_tables(combined_df)
+        # Only advance the sync marks once the fetched outputs are safely stored
+        data.save_sync_state(sync_state)
     return combined_df
 
 
-def update_sdg_classifications():
-    sdg_file = "person_research_outputs.csv"
+# Mirrors determine.SDG_MODES without importing the classifier
+SDG_MODES = ["two-stage", "fused", "batched"]
+SDG_COLUMNS = ["is_sustain", "top 1", "top 2", "top 3"]
+# Classification state: "ok", "failed" (retried by later runs) or "pending" (never
+# attempted), the number of attempts and the error class of the last failure
+STATUS_COLUMNS = ["sdg_status", "sdg_attempts", "sdg_error"]
+# Failed classifications are retried until they have been attempted this often
+MAX_SDG_ATTEMPTS = 3
+# Columns written to the progress journal for every classified article
+JOURNAL_COLUMNS = SDG_COLUMNS + ["sdg_attempts"]
+JOURNAL_TEXT_COLUMNS = ["sdg_error"]
+
+
+@metrics.timed
+def propagate_classifications(df):
+    """
+    Copies each article's classification to its unclassified author rows.
+    The canonical values for an article come from its first row with a non-null
+    "is_sustain"; only rows whose "is_sustain" is missing are filled.
+    """
+    classified = df[df["is_sustain"].notna() & df["article_uuid"].notna()]
+    canonical = classified.drop_duplicates(subset="article_uuid", keep="first")
+    canonical = canonical.set_index("article_uuid")
+
+    fill_mask = df["is_sustain"].isna() & df["article_uuid"].isin(canonical.index)
+    if not fill_mask.any():
+        return df
+    article_ids = df.loc[fill_mask, "article_uuid"]
+    df.loc[fill_mask, "is_sustain"] = article_ids.map(canonical["is_sustain"])
+    if "top 1" in df.columns:
+        for column in SDG_COLUMNS[1:]:
+            if column in canonical.columns:
+                df.loc[fill_mask, column] = article_ids.map(canonical[column])
+            else:
+                df.loc[fill_mask, column] = 0
+    for column in STATUS_COLUMNS:
+        if column in df.columns:
+            df.loc[fill_mask, column] = article_ids.map(canonical[column])
+    return df
+
+
+def classification_status(df):
+    """
+    Fills in the classification state of rows that have none (new rows, or stores
+    written before the state was tracked): "ok" when classified, "pending" otherwise,
+    with no attempts.
+    """
+    for column in STATUS_COLUMNS:
+        if column not in df.columns:
+            df[column] = pd.NA
+    if "is_sustain" in df.columns:
+        classified = df["is_sustain"].notna()
+    else:
+        classified = pd.Series(False, index=df.index)
+    status = df["sdg_status"].astype("string")
+    missing = status.isna()
+    df["sdg_status"] = status.mask(missing & classified, "ok").mask(
+        missing & ~classified, "pending"
+    )
+    df["sdg_attempts"] = (
+        pd.to_numeric(df["sdg_attempts"], errors="coerce").fillna(0).astype("Int64")
+    )
+    df["sdg_error"] = df["sdg_error"].astype("string")
+    return df
+
+
+@metrics.timed
+def apply_classifications(df, classified_articles):
+    """
+    Merges freshly classified articles (one row per article_uuid) back into every
+    author row of those articles in a single keyed lookup.
+    """
+    results = classified_articles[classified_articles["article_uuid"].notna()]
+    results = results.drop_duplicates(subset="article_uuid").set_index("article_uuid")
+    mask = df["article_uuid"].isin(results.index)
+    article_ids = df.loc[mask, "article_uuid"]
+    for column in SDG_COLUMNS:
+        if column in results.columns:
+            df.loc[mask, column] = article_ids.map(results[column])
+        else:
+            df.loc[mask, column] = 0
+    for column in STATUS_COLUMNS:
+        if column in results.columns:
+            df.loc[mask, column] = article_ids.map(results[column])
+    return df
+
+
+def recover_journalled(journal, df, articles_to_process, retry_failed=False):
+    """
+    Replays the progress journal of an interrupted run for `articles_to_process`.
+    Journalled classifications are applied to `df` and those articles are dropped
+    from `articles_to_process`; articles whose journalled attempt failed keep the
+    journalled attempt count, so the retry cap still holds across resumes.
+    Returns the updated `df` and `articles_to_process`.
+    """
+    journalled = journal.replay()
+    journalled = journalled[
+        journalled["article_uuid"].isin(articles_to_process["article_uuid"])
+    ].copy()
+    if journalled.empty:
+        return df, articles_to_process
+
+    # Journals written before attempts were journalled keep the stored count
+    stored_attempts = articles_to_process.set_index("article_uuid")["sdg_attempts"]
+    attempts = journalled["article_uuid"].map(stored_attempts)
+    if "sdg_attempts" in journalled.columns:
+        attempts = pd.to_numeric(journalled["sdg_attempts"], errors="coerce").fillna(
+            attempts
+        )
+    journalled["sdg_attempts"] = attempts.fillna(0).astype("Int64")
+    if "is_sustain" in journalled.columns:
+        recovered = journalled["is_sustain"].notna()
+    else:
+        recovered = pd.Series(False, index=journalled.index)
+
+    classified = journalled[recovered].copy()
+    if not classified.empty:
+        classified["sdg_status"] = "ok"
+        classified["sdg_error"] = None
+        df = apply_classifications(df, classified)
+        print(f"Recovered {len(classified)} classifications from '{journal.path}'.")
+
+    # Failed articles are retried, counting the journalled attempts
+    failed = journalled[~recovered].set_index("article_uuid")
+    failed_attempts = failed["sdg_attempts"]
+    for frame in (df, articles_to_process):
+        mask = frame["article_uuid"].isin(failed_attempts.index)
+        frame.loc[mask, "sdg_attempts"] = frame.loc[mask, "article_uuid"].map(
+            failed_attempts
+        )
+        frame.loc[mask, "sdg_status"] = "failed"
+        if "sdg_error" in failed.columns:
+            frame.loc[mask, "sdg_error"] = frame.loc[mask, "article_uuid"].map(
+                failed["sdg_error"]
+            )
+
+    keep = ~articles_to_process["article_uuid"].isin(classified["article_uuid"])
+    if not retry_failed:
+        exhausted = articles_to_process["article_uuid"].isin(failed_attempts.index) & (
+            articles_to_process["sdg_attempts"] >= MAX_SDG_ATTEMPTS
+        )
+        keep &= ~exhausted
+    return df, articles_to_process[keep]
+
+
+@metrics.timed
+def update_sdg_classifications(
+    research_df=None,
+    persist=True,
+    sdg_mode="two-stage",
+    use_prefilter=False,
+    retry_failed=False,
+):
+    """
+    Classifies articles that have no SDG classification yet and returns the updated
+    research outputs. `research_df` defaults to the research outputs store.
+    Articles whose classification failed before are retried first, until they
+    have been attempted MAX_SDG_ATTEMPTS times (or always, with `retry_failed`).
+    `sdg_mode` selects the classifier (see determine.SDG_MODES); with `use_prefilter`
+    articles the embedding pre-filter can decide skip the relevance prompt.
+    """
+    if research_df is None:
+        existing_sdg_df = storage.read_research_outputs()
+    else:
+        existing_sdg_df = research_df
 
     # If SDG classifications already exist, load them
-    if os.path.exists(sdg_file):
-        existing_sdg_df = pd.read_csv(sdg_file)
+    if existing_sdg_df is not None:
 
         # Step 1: Remove exact duplicates (same article_uuid AND person_uuid)
         existing_sdg_df = existing_sdg_df.drop_duplicates(
@@ -126,49 +347,32 @@ def update_sdg_classifications():
         # Step 2: For each article_uuid, if some rows have SDG data and others don't,
         # copy the SDG data to the empty rows
         if "is_sustain" in existing_sdg_df.columns:
-            # Group by article_uuid
-            for article_id, group in existing_sdg_df.groupby("article_uuid"):
-                # Check if this article has both classified and unclassified rows
-                classified_rows = group[~group["is_sustain"].isna()]
-
-                if not classified_rows.empty:
-                    # Get classification values from a classified row
-                    sample_row = classified_rows.iloc[0]
-                    is_sustain_value = sample_row["is_sustain"]
-
-                    # Get top SDG values if they exist
-                    top1_value = (
-                        sample_row.get("top 1", 0) if "top 1" in sample_row else 0
-                    )
-                    top2_value = (
-                        sample_row.get("top 2", 0) if "top 2" in sample_row else 0
-                    )
-                    top3_value = (
-                        sample_row.get("top 3", 0) if "top 3" in sample_row else 0
-                    )
-
-                    # Fill in missing values for all rows with this article_uuid
-                    for idx in group.index:
-                        if pd.isna(existing_sdg_df.loc[idx, "is_sustain"]):
-                            existing_sdg_df.loc[idx, "is_sustain"] = is_sustain_value
-                            if "top 1" in existing_sdg_df.columns:
-                                existing_sdg_df.loc[idx, "top 1"] = top1_value
-                                existing_sdg_df.loc[idx, "top 2"] = top2_value
-                                existing_sdg_df.loc[idx, "top 3"] = top3_value
-
-            # After propagation, check which articles still need classification
-            unprocessed_mask = existing_sdg_df["is_sustain"].isna()
-            processed_ids = set(existing_sdg_df.loc[~unprocessed_mask, "article_uuid"])
-            unprocessed_existing = existing_sdg_df.loc[unprocessed_mask]
-        else:
-            # If the column doesn't exist yet, consider all articles as unprocessed
-            processed_ids = set()
-            unprocessed_existing = existing_sdg_df
+            existing_sdg_df = propagate_classifications(existing_sdg_df)
+        existing_sdg_df = classification_status(existing_sdg_df)
+
+        # After propagation, check which articles still need classification: the
+        # retry queue of failed articles goes first, then the never attempted ones
+        status = existing_sdg_df["sdg_status"]
+        failed = status == "failed"
+        exhausted = failed & (existing_sdg_df["sdg_attempts"] >= MAX_SDG_ATTEMPTS)
+        if retry_failed:
+            exhausted = pd.Series(False, index=existing_sdg_df.index)
+        processed_ids = set(existing_sdg_df.loc[status == "ok", "article_uuid"])
+        retry_queue = existing_sdg_df.loc[failed & ~exhausted]
+        unprocessed_existing = pd.concat(
+            [retry_queue, existing_sdg_df.loc[status == "pending"]]
+        )
 
         print(f"Found {len(processed_ids)} previously classified articles.")
         print(
-            f"Found {len(unprocessed_existing)} existing articles with missing SDG classification."
+            f"Found {len(unprocessed_existing)} existing articles with missing SDG classification "
+            f"({retry_queue['article_uuid'].nunique()} failed before, retried first)."
         )
+        if exhausted.any():
+            print(
+                f"Skipping {existing_sdg_df.loc[exhausted, 'article_uuid'].nunique()} "
+                f"articles that failed {MAX_SDG_ATTEMPTS} times (use --retry-failed)."
+            )
     else:
         existing_sdg_df = pd.DataFrame()
         processed_ids = set()
@@ -182,59 +386,287 @@ def update_sdg_classifications():
             subset="article_uuid", keep="first"
         )
 
+        # Articles journalled by an interrupted run are not classified again
+        journal = progress_journal.ProgressJournal()
+        existing_sdg_df, articles_to_process = recover_journalled(
+            journal, existing_sdg_df, articles_to_process, retry_failed
+        )
+
         if not articles_to_process.empty:
+            # Imported here so runs that skip classification never load langchain
+            start = time.perf_counter()
+            with metrics.span("import determine"):
+                import determine
+
+            print(f"Loaded classifier module in {time.perf_counter() - start:.2f}s")
             print(
-                f"Classifying SDG relevance for {len(articles_to_process)} research articles..."
+                f"Classifying SDG relevance for {len(articles_to_process)} research articles ({sdg_mode})..."
             )
-            articles_to_process = determine.classify_sdg_relevance(articles_to_process)
-            print("Categorizing SDG")
-            articles_to_process = determine.determine_relevant_goals(
-                articles_to_process
+            if use_prefilter:
+                import prefilter
+
+                classify = functools.partial(
+                    prefilter.classify_with_prefilter, mode=sdg_mode
+                )
+            else:
+                classify = functools.partial(determine.classify_articles, mode=sdg_mode)
+
+            # Classify one round of in-flight requests at a time and journal it as
+            # soon as it completes, so a crash loses at most that round
+            chunk_size = determine.articles_in_flight(sdg_mode)
+            classified_chunks = []
+            total = len(articles_to_process)
+            try:
+                for offset in range(0, total, chunk_size):
+                    chunk = classify(
+                        articles_to_process.iloc[offset : offset + chunk_size].copy()
+                    )
+                    # Articles never sent because the circuit was open do not
+                    # use up an attempt
+                    sent = chunk["sdg_error"].ne("CircuitOpenError")
+                    chunk["sdg_attempts"] = chunk["sdg_attempts"].fillna(0) + sent
+                    journal.append(chunk, JOURNAL_COLUMNS, JOURNAL_TEXT_COLUMNS)
+                    classified_chunks.append(
+                        chunk[["article_uuid"] + SDG_COLUMNS + STATUS_COLUMNS]
+                    )
+                    print(
+                        f"Classified {min(offset + chunk_size, total)}/{total} articles"
+                    )
+                    if determine.get_service().scheduler.broken:
+                        # Leave the rest for the next run rather than failing it all
+                        print(
+                            f"LLM circuit open; {total - offset - len(chunk)} articles "
+                            "left for the next run"
+                        )
+                        break
+            finally:
+                journal.close()
+            print(
+                f"Classifier cold start: {determine.get_service().cold_start_report()}"
             )
 
-            # Create a mapping of classification results by article_uuid
-            classification_map = {}
-            for _, row in articles_to_process.iterrows():
-                article_id = row["article_uuid"]
-                classification_map[article_id] = {
-                    "is_sustain": row["is_sustain"],
-                    "top 1": row.get("top 1", 0),
-                    "top 2": row.get("top 2", 0),
-                    "top 3": row.get("top 3", 0),
-                }
-
             # Apply classifications to all instances of the articles in existing_sdg_df
-            for article_id, values in classification_map.items():
-                existing_sdg_df.loc[
-                    existing_sdg_df["article_uuid"] == article_id,
-                    ["is_sustain", "top 1", "top 2", "top 3"],
-                ] = [
-                    values["is_sustain"],
-                    values["top 1"],
-                    values["top 2"],
-                    values["top 3"],
-                ]
+            existing_sdg_df = apply_classifications(
+                existing_sdg_df, pd.concat(classified_chunks, ignore_index=True)
+            )
 
     # Save the updated dataframe
-    existing_sdg_df.to_csv(sdg_file, index=False)
-    print(f"Updated SDG classifications saved to '{sdg_file}'.")
+    if persist:
+        storage.write_research_outputs(existing_sdg_df)
+        print(f"Updated SDG classifications saved to '{storage.RESEARCH_STORE}'.")
+        progress_journal.ProgressJournal().clear()
     print(
         f"Total articles in SDG classifications: {len(existing_sdg_df.drop_duplicates(subset='article_uuid'))}"
     )
-
-
-def main():
-    print("=== Incremental Update Pipeline ===")
+    if "sdg_status" in existing_sdg_df.columns:
+        counts = (
+            existing_sdg_df.drop_duplicates(subset="article_uuid")["sdg_status"]
+            .value_counts()
+            .to_dict()
+        )
+        print(f"Classification status: {counts}")
+    return existing_sdg_df
+
+
+@metrics.timed
+def run_file_pipeline(
+    start_at="faculty",
+    incremental=True,
+    sdg_mode="two-stage",
+    use_prefilter=False,
+    retry_failed=False,
+):
+    """
+    File-based pipeline: every stage reads its input from disk and writes its output
+    back, so a run can be resumed from any stage.
+    """
+    start = STAGES.index(start_at)
     # Step 1: Update merged faculty data (only new faculty entries will be appended)
-    merged_df = update_merged_faculty()
+    if start <= 0:
+        update_merged_faculty()
     # Step 2: Update research outputs (append only new articles)
-    research_df = update_research_outputs()
+    if start <= 1:
+        update_research_outputs(incremental=incremental, return_df=False)
     # Step 3: Update SDG classification (only process articles that are new)
-    update_sdg_classifications()
-    # Step 4: Update articles
-    data.add_journal_rankings("person_research_outputs.csv", "journals.xlsx")
+    if start <= 2:
+        update_sdg_classifications(
+            sdg_mode=sdg_mode, use_prefilter=use_prefilter, retry_failed=retry_failed
+        )
+    # Step 4: Update articles, then export the flat CSV the dashboard reads
+    if start <= 3:
+        data.add_journal_rankings(storage.RESEARCH_STORE, JOURNALS_FILE)
+        storage.export_csv()
+    # Step 5: Precompute the dashboard aggregates and slim article index
+    aggregates.write_aggregates()
+
+
+@metrics.timed
+def run_memory_pipeline(
+    start_at="faculty",
+    incremental=True,
+    checkpoint_after=(),
+    sdg_mode="two-stage",
+    use_prefilter=False,
+    retry_failed=False,
+):
+    """
+    In-process pipeline: stages hand DataFrames to each other, the existing dataset
+    is parsed once, and everything is written once at the end. Stages named in
+    `checkpoint_after` also write their output when they finish, so a failed run can
+    be resumed with the file pipeline. Starting later than "faculty" loads the
+    previous stages' outputs from disk.
+    """
+    start = STAGES.index(start_at)
+    if start_at == "aggregates":
+        # Nothing to recompute in memory: the aggregates are read from the store
+        aggregates.write_aggregates()
+        return
+    faculty_df = pd.read_csv(FACULTY_FILE) if start > 0 else None
+    research_df = storage.read_research_outputs() if start > 1 else None
+    sync_state = None
+
+    if start <= 0:
+        faculty_df = update_merged_faculty(persist="faculty" in checkpoint_after)
+    if start <= 1:
+        sync_state = load_research_sync_state(incremental)
+        research_df = update_research_outputs(
+            incremental=incremental,
+            faculty_df=faculty_df,
+            sync_state=sync_state,
+            persist="research" in checkpoint_after,
+        )
+    if start <= 2:
+        research_df = update_sdg_classifications(
+            research_df,
+            persist="sdg" in checkpoint_after,
+            sdg_mode=sdg_mode,
+            use_prefilter=use_prefilter,
+            retry_failed=retry_failed,
+        )
+    if start <= 3:
+        research_df = data.apply_journal_rankings(research_df, JOURNALS_FILE)
+
+    # Single checkpoint write of everything that changed in memory
+    if start <= 0 and "faculty" not in checkpoint_after:
+        faculty_df.to_csv(FACULTY_FILE, index=False)
+        print(f"Updated merged faculty data saved to '{FACULTY_FILE}'.")
+    storage.write_research_outputs(research_df)
+    print(f"Research outputs saved to '{storage.RESEARCH_STORE}'.")
+    storage.write_normalized_tables(research_df)
+    # The journalled classifications are now part of the stored research outputs
+    progress_journal.ProgressJournal().clear()
+    if sync_state is not None:
+        data.save_sync_state(sync_state)
+    storage.export_csv(df=research_df)
+    aggregates.write_aggregates(research_df)
+
+
+def main(
+    mode="files",
+    start_at="faculty",
+    incremental=True,
+    checkpoint_after=(),
+    sdg_mode="two-stage",
+    use_prefilter=False,
+    retry_failed=False,
+    trace_memory=False,
+    metrics_file=metrics.REPORT_FILE,
+    prometheus_file=None,
+):
+    """
+    Runs the pipeline and writes the run metrics report (also when a stage fails).
+    `trace_memory` records each span's peak memory with tracemalloc, at some cost
+    in speed.
+    """
+    print("=== Incremental Update Pipeline ===")
+    metrics.get_metrics().reset(trace_memory=trace_memory)
+    try:
+        if mode == "files":
+            run_file_pipeline(
+                start_at=start_at,
+                incremental=incremental,
+                sdg_mode=sdg_mode,
+                use_prefilter=use_prefilter,
+                retry_failed=retry_failed,
+            )
+        else:
+            run_memory_pipeline(
+                start_at=start_at,
+                incremental=incremental,
+                checkpoint_after=checkpoint_after,
+                sdg_mode=sdg_mode,
+                use_prefilter=use_prefilter,
+                retry_failed=retry_failed,
+            )
+    finally:
+        metrics.get_metrics().write_report(metrics_file, prometheus_file)
     print("=== Incremental Update Complete ===")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Incremental update pipeline")
+    parser.add_argument(
+        "--mode",
+        choices=["files", "memory"],
+        default="files",
+        help="Persist after every stage, or pass DataFrames between stages in memory "
+        "and write once at the end",
+    )
+    parser.add_argument(
+        "--start-at",
+        choices=STAGES,
+        default="faculty",
+        help="Resume from this stage using the files written by earlier stages",
+    )
+    parser.add_argument(
+        "--checkpoint-after",
+        nargs="*",
+        choices=STAGES,
+        default=[],
+        help="In memory mode, also write results after these stages",
+    )
+    parser.add_argument(
+        "--full-sync",
+        action="store_true",
+        help="Re-download every person's research outputs",
+    )
+    parser.add_argument(
+        "--sdg-mode",
+        choices=SDG_MODES,
+        default="two-stage",
+        help="Classify with separate relevance and goal prompts, one fused prompt, "
+        "or relevance screened in multi-article batches",
+    )
+    parser.add_argument(
+        "--prefilter",
+        action="store_true",
+        help="Auto-label articles the calibrated embedding pre-filter is sure about "
+        "(see prefilter.py)",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help=f"Also retry articles whose classification failed {MAX_SDG_ATTEMPTS} times",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record the peak memory of every stage (slower)",
+    )
+    parser.add_argument(
+        "--prometheus",
+        action="store_true",
+        help=f"Also export the run metrics to '{metrics.PROMETHEUS_FILE}'",
+    )
+    args = parser.parse_args()
+    main(
+        mode=args.mode,
+        start_at=args.start_at,
+        incremental=not args.full_sync,
+        checkpoint_after=args.checkpoint_after,
+        sdg_mode=args.sdg_mode,
+        use_prefilter=args.prefilter,
+        retry_failed=args.retry_failed,
+        trace_memory=args.trace_memory,
+        prometheus_file=metrics.PROMETHEUS_FILE if args.prometheus else None,
+    )
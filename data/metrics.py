@@ -0,0 +1,428 @@
+"""
+Run metrics for the pipeline.
+
+Stage functions are wrapped in timing spans (with their peak traced memory when
+memory tracing is on), request paths record latency histograms and counters
+(requests, retries, throttles, tokens, cache hits), and components can register
+collectors whose stats are read when the report is written. Everything is kept in
+one process-wide registry and written as a JSON run report, optionally also in the
+Prometheus text exposition format. Two JSON reports can be diffed with --diff.
+
+Usage:
+    python metrics.py --diff run_metrics_before.json run_metrics.json
+"""
+
+import argparse
+import bisect
+import functools
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+REPORT_FILE = "run_metrics.json"
+PROMETHEUS_FILE = "run_metrics.prom"
+PROMETHEUS_PREFIX = "sdg_pipeline"
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Values kept per histogram for the percentiles
+HISTOGRAM_SAMPLES = 10000
+# Span time changes smaller than this are not reported by --diff
+DIFF_MIN_SECONDS = 0.05
+
+
+class Histogram:
+    """
+    Exact count, sum, min, max and bucket counts, with the percentiles taken from
+    a uniform sample of at most `max_samples` values, so memory stays bounded.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, max_samples=HISTOGRAM_SAMPLES):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.max_samples = max_samples
+        self.samples = []
+        self.random = random.Random(0)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        # First bucket whose upper bound is >= value
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        # Reservoir sampling keeps every value seen equally likely to be sampled
+        if len(self.samples) < self.max_samples:
+            self.samples.append(value)
+        else:
+            slot = self.random.randrange(self.count)
+            if slot < self.max_samples:
+                self.samples[slot] = value
+
+    def summary(self):
+        summary = {"count": self.count, "sum": self.sum}
+        if self.count:
+            samples = sorted(self.samples)
+
+            def percentile(p):
+                return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+            summary.update(
+                {
+                    "min": self.min,
+                    "p50": percentile(0.50),
+                    "p95": percentile(0.95),
+                    "p99": percentile(0.99),
+                    "max": self.max,
+                }
+            )
+        summary["buckets"] = dict(
+            zip(map(str, self.buckets), itertools.accumulate(self.bucket_counts))
+        )
+        return summary
+
+
+def metric_key(name, labels):
+    """
+    'name' or 'name{a="x",b="y"}' with labels sorted, as used in the report and the
+    Prometheus export.
+    """
+    if not labels:
+        return name
+    pairs = ",".join(f'{k}="{labels[k]}"' for k in sorted(labels))
+    return f"{name}{{{pairs}}}"
+
+
+class Metrics:
+    """
+    Process-wide registry of spans, histograms, counters, gauges and collectors.
+    Thread-safe; spans nest per thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self, trace_memory=False):
+        with self.lock:
+            self.started = time.time()
+            self.spans = {}
+            self.histograms = {}
+            self.counters = {}
+            self.gauges = {}
+            self.collectors = {}
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # Spans ----------------------------------------------------------
+
+    def _stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def span(self, name):
+        return Span(self, name)
+
+    def _finish_span(self, name, path, seconds, peak):
+        with self.lock:
+            record = self.spans.setdefault(
+                name,
+                {"path": path, "calls": 0, "seconds": 0.0, "max_seconds": 0.0},
+            )
+            record["calls"] += 1
+            record["seconds"] += seconds
+            record["max_seconds"] = max(record["max_seconds"], seconds)
+            if peak is not None:
+                record["peak_bytes"] = max(record.get("peak_bytes", 0), peak)
+
+    # Request metrics ------------------------------------------------
+
+    def observe(self, name, value, **labels):
+        key = metric_key(name, labels)
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def inc(self, name, value=1, **labels):
+        key = metric_key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[metric_key(name, labels)] = value
+
+    def register_collector(self, name, collect):
+        """
+        `collect()` returns a dict of numbers, read when the report is built.
+        """
+        with self.lock:
+            self.collectors[name] = collect
+
+    # Reports --------------------------------------------------------
+
+    def report(self):
+        with self.lock:
+            collectors = dict(self.collectors)
+            report = {
+                "run": {
+                    "started": self.started,
+                    "seconds": time.time() - self.started,
+                    "argv": sys.argv,
+                    "trace_memory": self.trace_memory,
+                },
+                "spans": {name: dict(record) for name, record in self.spans.items()},
+                "histograms": {
+                    key: histogram.summary()
+                    for key, histogram in self.histograms.items()
+                },
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+        max_rss = max_rss_bytes()
+        if max_rss is not None:
+            report["run"]["max_rss_bytes"] = max_rss
+        report["collectors"] = {}
+        for name, collect in collectors.items():
+            try:
+                report["collectors"][name] = collect()
+            except Exception as e:
+                print(f"Metrics collector '{name}' failed: {e}")
+        return report
+
+    def write_report(self, path=REPORT_FILE, prometheus_path=None):
+        report = self.report()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        print(f"Run metrics saved to '{path}'.")
+        if prometheus_path:
+            with open(prometheus_path, "w") as f:
+                f.write(to_prometheus(report))
+            print(f"Prometheus metrics saved to '{prometheus_path}'.")
+        return report
+
+
+def max_rss_bytes():
+    """
+    The process's peak resident set size in bytes, or None where the resource
+    module is unavailable.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB on Linux and the BSDs
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class Span:
+    """
+    Times a block (and, with memory tracing, its peak traced memory) and adds it to
+    the span named `name`. Peaks of nested spans are folded into their parents.
+
+    tracemalloc keeps a single process-wide peak that each span resets on entry, so
+    peaks are only exact for spans that do not overlap spans in other threads or
+    tasks; a span started concurrently erases the peak of the one already running.
+    """
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        stack = self.metrics._stack()
+        self.path = "/".join([entry.name for entry in stack] + [self.name])
+        # Spans only touch tracemalloc when memory tracing was asked for, so they
+        # never reset the peak of a measurement taken outside the registry
+        self.tracing = self.metrics.trace_memory and tracemalloc.is_tracing()
+        if self.tracing:
+            # Keep the parent's peak so far before restarting the peak for this span
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self.peak = 0
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        stack = self.metrics._stack()
+        stack.pop()
+        peak = None
+        if self.tracing and tracemalloc.is_tracing():
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+        self.metrics._finish_span(self.name, self.path, seconds, peak)
+        return False
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    return _metrics
+
+
+def span(name):
+    return _metrics.span(name)
+
+
+def timed(func=None, name=None):
+    """
+    Decorator: runs every call of the function in a span named module.function.
+    """
+    if func is None:
+        return functools.partial(timed, name=name)
+    span_name = name or f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _metrics.span(span_name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def split_key(key):
+    """
+    Splits 'name{a="x"}' into ('name', 'a="x"'); keys without labels give ''.
+    """
+    name, _, labels = key.partition("{")
+    return name, labels.rstrip("}")
+
+
+def prometheus_line(name, labels, value, *extra):
+    labels = ",".join(label for label in (labels, *extra) if label)
+    return f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+
+def to_prometheus(report, prefix=PROMETHEUS_PREFIX):
+    """
+    Renders a run report in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric, kind, field in (
+        ("span_seconds_total", "counter", "seconds"),
+        ("span_calls_total", "counter", "calls"),
+        ("span_peak_bytes", "gauge", "peak_bytes"),
+    ):
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for name, record in sorted(report["spans"].items()):
+            if field in record:
+                lines.append(
+                    prometheus_line(
+                        f"{prefix}_{metric}", f'span="{name}"', record[field]
+                    )
+                )
+
+    typed = set()
+    for key, summary in sorted(report["histograms"].items()):
+        name, labels = split_key(key)
+        name = f"{prefix}_{name}"
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        for bound, count in summary["buckets"].items():
+            lines.append(
+                prometheus_line(f"{name}_bucket", labels, count, f'le="{bound}"')
+            )
+        lines.append(
+            prometheus_line(f"{name}_bucket", labels, summary["count"], 'le="+Inf"')
+        )
+        lines.append(prometheus_line(f"{name}_sum", labels, summary["sum"]))
+        lines.append(prometheus_line(f"{name}_count", labels, summary["count"]))
+
+    for section, kind in (("counters", "counter"), ("gauges", "gauge")):
+        for key, value in sorted(report[section].items()):
+            name, labels = split_key(key)
+            name = f"{prefix}_{name}"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+            lines.append(prometheus_line(name, labels, value))
+
+    for collector, stats in sorted(report["collectors"].items()):
+        for stat, value in sorted(stats.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"{prefix}_{collector}_{stat} {value}")
+
+    lines.append(f"{prefix}_run_seconds {report['run']['seconds']}")
+    lines.append(f"{prefix}_max_rss_bytes {report['run']['max_rss_bytes']}")
+    return "\n".join(lines) + "\n"
+
+
+def diff_reports(before, after, min_seconds=DIFF_MIN_SECONDS):
+    """
+    Rows comparing span time and peak memory, and counter values, of two reports.
+    """
+    rows = []
+    for name in sorted(set(before["spans"]) | set(after["spans"])):
+        old = before["spans"].get(name, {})
+        new = after["spans"].get(name, {})
+        delta = new.get("seconds", 0.0) - old.get("seconds", 0.0)
+        if abs(delta) < min_seconds and old.get("peak_bytes") == new.get("peak_bytes"):
+            continue
+        rows.append(
+            {
+                "metric": f"span {name}",
+                "before": old.get("seconds"),
+                "after": new.get("seconds"),
+                "change": delta,
+                "peak_before": old.get("peak_bytes"),
+                "peak_after": new.get("peak_bytes"),
+            }
+        )
+    for key in sorted(set(before["counters"]) | set(after["counters"])):
+        old, new = before["counters"].get(key, 0), after["counters"].get(key, 0)
+        if old != new:
+            rows.append(
+                {"metric": key, "before": old, "after": new, "change": new - old}
+            )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--diff", nargs=2, metavar=("BEFORE", "AFTER"), required=True)
+    args = parser.parse_args()
+
+    with open(args.diff[0]) as f:
+        before = json.load(f)
+    with open(args.diff[1]) as f:
+        after = json.load(f)
+    for row in diff_reports(before, after):
+        line = (
+            f"{row['metric']:<60} {row['before'] or 0:>12.3f} -> "
+            f"{row['after'] or 0:>12.3f} ({row['change']:+.3f})"
+        )
+        if row.get("peak_before") or row.get("peak_after"):
+            line += (
+                f"  peak {(row['peak_before'] or 0) / 2**20:.1f} -> "
+                f"{(row['peak_after'] or 0) / 2**20:.1f} MB"
+            )
+        print(line)
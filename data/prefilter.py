@@ -0,0 +1,248 @@
+"""
+Embedding-based pre-filter for SDG relevance. Each article's similarity to its
+nearest goal in the FAISS index decides whether it can be labelled without the LLM:
+articles far from every goal are auto-labelled not relevant, articles very close to a
+goal are auto-labelled relevant (and still get the goal prompt), and only the band in
+between is sent to the relevance classifier.
+
+Thresholds are calibrated on past is_sustain labels from the research outputs and
+saved to prefilter_thresholds.json; without that file the pre-filter is disabled.
+
+Usage:
+    python prefilter.py --calibrate --target-precision 0.98
+    python prefilter.py --low 0.25 --high 0.6
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import determine
+import storage
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+THRESHOLDS_FILE = "prefilter_thresholds.json"
+REPORT_FILE = "prefilter_report.csv"
+# Minimum share of auto-labelled articles whose label must agree with the LLM
+DEFAULT_TARGET_PRECISION = 0.98
+# Fewer labelled articles than this make calibration too noisy to trust
+MIN_CALIBRATION_LABELS = 200
+THRESHOLD_GRID = np.round(np.arange(0.0, 1.0001, 0.01), 2)
+
+
+def l2_to_cosine(distances):
+    """
+    Cosine similarity from the squared L2 distances returned by IndexFlatL2, valid
+    for unit vectors (|a - b|^2 = 2 - 2 cos).
+    """
+    return 1.0 - np.asarray(distances, dtype="float64") / 2.0
+
+
+def nearest_goal_similarity(df):
+    """
+    Returns the cosine similarity of every article in `df` to its nearest SDG goal,
+    using stored embeddings where available and one batched index search.
+    """
+    vectors = np.array(determine.embed_articles(df), dtype="float32")
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1, norms)
+    results = determine.search_candidate_goals(vectors, k=1)
+    return l2_to_cosine([row[0][1] if row else 4.0 for row in results])
+
+
+def load_thresholds(path=THRESHOLDS_FILE):
+    """
+    Returns {"low": float or None, "high": float or None}, or None if not calibrated.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_thresholds(thresholds, path=THRESHOLDS_FILE):
+    with open(path, "w") as f:
+        json.dump(thresholds, f, indent=2)
+
+
+def auto_labels(scores, thresholds):
+    """
+    1 for scores at or above "high", 0 for scores below "low", NaN (send to the LLM)
+    in between. Either threshold may be None to disable that side.
+    """
+    scores = np.asarray(scores, dtype="float64")
+    labels = np.full(len(scores), np.nan)
+    if thresholds.get("low") is not None:
+        labels[scores < thresholds["low"]] = 0
+    if thresholds.get("high") is not None:
+        labels[scores >= thresholds["high"]] = 1
+    return labels
+
+
+def threshold_report(scores, labels, grid=THRESHOLD_GRID):
+    """
+    For every candidate threshold, the precision of auto-labelling on each side and
+    the resulting recall of relevant articles (those not auto-labelled 0 are still
+    found by the LLM) against past labels.
+    """
+    scores = np.asarray(scores, dtype="float64")
+    labels = np.asarray(labels, dtype="int64")
+    relevant = max(int((labels == 1).sum()), 1)
+    rows = []
+    for t in grid:
+        below, above = scores < t, scores >= t
+        rows.append(
+            {
+                "threshold": float(t),
+                "low_auto_share": float(below.mean()),
+                "low_precision": (
+                    float((labels[below] == 0).mean()) if below.any() else None
+                ),
+                "relevance_recall": 1.0 - float((labels[below] == 1).sum()) / relevant,
+                "high_auto_share": float(above.mean()),
+                "high_precision": (
+                    float((labels[above] == 1).mean()) if above.any() else None
+                ),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def calibrate(scores, labels, target_precision=DEFAULT_TARGET_PRECISION):
+    """
+    Picks the widest thresholds whose auto-labels agree with the past labels at
+    `target_precision` or better. Returns the thresholds and the full report.
+    """
+    report = threshold_report(scores, labels)
+    low = report.loc[report["low_precision"] >= target_precision, "threshold"]
+    low = float(low.max()) if not low.empty else None
+    # The bands must not overlap: nothing below `low` can be auto-labelled relevant
+    high = report.loc[
+        (report["high_precision"] >= target_precision)
+        & (report["threshold"] >= (low or 0.0)),
+        "threshold",
+    ]
+    thresholds = {
+        "low": low,
+        "high": float(high.min()) if not high.empty else None,
+        "target_precision": target_precision,
+        "labels": int(len(labels)),
+    }
+    return thresholds, report
+
+
+def summarize(scores, labels, thresholds):
+    """
+    Precision/recall of the given thresholds against past labels.
+    """
+    labels = np.asarray(labels, dtype="int64")
+    auto = auto_labels(scores, thresholds)
+    decided = ~np.isnan(auto)
+    relevant = max(int((labels == 1).sum()), 1)
+    return {
+        "articles": int(len(labels)),
+        "auto_labelled": float(decided.mean()) if len(labels) else 0.0,
+        "auto_precision": (
+            float((auto[decided] == labels[decided]).mean()) if decided.any() else None
+        ),
+        "relevance_recall": 1.0 - float(((auto == 0) & (labels == 1)).sum()) / relevant,
+        "relevance_precision_auto_positive": (
+            float((labels[auto == 1] == 1).mean()) if (auto == 1).any() else None
+        ),
+    }
+
+
+def classify_with_prefilter(df, mode="two-stage", thresholds=None):
+    """
+    Runs determine.classify_articles only on articles the pre-filter cannot decide.
+    Auto-relevant articles go straight to the goal prompt; auto-irrelevant articles
+    get is_sustain 0 and no goals. Without thresholds every article goes to the LLM.
+    """
+    thresholds = thresholds or load_thresholds()
+    if not thresholds or len(df) == 0:
+        return determine.classify_articles(df, mode=mode)
+
+    # Parts are put back together by position, so repeated index labels are safe
+    index = df.index
+    df = df.reset_index(drop=True)
+    labels = auto_labels(nearest_goal_similarity(df), thresholds)
+    uncertain = np.isnan(labels)
+    print(
+        f"Pre-filter: {int((labels == 0).sum())} auto-labelled not relevant, "
+        f"{int((labels == 1).sum())} auto-labelled relevant, "
+        f"{int(uncertain.sum())} sent to the LLM"
+    )
+
+    parts = []
+    if uncertain.any():
+        parts.append(determine.classify_articles(df[uncertain].copy(), mode=mode))
+    if (labels == 1).any():
+        positives = df[labels == 1].copy()
+        positives["is_sustain"] = 1
+        parts.append(determine.determine_relevant_goals(positives))
+    if (labels == 0).any():
+        negatives = df[labels == 0].copy()
+        negatives["is_sustain"] = 0
+        for column in ["top 1", "top 2", "top 3"]:
+            negatives[column] = 0
+        determine.set_status(negatives, [None] * len(negatives))
+        parts.append(negatives)
+    result = pd.concat(parts).loc[df.index]
+    result.index = index
+    return result
+
+
+def load_labelled_articles(sample=None, seed=0):
+    df = storage.read_research_outputs(
+        columns=["article_uuid", "title", "abstract", "is_sustain"]
+    )
+    df = df.dropna(subset=["is_sustain"]).drop_duplicates(subset="article_uuid")
+    if sample and sample < len(df):
+        df = df.sample(n=sample, random_state=seed)
+    return df.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--calibrate",
+        action="store_true",
+        help="Choose thresholds from past labels and save them",
+    )
+    parser.add_argument(
+        "--target-precision", type=float, default=DEFAULT_TARGET_PRECISION
+    )
+    parser.add_argument("--low", type=float, help="Auto-label below this as 0")
+    parser.add_argument("--high", type=float, help="Auto-label at or above this as 1")
+    parser.add_argument("--sample", type=int, help="Use at most this many labels")
+    args = parser.parse_args()
+
+    labelled = load_labelled_articles(args.sample)
+    if len(labelled) < MIN_CALIBRATION_LABELS:
+        print(
+            f"Only {len(labelled)} labelled articles; at least "
+            f"{MIN_CALIBRATION_LABELS} are needed for a reliable report."
+        )
+    scores = nearest_goal_similarity(labelled)
+    labels = labelled["is_sustain"].astype(int).to_numpy()
+
+    if args.calibrate:
+        thresholds, report = calibrate(scores, labels, args.target_precision)
+        save_thresholds(thresholds)
+        print(f"Saved thresholds to '{THRESHOLDS_FILE}': {thresholds}")
+    else:
+        thresholds = load_thresholds() or {}
+        if args.low is not None:
+            thresholds["low"] = args.low
+        if args.high is not None:
+            thresholds["high"] = args.high
+        report = threshold_report(scores, labels)
+    report.to_csv(REPORT_FILE, index=False)
+    print(f"Threshold sweep written to '{REPORT_FILE}'.")
+    for name, value in summarize(scores, labels, thresholds).items():
+        print(f"{name}: {value}")
@@ -0,0 +1,90 @@
+import json
+import os
+
+import pandas as pd
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+JOURNAL_FILE = "sdg_progress.jsonl"
+# Records written between fsyncs (a crash loses at most this many results)
+FSYNC_EVERY = 50
+
+
+class ProgressJournal:
+    """
+    Append-only JSONL journal of per-article classification results.
+
+    Results are appended as they complete and fsynced in batches, so an interrupted
+    run can be resumed by replaying the journal. Once the results are folded into
+    the research outputs the journal is cleared.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, fsync_every=FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.unsynced = 0
+        self.file = None
+
+    def replay(self):
+        """
+        Returns the journalled records as a DataFrame (last record per article_uuid
+        wins). A partially written final line from a crash is ignored.
+        """
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=["article_uuid"])
+        records = []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        df = pd.DataFrame(records, columns=None if records else ["article_uuid"])
+        return df.drop_duplicates(subset="article_uuid", keep="last")
+
+    def append(self, df, columns, text_columns=()):
+        """
+        Appends one record per row of `df` with its article_uuid, the numeric
+        `columns` and the `text_columns`. Numeric values that are missing or not
+        numbers (e.g. a malformed goal from the LLM) are stored as None, as are
+        missing text values.
+        """
+        if self.file is None:
+            self.file = open(self.path, "a")
+        values = df[columns].apply(pd.to_numeric, errors="coerce")
+        texts = [df[column].tolist() for column in text_columns]
+        for i, (article_uuid, row) in enumerate(
+            zip(df["article_uuid"], values.itertuples(index=False))
+        ):
+            record = {"article_uuid": article_uuid}
+            for column, value in zip(columns, row):
+                record[column] = None if pd.isna(value) else int(value)
+            for column, column_texts in zip(text_columns, texts):
+                value = column_texts[i]
+                record[column] = None if pd.isna(value) else str(value)
+            self.file.write(json.dumps(record) + "\n")
+            self.unsynced += 1
+            if self.unsynced >= self.fsync_every:
+                self.sync()
+        self.file.flush()
+
+    def sync(self):
+        if self.file is not None and self.unsynced:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+    def clear(self):
+        """
+        Deletes the journal once its results are safely stored elsewhere.
+        """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
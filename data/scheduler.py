@@ -0,0 +1,472 @@
+"""
+Adaptive client-side request scheduler, shared by the LLM calls in determine.py and
+the Experts API client.
+
+While the provider is healthy requests are not paced at all, so callers run at
+the speed their concurrency allows. The first congestion signal (a 429, a transient
+failure, a response slower than the latency target, or rate-limit headers saying
+the quota runs out sooner) starts pacing at the send rate observed so far, cut
+multiplicatively; from there the rate is controlled by AIMD: every success adds
+ADDITIVE_INCREASE requests/s per second, every further signal cuts it again, and
+pacing stops once the rate is back at MAX_RATE. Rate-limit headers (OpenAI's
+x-ratelimit-*, RateLimit-* / X-RateLimit-* and Retry-After) are read on every
+response.
+
+After FAILURE_THRESHOLD consecutive failures the circuit opens: every caller pauses
+for CIRCUIT_COOLDOWN seconds, then a single probe request decides whether sending
+resumes. If the circuit opens MAX_CIRCUIT_TRIPS times in a row the scheduler gives
+up with CircuitOpenError, so callers can leave the remaining work for the next run
+instead of recording results they never got.
+"""
+
+import asyncio
+import collections
+import email.utils
+import re
+import threading
+import time
+
+import metrics
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+# Send rates in requests per second
+MIN_RATE = 0.1
+MAX_RATE = 200.0
+ADDITIVE_INCREASE = 1.0
+DECREASE_FACTOR = 0.5
+# Seconds of recent sends used to measure the rate before pacing starts
+RATE_WINDOW = 5.0
+# Responses slower than this (seconds) cut the rate by LATENCY_DECREASE_FACTOR
+LATENCY_TARGET = 30.0
+LATENCY_DECREASE_FACTOR = 0.8
+# At most one rate cut per interval, so a burst of in-flight errors counts once
+DECREASE_INTERVAL = 1.0
+# Attempts per call, and the pause after a failure (doubling per consecutive failure)
+MAX_ATTEMPTS = 3
+BACKOFF = 4.0
+MAX_BACKOFF = 60.0
+# Circuit breaker
+FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 60.0
+MAX_CIRCUIT_TRIPS = 3
+# Polling interval of callers waiting for the circuit's probe request
+PROBE_POLL_INTERVAL = 0.5
+TRANSIENT_ERROR_NAMES = re.compile(r"Connection|Timeout")
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised when the circuit keeps reopening and the scheduler stops sending.
+    """
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header (delay in seconds or an HTTP date) into seconds.
+    Returns None if the header is missing or unreadable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def parse_reset(value):
+    """
+    Parses a rate-limit reset header into seconds from now: plain seconds, an epoch
+    timestamp, or an OpenAI-style duration such as "1s", "6m0s" or "20ms".
+    Returns None if the value is unreadable.
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        parts = DURATION_PART.findall(value)
+        if not parts or "".join(n + u for n, u in parts) != value:
+            return None
+        units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(number) * units[unit] for number, unit in parts)
+    # Large values are absolute epoch times rather than delays
+    if seconds > 1e9:
+        seconds -= time.time()
+    return max(0.0, seconds)
+
+
+def first_header(headers, names):
+    for name in names:
+        if name in headers:
+            return headers[name]
+    return None
+
+
+def error_kind(error):
+    """
+    Classifies a failed call: "throttle" (429), "failure" (server error, timeout or
+    connection problem, which counts towards the circuit), "fatal" (any other HTTP
+    error, not retried) or "retry" (the provider answered but the result was
+    unusable, e.g. unparseable output).
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        return "throttle"
+    if status is not None and (status >= 500 or status in (408, 409)):
+        return "failure"
+    if status is not None:
+        return "fatal"
+    if isinstance(error, (ConnectionError, TimeoutError)) or any(
+        TRANSIENT_ERROR_NAMES.search(cls.__name__) for cls in type(error).__mro__
+    ):
+        return "failure"
+    return "retry"
+
+
+def error_headers(error):
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    return headers if headers is not None else {}
+
+
+class AdaptiveScheduler:
+    """
+    Thread- and asyncio-safe pacer with AIMD rate control and a circuit breaker.
+
+    Callers either wrap each request with `call` / `acall` (which retry up to
+    `max_attempts` times) or drive it themselves with `acquire` before sending and
+    one of `record_success`, `record_throttle` or `record_failure` afterwards.
+    """
+
+    def __init__(
+        self,
+        name,
+        min_rate=MIN_RATE,
+        max_rate=MAX_RATE,
+        latency_target=LATENCY_TARGET,
+        max_attempts=MAX_ATTEMPTS,
+        backoff=BACKOFF,
+        max_backoff=MAX_BACKOFF,
+        failure_threshold=FAILURE_THRESHOLD,
+        cooldown=CIRCUIT_COOLDOWN,
+        max_trips=MAX_CIRCUIT_TRIPS,
+    ):
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.latency_target = latency_target
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Stops pacing and closes the circuit.
+        """
+        with self.lock:
+            # None while unpaced
+            self.rate = None
+            self.next_send = 0.0
+            self.paused_until = 0.0
+            self.sent = collections.deque()
+            self.last_decrease = 0.0
+            self.consecutive_failures = 0
+            self.state = "closed"
+            self.open_until = 0.0
+            self.trips = 0
+        self._set_rate_gauge()
+
+    @property
+    def broken(self):
+        """
+        True once the scheduler has given up after repeated circuit trips.
+        """
+        return self.state == "broken"
+
+    # Pacing ---------------------------------------------------------
+
+    def _reserve(self):
+        """
+        Returns (delay, reserved): how long to wait, and whether a send slot was
+        reserved after that wait (otherwise wait and ask again).
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.state == "broken":
+                raise CircuitOpenError(
+                    f"{self.name}: circuit opened {self.trips} times in a row"
+                )
+            if self.state == "open":
+                if now < self.open_until:
+                    return self.open_until - now, False
+                # Cool-down over: this caller sends the probe request
+                self.state = "half-open"
+                print(f"{self.name}: circuit half-open, sending a probe request")
+                return 0.0, True
+            if self.state == "half-open":
+                return PROBE_POLL_INTERVAL, False
+            start = max(now, self.paused_until)
+            if self.rate is not None:
+                start = max(start, self.next_send)
+                self.next_send = start + 1.0 / self.rate
+            self.sent.append(start)
+            while self.sent[0] < now - RATE_WINDOW:
+                self.sent.popleft()
+            return start - now, True
+
+    def acquire(self):
+        """
+        Blocks until the caller may send one request.
+        """
+        while True:
+            delay, reserved = self._reserve()
+            if delay > 0:
+                time.sleep(delay)
+            if reserved:
+                return
+
+    async def acquire_async(self):
+        while True:
+            delay, reserved = self._reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if reserved:
+                return
+
+    # Feedback -------------------------------------------------------
+
+    def _set_rate_gauge(self):
+        if self.rate is not None:
+            metrics.get_metrics().set_gauge(
+                "scheduler_rate", self.rate, scheduler=self.name
+            )
+
+    def _observed_rate(self, now):
+        # Called with the lock held
+        if not self.sent:
+            return self.min_rate
+        return len(self.sent) / max(1.0, now - self.sent[0])
+
+    def _decrease(self, factor, now):
+        # Called with the lock held
+        if now - self.last_decrease < DECREASE_INTERVAL:
+            return
+        self.last_decrease = now
+        if self.rate is None:
+            self.rate = self._observed_rate(now)
+        self.rate = max(self.min_rate, self.rate * factor)
+
+    def record_success(self, latency=None):
+        with self.lock:
+            now = time.monotonic()
+            if self.state == "half-open":
+                print(f"{self.name}: circuit closed, resuming")
+                self.state = "closed"
+            self.consecutive_failures = 0
+            self.trips = 0
+            if latency is not None and latency > self.latency_target:
+                self._decrease(LATENCY_DECREASE_FACTOR, now)
+            elif self.rate is not None:
+                self.rate += ADDITIVE_INCREASE / self.rate
+                if self.rate >= self.max_rate:
+                    self.rate = None
+        self._set_rate_gauge()
+
+    def record_throttle(self, retry_after=None):
+        """
+        A 429: halves the rate and holds every sender back for `retry_after` seconds
+        (or the backoff when the server does not say).
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.state == "half-open":
+                # The provider answers again, it just wants us slower
+                print(f"{self.name}: circuit closed, resuming")
+                self.state = "closed"
+            self._decrease(DECREASE_FACTOR, now)
+            pause = retry_after if retry_after is not None else self.backoff
+            self.paused_until = max(
+                self.paused_until, now + min(pause, self.max_backoff)
+            )
+        metrics.get_metrics().inc("scheduler_throttled_total", scheduler=self.name)
+        self._set_rate_gauge()
+
+    def record_failure(self):
+        """
+        A server error, timeout or connection failure: cuts the rate, backs off and
+        opens the circuit after `failure_threshold` consecutive failures.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.consecutive_failures += 1
+            self._decrease(DECREASE_FACTOR, now)
+            pause = self.backoff * 2 ** (self.consecutive_failures - 1)
+            self.paused_until = max(
+                self.paused_until, now + min(pause, self.max_backoff)
+            )
+            if self.state == "half-open" or (
+                self.state == "closed"
+                and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.trips += 1
+                if self.trips >= self.max_trips:
+                    self.state = "broken"
+                    print(
+                        f"{self.name}: circuit opened {self.trips} times in a row; "
+                        "giving up"
+                    )
+                else:
+                    self.state = "open"
+                    self.open_until = now + self.cooldown
+                    print(
+                        f"{self.name}: circuit open after "
+                        f"{self.consecutive_failures} consecutive failures; "
+                        f"pausing for {self.cooldown:g}s"
+                    )
+                metrics.get_metrics().inc(
+                    "scheduler_circuit_opened_total", scheduler=self.name
+                )
+        metrics.get_metrics().inc("scheduler_failures_total", scheduler=self.name)
+        self._set_rate_gauge()
+
+    def update_from_headers(self, headers):
+        """
+        Caps the rate from rate-limit response headers: with `remaining` requests
+        left until the window resets, send no faster than remaining / reset, and
+        wait for the reset when nothing is left.
+        """
+        if not headers:
+            return
+        headers = {str(key).lower(): value for key, value in headers.items()}
+        remaining = first_header(
+            headers,
+            [
+                "x-ratelimit-remaining-requests",
+                "ratelimit-remaining",
+                "x-ratelimit-remaining",
+            ],
+        )
+        reset = parse_reset(
+            first_header(
+                headers,
+                ["x-ratelimit-reset-requests", "ratelimit-reset", "x-ratelimit-reset"],
+            )
+        )
+        try:
+            remaining = float(remaining) if remaining is not None else None
+        except ValueError:
+            remaining = None
+        if remaining is None or reset is None:
+            return
+        with self.lock:
+            now = time.monotonic()
+            if remaining <= 0:
+                self.paused_until = max(self.paused_until, now + reset)
+            elif reset > 0:
+                cap = remaining / reset
+                if self.rate is None and cap < self._observed_rate(now):
+                    self.rate = cap
+                elif self.rate is not None:
+                    self.rate = min(self.rate, cap)
+                if self.rate is not None:
+                    self.rate = max(self.min_rate, self.rate)
+        self._set_rate_gauge()
+
+    # Calls ----------------------------------------------------------
+
+    def _handle_error(self, error, latency, attempt):
+        """
+        Feeds a failed call back into the scheduler and counts it by kind. Only
+        circuit state changes are printed, so an outage does not log every attempt.
+        Returns True if the call should be retried.
+        """
+        kind = error_kind(error)
+        headers = error_headers(error)
+        self.update_from_headers(headers)
+        if kind == "throttle":
+            lowered = {str(key).lower(): value for key, value in headers.items()}
+            self.record_throttle(parse_retry_after(lowered.get("retry-after")))
+        elif kind == "failure":
+            self.record_failure()
+        else:
+            # The provider answered, so the rate and the circuit are fine
+            self.record_success(latency)
+        metrics.get_metrics().inc(
+            "scheduler_failed_attempts_total", scheduler=self.name, kind=kind
+        )
+        if kind == "fatal" or attempt >= self.max_attempts:
+            return False
+        metrics.get_metrics().inc("scheduler_retries_total", scheduler=self.name)
+        return True
+
+    def call(self, func, *args, **kwargs):
+        """
+        Calls `func(*args, **kwargs)` when the scheduler allows, retrying failures
+        up to `max_attempts` times. Raises the last error, or CircuitOpenError.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self.acquire()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if self._handle_error(e, time.perf_counter() - start, attempt):
+                    continue
+                raise
+            self.record_success(time.perf_counter() - start)
+            return result
+
+    async def acall(self, func, *args, **kwargs):
+        """
+        Async version of `call` for coroutine functions.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            await self.acquire_async()
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                if self._handle_error(e, time.perf_counter() - start, attempt):
+                    continue
+                raise
+            self.record_success(time.perf_counter() - start)
+            return result
+
+    def stats(self):
+        with self.lock:
+            return {
+                "rate": self.rate,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "trips": self.trips,
+            }
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(name, **kwargs):
+    """
+    Returns the process-wide scheduler called `name`, creating it with `kwargs` on
+    first use.
+    """
+    with _schedulers_lock:
+        if name not in _schedulers:
+            _schedulers[name] = AdaptiveScheduler(name, **kwargs)
+        return _schedulers[name]
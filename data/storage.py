@@ -0,0 +1,226 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import metrics
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+# Columnar store shared by the pipeline stages
+RESEARCH_STORE = "person_research_outputs.parquet"
+# Flat export read by the dashboard (and read once to migrate older runs)
+RESEARCH_CSV = "person_research_outputs.csv"
+
+# Normalized tables written next to the flat store: one row per article, and one
+# row per (person, article) authorship
+ARTICLES_STORE = "articles.parquet"
+AUTHORSHIPS_STORE = "authorships.parquet"
+ARTICLE_COLUMNS = [
+    "article_uuid",
+    "title",
+    "publication_year",
+    "doi",
+    "abstract",
+    "journal_title",
+    "journal_issn",
+]
+AUTHORSHIP_COLUMNS = ["person_uuid", "article_uuid"]
+
+# Explicit dtypes so values survive the round-trip (no object/float drift)
+RESEARCH_SCHEMA = {
+    "person_uuid": "string",
+    "name": "string",
+    "email": "string",
+    "department": "string",
+    "active": "boolean",
+    "article_uuid": "string",
+    "title": "string",
+    "publication_year": "Int64",
+    "doi": "string",
+    "abstract": "string",
+    "journal_title": "string",
+    "journal_issn": "string",
+    "is_sustain": "Int64",
+    "top 1": "Int64",
+    "top 2": "Int64",
+    "top 3": "Int64",
+    # Classification state: "ok", "failed" or "pending" (see main.py)
+    "sdg_status": "string",
+    "sdg_attempts": "Int64",
+    "sdg_error": "string",
+    "Financial Times": "Int64",
+    "UT Dallas": "Int64",
+    "General Business": "Int64",
+}
+
+BOOLEAN_VALUES = {
+    True: True,
+    False: False,
+    "True": True,
+    "False": False,
+    "true": True,
+    "false": False,
+}
+
+
+def apply_schema(df):
+    """
+    Casts the known research-output columns of `df` to their schema dtypes.
+    Columns outside the schema are left as they are.
+    """
+    for column, dtype in RESEARCH_SCHEMA.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if dtype == "boolean":
+            if values.dtype != "boolean":
+                values = values.map(BOOLEAN_VALUES).astype("boolean")
+        elif dtype == "Int64":
+            values = pd.to_numeric(values, errors="coerce").astype("Int64")
+        else:
+            values = values.astype(dtype)
+        df[column] = values
+    return df
+
+
+def research_outputs_exist(path=RESEARCH_STORE, csv_path=RESEARCH_CSV):
+    return os.path.exists(path) or os.path.exists(csv_path)
+
+
+@metrics.timed
+def read_research_outputs(columns=None, path=RESEARCH_STORE, csv_path=RESEARCH_CSV):
+    """
+    Loads the research outputs, optionally projecting to `columns` (missing ones are
+    skipped) so that stages which do not need abstracts never read them.
+    Falls back to the CSV export when no Parquet store exists yet.
+    Returns None if neither file exists.
+    """
+    if os.path.exists(path):
+        if columns is not None:
+            available = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in available]
+        df = pd.read_parquet(path, columns=columns)
+    elif os.path.exists(csv_path):
+        df = pd.read_csv(
+            csv_path, usecols=(lambda c: c in columns) if columns is not None else None
+        )
+    else:
+        return None
+    return apply_schema(df)
+
+
+@metrics.timed
+def write_research_outputs(df, path=RESEARCH_STORE):
+    """
+    Writes the research outputs to the Parquet store (atomically replaced).
+    """
+    df = apply_schema(df.copy())
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def split_research_outputs(df):
+    """
+    Splits the flat author-article view into the articles table (fetched article
+    fields, once per article_uuid) and the authorships link table.
+    """
+    articles = df[[c for c in ARTICLE_COLUMNS if c in df.columns]]
+    articles = articles.drop_duplicates(subset="article_uuid")
+    authorships = df[AUTHORSHIP_COLUMNS].drop_duplicates()
+    return articles, authorships
+
+
+@metrics.timed
+def write_normalized_tables(
+    df, articles_path=ARTICLES_STORE, authorships_path=AUTHORSHIPS_STORE
+):
+    """
+    Writes the articles and authorships tables derived from the flat view `df`.
+    """
+    articles, authorships = split_research_outputs(df)
+    for table, path in ((articles, articles_path), (authorships, authorships_path)):
+        table = apply_schema(table.reset_index(drop=True).copy())
+        tmp_path = path + ".tmp"
+        table.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    print(
+        f"Saved {len(articles)} articles to '{articles_path}' and "
+        f"{len(authorships)} authorships to '{authorships_path}'."
+    )
+
+
+class ParquetAppender:
+    """
+    Appends DataFrame chunks to a Parquet file row group by row group, with the
+    schema dtypes fixed up front. Chunks go to a temporary file that replaces
+    `path` on commit(), so readers never see a partial store.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.columns = list(columns)
+        # The schema (with pandas dtypes metadata) of an empty frame of `columns`
+        empty = apply_schema(
+            pd.DataFrame({c: pd.Series(dtype=object) for c in self.columns})
+        )
+        self.schema = pa.Schema.from_pandas(empty, preserve_index=False)
+        self.writer = pq.ParquetWriter(self.tmp_path, self.schema)
+
+    def write(self, df):
+        if len(df) == 0:
+            return
+        df = apply_schema(df[self.columns].reset_index(drop=True).copy())
+        self.writer.write_table(
+            pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        )
+
+    def commit(self):
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.writer.close()
+        os.remove(self.tmp_path)
+
+
+@metrics.timed
+def update_research_columns(columns_df, path=RESEARCH_STORE):
+    """
+    Replaces or appends the columns of `columns_df` (row-aligned with the store) and
+    rewrites the store at the Arrow level, so untouched columns such as abstracts are
+    never converted to pandas objects.
+    """
+    table = pq.read_table(path)
+    if len(columns_df) != table.num_rows:
+        raise ValueError(
+            f"Expected {table.num_rows} rows to update '{path}', got {len(columns_df)}."
+        )
+    columns_df = apply_schema(columns_df.reset_index(drop=True).copy())
+    for column in columns_df.columns:
+        array = pa.Array.from_pandas(columns_df[column])
+        if column in table.column_names:
+            index = table.column_names.index(column)
+            table = table.set_column(index, column, array)
+        else:
+            table = table.append_column(column, array)
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+@metrics.timed
+def export_csv(csv_path=RESEARCH_CSV, path=RESEARCH_STORE, df=None):
+    """
+    Writes the flat CSV the dashboard reads, from `df` if given, else from the
+    Parquet store.
+    """
+    if df is None:
+        df = read_research_outputs(path=path, csv_path=csv_path)
+    df.to_csv(csv_path, index=False)
+    print(f"Exported dashboard CSV to '{csv_path}'.")
+    return df
@@ -0,0 +1,140 @@
+"""
+Local stand-in for the Experts (Pure) API used to exercise the fetchers offline.
+
+It serves /persons/{id}/research-outputs with the same size/offset paging contract
+as the live API, returning a deterministic number of synthetic outputs per person.
+Outputs carry info.modifiedDate and honour order=modified&orderBy=descending.
+Latency and periodic 429 responses can be injected.
+
+Usage:
+    python stub_experts_server.py --port 8765 --latency 0.05
+    EXPERTS_API_URL=http://127.0.0.1:8765 python main.py
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RESEARCH_OUTPUTS_PATH = re.compile(r"^/persons/([^/]+)/research-outputs$")
+
+
+def outputs_for_person(person_uuid, max_outputs=120):
+    """
+    Deterministic synthetic research outputs for a person.
+    """
+    seed = int(hashlib.md5(person_uuid.encode("utf-8")).hexdigest()[:8], 16)
+    count = seed % max_outputs
+    outputs = []
+    for i in range(count):
+        article_seed = (seed + i * 7919) % 100000
+        outputs.append(
+            {
+                "uuid": f"article-{article_seed:05d}",
+                "title": {"value": f"Synthetic study {article_seed}"},
+                "subTitle": (
+                    {"value": f"Part {article_seed % 3}"}
+                    if article_seed % 4 == 0
+                    else {}
+                ),
+                "publicationStatuses": [
+                    {"publicationDate": {"year": 2000 + article_seed % 25}}
+                ],
+                "electronicVersions": [{"doi": f"10.1000/{article_seed}"}],
+                "abstract": {
+                    "text": [{"value": f"Abstract of study {article_seed}. " * 10}]
+                },
+                "journalAssociation": {
+                    "title": {"value": f"Journal {article_seed % 50}"},
+                    "issn": {"value": f"{article_seed % 50:04d}-0000"},
+                },
+                "info": {
+                    "modifiedDate": f"2024-01-{1 + article_seed % 28:02d}T12:00:00.000Z"
+                },
+            }
+        )
+    return outputs
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            request_number = server.request_count
+        if server.latency:
+            time.sleep(server.latency)
+        if server.throttle_every and request_number % server.throttle_every == 0:
+            self.send_json(429, {"error": "Too Many Requests"}, {"Retry-After": "0"})
+            return
+
+        url = urlparse(self.path)
+        match = RESEARCH_OUTPUTS_PATH.match(url.path)
+        if not match:
+            self.send_json(404, {"error": "Not Found"})
+            return
+        query = parse_qs(url.query)
+        size = int(query.get("size", ["10"])[0])
+        offset = int(query.get("offset", ["0"])[0])
+        outputs = outputs_for_person(match.group(1), server.max_outputs)
+        if query.get("order") == ["modified"]:
+            outputs.sort(
+                key=lambda item: item["info"]["modifiedDate"],
+                reverse=query.get("orderBy") == ["descending"],
+            )
+        self.send_json(
+            200,
+            {"count": len(outputs), "items": outputs[offset : offset + size]},
+        )
+
+
+def start_stub_server(port=0, latency=0.0, throttle_every=0, max_outputs=120):
+    """
+    Starts the stub server on a background thread.
+    Returns the server and its base URL; call server.shutdown() when done.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.throttle_every = throttle_every
+    server.max_outputs = max_outputs
+    server.lock = threading.Lock()
+    server.request_count = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.port, args.latency, args.throttle_every)
+    print(f"Stub Experts API listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# The pipeline modules are flat scripts in data/, imported by module name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# determine.py asks for a key at import time; the tests only use the fake model
+os.environ.setdefault("OPENAI_API_KEY", "mock-key")
+
+
+@pytest.fixture
+def fake_service(tmp_path, monkeypatch):
+    """
+    determine's ClassifierService with the fake chat model and embeddings, and an
+    empty LLM cache in a scratch directory.
+    """
+    import fakes
+    import llm_cache
+
+    monkeypatch.chdir(tmp_path)
+    if llm_cache._cache is not None:
+        llm_cache._cache.close()
+    llm_cache._cache = None
+    yield fakes.install_fakes()
+    if llm_cache._cache is not None:
+        llm_cache._cache.close()
+    llm_cache._cache = None
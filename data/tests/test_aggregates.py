@@ -0,0 +1,100 @@
+import gzip
+import json
+
+import pandas as pd
+
+import aggregates
+import storage
+
+
+def make_research():
+    df = pd.DataFrame(
+        {
+            "person_uuid": ["p1", "p2", "p1", "p3"],
+            "name": ["Ann", "Bo", "Ann", "Cy"],
+            "email": ["ann@x.edu", "bo@x.edu", "ann@x.edu", None],
+            "department": ["Finance", "Accountancy", "Finance", "Finance"],
+            "active": [True, False, True, True],
+            "article_uuid": ["a1", "a1", "a2", "a3"],
+            "title": ["One", "One", "Two", "Three"],
+            "publication_year": [2020, 2020, 2021, None],
+            "doi": ["10.1/1", "10.1/1", "No DOI", None],
+            "abstract": ["About one", "About one", "N/A", "About three"],
+            "journal_title": ["J", "J", "K", "J"],
+            "journal_issn": ["1", "1", "2", "1"],
+            "is_sustain": [1, 1, 0, None],
+            "top 1": [13, 13, 0, None],
+            "top 2": [7, 7, 0, None],
+            "top 3": [0, 0, 0, None],
+            "Financial Times": [1, 1, 0, None],
+            "UT Dallas": [0, 0, 1, 0],
+            "General Business": [1, 1, 1, 0],
+        }
+    )
+    return storage.apply_schema(df)
+
+
+def read_gzip_json(path):
+    with open(path, "rb") as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+def test_article_index_rebuilds_author_rows(tmp_path):
+    research_df = make_research()
+    aggregates.write_aggregates(research_df, output_dir=str(tmp_path))
+
+    index = read_gzip_json(tmp_path / "article_index.json.gz")
+    articles, persons, authorships = (
+        index["articles"],
+        index["persons"],
+        index["authorships"],
+    )
+    assert "abstract" not in articles
+    rows = [
+        (persons["person_uuid"][p], articles["article_uuid"][a])
+        for a, p in zip(authorships["article"], authorships["person"])
+    ]
+    assert rows == list(zip(research_df["person_uuid"], research_df["article_uuid"]))
+    assert articles["goals"][0] == [13, 7, 0]
+    assert articles["goals"][2] == [0, 0, 0]
+    assert articles["financial_times"] == [1, 0, 0]
+    assert articles["year"] == ["2020", "2021", ""]
+    assert persons["department"] == ["Finance", "Accountancy", "Finance"]
+    assert persons["email"][2] == ""
+
+    abstracts = read_gzip_json(tmp_path / "abstracts.json.gz")
+    assert abstracts == {"a1": "About one", "a3": "About three"}
+
+
+def read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_first_view_counts_general_business_articles(tmp_path):
+    aggregates.write_aggregates(make_research(), output_dir=str(tmp_path))
+    summary = read_json(tmp_path / "summary.json")
+    # a3 is not in a General Business journal; a1 and a2 are counted for p1
+    assert summary["articles"] == 2
+    assert summary["sustainable"] == 1
+    assert summary["top_journal"] == 2
+    assert summary["top_journal_sustainable"] == 1
+    assert summary["faculty"] == 1
+    assert summary["engaging_faculty"] == 1
+    assert summary["departments"] == 1
+    # The filters offer every department and year
+    assert summary["filters"] == {
+        "departments": ["Accountancy", "Finance"],
+        "years": ["2020", "2021"],
+    }
+
+    assert read_json(tmp_path / "by_sdg.json") == {"7": 1, "13": 1}
+    assert read_json(tmp_path / "by_year.json") == {
+        "2020": {"articles": 1, "sustainable": 1, "top_journal": 1},
+        "2021": {"articles": 1, "sustainable": 0, "top_journal": 1},
+    }
+    assert sorted(path.name for path in tmp_path.glob("*.json")) == [
+        "by_sdg.json",
+        "by_year.json",
+        "summary.json",
+    ]
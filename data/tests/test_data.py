@@ -0,0 +1,184 @@
+import pandas as pd
+import pytest
+
+import data
+import experts_client
+import main
+import storage
+from scheduler import AdaptiveScheduler
+from stub_experts_server import start_stub_server
+
+
+@pytest.fixture
+def stub_client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server, base_url = start_stub_server()
+    client = experts_client.ExpertsClient(base_url=base_url, backoff=0.01)
+    monkeypatch.setattr(data, "_client", client)
+    yield client
+    client.close()
+    server.shutdown()
+
+
+def make_faculty(persons=5):
+    return pd.DataFrame(
+        {
+            "uuid": [f"person-{i}" for i in range(persons)],
+            "name": [f"Person {i}" for i in range(persons)],
+            "email": [f"person{i}@example.edu" for i in range(persons)],
+            "department": "Finance",
+            "active": True,
+        }
+    )
+
+
+def test_empty_batch_has_mergeable_columns(stub_client):
+    articles, authorships = data.fetch_articles_and_authorships(
+        ["person-0"], client=stub_client, sync_state={"person-0": "2100-01-01"}
+    )
+    assert articles.empty and authorships.empty
+    flat = data.flat_research_outputs(articles, authorships, make_faculty())
+    assert list(flat.columns) == data.RESEARCH_OUTPUT_COLUMNS
+
+
+def test_incremental_rerun_without_changes(stub_client):
+    make_faculty().to_csv(main.FACULTY_FILE, index=False)
+    main.update_research_outputs()
+    first = storage.read_research_outputs()
+    assert len(first) > 0
+    assert len(data.load_sync_state()) > 0
+
+    # Nothing changed on the API side: every person is fetched incrementally
+    requests_before = stub_client.latency_stats()["requests"]
+    main.update_research_outputs()
+    second = storage.read_research_outputs()
+    assert stub_client.latency_stats()["requests"] - requests_before == 5
+    assert set(zip(second["person_uuid"], second["article_uuid"])) == set(
+        zip(first["person_uuid"], first["article_uuid"])
+    )
+
+
+def test_first_full_fetch_streams_into_the_stores(stub_client):
+    make_faculty().to_csv(main.FACULTY_FILE, index=False)
+    assert main.update_research_outputs(return_df=False) is None
+    streamed = storage.read_research_outputs()
+    marks = data.load_sync_state()
+    assert len(streamed) > 0 and len(marks) == 5
+
+    # With a dataset to merge into, the update runs in memory
+    updated = main.update_research_outputs(return_df=False)
+    assert updated is not None
+    assert set(zip(updated["person_uuid"], updated["article_uuid"])) == set(
+        zip(streamed["person_uuid"], streamed["article_uuid"])
+    )
+
+
+def test_streaming_rejects_incremental_sync(stub_client):
+    with pytest.raises(ValueError, match="incremental"):
+        data.stream_research_outputs(
+            make_faculty(), sync_state={"person-0": "2020-01-01T00:00:00"}
+        )
+
+
+def test_open_circuit_leaves_persons_for_next_run(stub_client):
+    sync_state = {}
+    data.fetch_articles_and_authorships(
+        ["person-0", "person-1"], client=stub_client, sync_state=sync_state
+    )
+    marks = dict(sync_state)
+    assert len(marks) == 2
+
+    stub_client.scheduler = AdaptiveScheduler(
+        "experts", failure_threshold=1, max_trips=1, backoff=0
+    )
+    stub_client.scheduler.record_failure()
+    assert stub_client.scheduler.broken
+    articles, authorships = data.fetch_articles_and_authorships(
+        ["person-0", "person-1", "person-2"],
+        client=stub_client,
+        sync_state=sync_state,
+    )
+    assert articles.empty and authorships.empty
+    assert sync_state == marks
+
+
+class PagedResponse:
+    status_code = 200
+
+    def __init__(self, items):
+        self.items = items
+
+    def json(self):
+        return {"items": self.items}
+
+
+class ListClient:
+    """
+    Serves fixed research outputs in the given order, whatever ordering is asked
+    for, and records the params of every request.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.requests = []
+
+    def get(self, path, params=None):
+        self.requests.append(dict(params))
+        offset, size = params["offset"], params["size"]
+        return PagedResponse(self.items[offset : offset + size])
+
+
+def make_outputs(dates):
+    return [
+        {"uuid": f"article-{i}", "info": {"modifiedDate": date}}
+        for i, date in enumerate(dates)
+    ]
+
+
+def test_incremental_fetch_stops_at_watermark():
+    client = ListClient(make_outputs(["2024-03-01", "2024-02-01", "2023-12-01"]))
+    outputs, ok = data.fetch_changed_research_outputs_for_person(
+        "p", pd.Timestamp("2024-01-01", tz="UTC"), client=client
+    )
+    assert ok
+    assert [item["uuid"] for item in outputs] == ["article-0", "article-1"]
+    assert len(client.requests) == 1
+
+
+def test_unordered_page_falls_back_to_full_fetch(monkeypatch):
+    monkeypatch.setattr(data, "INCREMENTAL_PAGE_SIZE", 2)
+    # The second page holds a change newer than the first page's outputs
+    dates = ["2024-03-01", "2024-02-01", "2024-04-01", "2023-12-01", "2023-11-01"]
+    client = ListClient(make_outputs(dates))
+    outputs, ok = data.fetch_changed_research_outputs_for_person(
+        "p", pd.Timestamp("2024-01-01", tz="UTC"), client=client
+    )
+    assert ok
+    assert len(outputs) == len(dates)
+    assert "order" not in client.requests[-1]
+
+    sync_state = {"p": "2024-01-01T00:00:00+00:00"}
+    data._fetch_person_outputs("p", ListClient(make_outputs(dates)), sync_state)
+    assert sync_state["p"].startswith("2024-04-01")
+
+
+def test_experts_client_prints_only_the_final_failure(capsys):
+    # Nothing listens on the port, so every attempt fails to connect
+    client = experts_client.ExpertsClient(
+        base_url="http://127.0.0.1:9", max_retries=2, backoff=0.01
+    )
+    with pytest.raises(experts_client.requests.ConnectionError):
+        client.get("/persons")
+    client.close()
+    assert client.latency_stats()["retries"] == 2
+    out = capsys.readouterr().out
+    assert "retrying" not in out
+    assert out.count("failed after 3 attempts") == 1
+
+
+def test_rankings_without_research_outputs_name_the_missing_store(
+    tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError, match="store 'missing.parquet'"):
+        data.add_journal_rankings("missing.parquet", "journals.xlsx")
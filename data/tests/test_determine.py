@@ -0,0 +1,130 @@
+import pytest
+
+import determine
+import fakes
+import llm_engine
+
+
+def test_fused_classifies_articles(fake_service):
+    df = determine.classify_sdg_fused(fakes.make_articles(10))
+    assert df["is_sustain"].notna().all()
+    assert (df["sdg_status"] == determine.STATUS_OK).all()
+
+
+def test_fused_marks_articles_failed_when_retrieval_fails(fake_service, monkeypatch):
+    def fail(df):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(determine, "retrieve_candidate_goals", fail)
+    df = determine.classify_sdg_fused(fakes.make_articles(10))
+    assert df["is_sustain"].isna().all()
+    assert df["top 1"].isna().all()
+    assert (df["sdg_status"] == determine.STATUS_FAILED).all()
+    assert (df["sdg_error"] == "RuntimeError").all()
+
+
+class ReplyChain:
+    """
+    Stands in for a chain: answers every question with the next of `replies`.
+    """
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+
+    async def ainvoke(self, inputs):
+        return self.replies.pop(0)
+
+
+def test_malformed_relevance_reply_is_a_failure(fake_service):
+    articles = fakes.make_articles(4)
+    replies = [{"result": 1}, "not json", {"answer": "yes"}, '{"result": 0}']
+    df = determine.classify_sdg_relevance(
+        articles.copy(), concurrency=1, sustain_chain=ReplyChain(replies)
+    )
+    assert df["is_sustain"].tolist()[::3] == [1, 0]
+    assert df["is_sustain"].iloc[1:3].isna().all()
+    assert df["sdg_status"].tolist() == ["ok", "failed", "failed", "ok"]
+    assert df["sdg_error"].iloc[1] == "MalformedOutputError"
+
+    # Malformed replies are not cached: only those two articles are asked again
+    retry = ReplyChain([{"result": 1}, {"result": 0}])
+    df = determine.classify_sdg_relevance(
+        articles.copy(), concurrency=1, sustain_chain=retry
+    )
+    assert retry.replies == []
+    assert df["is_sustain"].tolist() == [1, 1, 0, 0]
+    assert (df["sdg_status"] == determine.STATUS_OK).all()
+
+
+def test_parse_relevance_output_rejects_missing_result():
+    assert determine.parse_relevance_output('{"result": "1"}') == 1
+    for output in ["", "{}", '{"result": 2}', {"result": None}, ["result", 1]]:
+        with pytest.raises(determine.MalformedOutputError):
+            determine.parse_relevance_output(output)
+
+
+class BatchChain:
+    """
+    Answers batched relevance questions with 1 for every article, leaving out the
+    ids in `missing` for the first `missing_rounds` calls that ask about them, and
+    adding an answer for an article that was never asked about.
+    """
+
+    def __init__(self, missing, missing_rounds=1):
+        self.missing = dict.fromkeys(missing, missing_rounds)
+        self.batch_sizes = []
+
+    async def ainvoke(self, inputs):
+        ids = [
+            article_id
+            for article_id, _ in fakes.BATCH_ARTICLE.findall(inputs["question"])
+        ]
+        self.batch_sizes.append(len(ids))
+        answers = [{"article_uuid": "not-asked", "result": 1}]
+        for article_id in ids:
+            if self.missing.get(article_id, 0) > 0:
+                self.missing[article_id] -= 1
+                continue
+            answers.append({"article_uuid": article_id, "result": 1})
+        return answers
+
+
+def test_batched_requeries_missing_articles_in_smaller_batches(fake_service):
+    articles = fakes.make_articles(6)
+    chain = BatchChain(["article-00001", "article-00004"])
+    df = determine.classify_sdg_relevance_batched(
+        articles, batch_size=4, concurrency=1, batch_chain=chain
+    )
+    # Two batches, then the two missing articles re-queried in a batch of two
+    assert chain.batch_sizes == [4, 2, 2]
+    assert df["is_sustain"].tolist() == [1] * 6
+    assert (df["sdg_status"] == determine.STATUS_OK).all()
+
+
+def test_batched_gives_up_after_max_repairs(fake_service):
+    articles = fakes.make_articles(4)
+    chain = BatchChain(["article-00002"], missing_rounds=10)
+    df = determine.classify_sdg_relevance_batched(
+        articles, batch_size=4, concurrency=1, batch_chain=chain, max_repairs=2
+    )
+    assert chain.batch_sizes == [4, 1, 1]
+    assert df["is_sustain"].isna().tolist() == [False, False, True, False]
+    assert df["sdg_status"].iloc[2] == determine.STATUS_FAILED
+    assert df["sdg_error"].iloc[2] == "MissingFromBatch"
+    assert "not-asked" not in set(df["article_uuid"])
+
+
+def test_run_chain_stages_share_the_service_rate_limiter(fake_service):
+    limiter = fake_service.rate_limiter(60, 1000)
+    assert fake_service.rate_limiter(60, 1000) is limiter
+    assert fake_service.rate_limiter(120, 1000) is not limiter
+
+    async def echo(item):
+        return item
+
+    # The bucket's level carries over from one run_chain (and event loop) to the next
+    llm_engine.run_chain(echo, [1, 2], limiter=limiter)
+    level = limiter.requests.tokens
+    assert level < 59
+    llm_engine.run_chain(echo, [3], limiter=limiter)
+    assert limiter.requests.tokens < level
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+
+import embedding_store
+
+
+def make_store(tmp_path):
+    return embedding_store.EmbeddingStore(
+        matrix_path=str(tmp_path / "vectors.npy"),
+        index_path=str(tmp_path / "index.csv"),
+    )
+
+
+def test_add_appends_in_place(tmp_path):
+    store = make_store(tmp_path)
+    rng = np.random.default_rng(0)
+    batches = [rng.random((n, 8), dtype="float32") for n in (3, 5, 1, 12)]
+    inode = None
+    for b, vectors in enumerate(batches):
+        ids = [f"a{b}-{i}" for i in range(len(vectors))]
+        store.add(ids, ["h"] * len(ids), vectors)
+        stat = os.stat(store.matrix_path)
+        # The first batch creates the file; later ones must not replace it
+        inode = inode or stat.st_ino
+        assert stat.st_ino == inode
+
+    matrix = embedding_store.open_matrix(store.matrix_path)
+    np.testing.assert_array_equal(matrix, np.concatenate(batches))
+    assert store.lookup(["a2-0"], ["h"]).tolist() == [8]
+
+    reopened = make_store(tmp_path)
+    assert len(reopened) == 21
+
+
+def test_interrupted_append_is_ignored_and_overwritten(tmp_path):
+    store = make_store(tmp_path)
+    store.add(["a"], ["h"], np.ones((1, 4), dtype="float32"))
+    # Rows written without the header update, as left by a crash
+    with open(store.matrix_path, "ab") as f:
+        f.write(np.full((2, 4), 9, dtype="float32").tobytes())
+    assert embedding_store.open_matrix(store.matrix_path).shape == (1, 4)
+
+    store.add(["b"], ["h"], np.zeros((1, 4), dtype="float32"))
+    np.testing.assert_array_equal(
+        embedding_store.open_matrix(store.matrix_path), [[1] * 4, [0] * 4]
+    )
+
+
+def test_header_without_spare_room_is_rewritten(tmp_path):
+    path = tmp_path / "vectors.npy"
+    header = "{'descr': '<f4', 'fortran_order': False, 'shape': (1, 4), }"
+    header += " " * (64 - 10 - 1 - len(header)) + "\n"
+    with open(path, "wb") as f:
+        f.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little"))
+        f.write(header.encode("latin1"))
+        f.write(np.ones((1, 4), dtype="float32").tobytes())
+
+    start = embedding_store.append_rows(str(path), np.zeros((100, 4), "float32"))
+    assert start == 1
+    matrix = embedding_store.open_matrix(str(path))
+    assert matrix.shape == (101, 4)
+    assert matrix[0].tolist() == [1] * 4 and matrix[1:].sum() == 0
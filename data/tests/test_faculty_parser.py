@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import faculty_parser
+
+FIXTURE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "fixtures",
+    "faculty_profiles.html",
+)
+EXPECTED = {
+    "name": ["Jane Doe", "Alex Smith", "Sam Lee", "Pat Kim"],
+    "department": [
+        "Finance",
+        "Accountancy",
+        "Business Administration",
+        "Business Administration",
+    ],
+    "description": [
+        "Professor of Finance",
+        "Associate Professor",
+        "Description not found",
+        "Clinical Assistant Professor",
+    ],
+    "contact": [
+        "janedoe@illinois.edu",
+        "asmith@illinois.edu",
+        "samlee@illinois.edu",
+        "Contact not found",
+    ],
+    "url": [
+        "/profile/jane-doe",
+        "/profile/alex-smith",
+        "/profile/sam-lee",
+        "URL not found",
+    ],
+}
+
+
+def read_fixture():
+    with open(FIXTURE) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("backend", faculty_parser.BACKENDS)
+def test_parse_fixture(backend):
+    pytest.importorskip(backend)
+    assert faculty_parser.parse_faculty_table(read_fixture(), backend) == EXPECTED
+
+
+def test_extract_results_table_keeps_nested_tables():
+    html = (
+        '<div><table class="nav"></table><table class="results wide"><tbody>'
+        "<tr><td><table><tr><td>x</td></tr></table></td></tr></tbody></table>"
+        "<footer>after</footer></div>"
+    )
+    table = faculty_parser.extract_results_table(html)
+    assert table.startswith('<table class="results wide">')
+    assert table.endswith("</tbody></table>")
+
+
+def test_page_without_listing():
+    html = (
+        '<html><body><div id="app"></div><script src="app.js"></script></body></html>'
+    )
+    assert faculty_parser.parse_faculty_table(html) is None
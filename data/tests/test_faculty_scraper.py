@@ -0,0 +1,181 @@
+import json
+
+import pytest
+import requests
+
+import faculty_scraper
+from test_faculty_parser import EXPECTED, read_fixture
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    # The fixture has a handful of rows, not a full listing
+    monkeypatch.setattr(faculty_scraper, "MIN_STATIC_ROWS", 1)
+    return str(tmp_path / "directory_cache.json")
+
+
+@pytest.fixture
+def no_browser(monkeypatch):
+    def fail(url, cache=None):
+        raise AssertionError("headless fallback should not run")
+
+    monkeypatch.setattr(faculty_scraper, "fetch_directory_selenium", fail)
+
+
+def test_http_path_parses_and_caches(cache_path, no_browser):
+    session = FakeSession(FakeResponse(200, read_fixture(), {"ETag": '"v1"'}))
+    df = faculty_scraper.scrape_faculty_directory(
+        cache_path=cache_path, session=session
+    )
+    assert df.to_dict("list") == EXPECTED
+    assert session.requests == [{}]
+    with open(cache_path) as f:
+        cache = json.load(f)
+    assert cache["etag"] == '"v1"' and cache["source"] == "http"
+    assert cache["records"] == EXPECTED
+
+
+def test_not_modified_uses_cache_without_parsing(cache_path, no_browser, monkeypatch):
+    faculty_scraper.scrape_faculty_directory(
+        cache_path=cache_path,
+        session=FakeSession(FakeResponse(200, read_fixture(), {"ETag": '"v1"'})),
+    )
+    monkeypatch.setattr(
+        faculty_scraper.faculty_parser, "parse_faculty_table", pytest.fail
+    )
+
+    session = FakeSession(FakeResponse(304))
+    df = faculty_scraper.scrape_faculty_directory(
+        cache_path=cache_path, session=session
+    )
+    assert session.requests == [{"If-None-Match": '"v1"'}]
+    assert df.to_dict("list") == EXPECTED
+
+
+def test_unchanged_content_uses_cache_without_parsing(
+    cache_path, no_browser, monkeypatch
+):
+    faculty_scraper.scrape_faculty_directory(
+        cache_path=cache_path,
+        session=FakeSession(FakeResponse(200, read_fixture(), {"ETag": '"v1"'})),
+    )
+    monkeypatch.setattr(
+        faculty_scraper.faculty_parser, "parse_faculty_table", pytest.fail
+    )
+
+    # Same page under a new ETag: matched by content hash, the new ETag is kept
+    df = faculty_scraper.scrape_faculty_directory(
+        cache_path=cache_path,
+        session=FakeSession(FakeResponse(200, read_fixture(), {"ETag": '"v2"'})),
+    )
+    assert df.to_dict("list") == EXPECTED
+    with open(cache_path) as f:
+        assert json.load(f)["etag"] == '"v2"'
+
+
+def test_changed_page_is_parsed_again(cache_path, no_browser):
+    faculty_scraper.scrape_faculty_directory(
+        cache_path=cache_path,
+        session=FakeSession(FakeResponse(200, read_fixture(), {"ETag": '"v1"'})),
+    )
+    changed = read_fixture().replace("Jane Doe", "Jane Roe")
+    df = faculty_scraper.scrape_faculty_directory(
+        cache_path=cache_path,
+        session=FakeSession(FakeResponse(200, changed, {"ETag": '"v2"'})),
+    )
+    assert df["name"].tolist()[0] == "Jane Roe"
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        FakeResponse(200, '<html><body><div id="app"></div></body></html>'),
+        requests.ConnectionError("unreachable"),
+        FakeResponse(503),
+    ],
+    ids=["client-rendered", "connection-error", "server-error"],
+)
+def test_falls_back_to_browser(cache_path, monkeypatch, response):
+    calls = []
+
+    def fake_selenium(url, cache=None):
+        calls.append(url)
+        return faculty_scraper.parse_cached(read_fixture(), cache, "selenium")
+
+    monkeypatch.setattr(faculty_scraper, "fetch_directory_selenium", fake_selenium)
+    df = faculty_scraper.scrape_faculty_directory(
+        cache_path=cache_path, session=FakeSession(response)
+    )
+    assert calls == [faculty_scraper.FACULTY_PROFILES_URL]
+    assert df.to_dict("list") == EXPECTED
+    with open(cache_path) as f:
+        assert json.load(f)["source"] == "selenium"
+
+
+def test_short_static_listing_falls_back_to_browser(tmp_path, monkeypatch):
+    # Below MIN_STATIC_ROWS the static page is taken to be a partial render
+    calls = []
+
+    def fake_selenium(url, cache=None):
+        calls.append(url)
+        return faculty_scraper.parse_cached(read_fixture(), cache, "selenium")
+
+    monkeypatch.setattr(faculty_scraper, "fetch_directory_selenium", fake_selenium)
+    faculty_scraper.scrape_faculty_directory(
+        cache_path=str(tmp_path / "cache.json"),
+        session=FakeSession(FakeResponse(200, read_fixture())),
+    )
+    assert len(calls) == 1
+
+
+def test_browser_etag_is_not_sent(cache_path, monkeypatch):
+    monkeypatch.setattr(
+        faculty_scraper,
+        "fetch_directory_selenium",
+        lambda url, cache=None: faculty_scraper.parse_cached(
+            read_fixture(), cache, "selenium"
+        ),
+    )
+    faculty_scraper.scrape_faculty_directory(
+        cache_path=cache_path,
+        session=FakeSession(FakeResponse(200, "<html></html>", {"ETag": '"x"'})),
+    )
+    session = FakeSession(FakeResponse(200, "<html></html>"))
+    faculty_scraper.scrape_faculty_directory(cache_path=cache_path, session=session)
+    assert session.requests == [{}]
+
+
+def test_rows_settled_waits_for_a_stable_count():
+    class Driver:
+        counts = [0, 3, 5, 5]
+
+        def find_elements(self, by, selector):
+            return [None] * self.counts.pop(0)
+
+    condition = faculty_scraper.RowsSettled("css selector", "table.results tbody tr")
+    driver = Driver()
+    assert [condition(driver) for _ in range(4)] == [False, False, False, 5]
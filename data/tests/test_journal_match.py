@@ -0,0 +1,154 @@
+import json
+
+import pandas as pd
+
+import journal_match
+
+TYPO = "Journal of Financial and Quantitatve Analysis"
+
+
+def make_journals():
+    return pd.DataFrame(
+        {
+            "journal_title": [
+                "Journal of Finance",
+                "The Accounting Review",
+                "Journal of Financial and Quantitative Analysis",
+            ],
+            "Financial Times": [1, 1, 0],
+            "UT Dallas": [1, 1, 1],
+            "General Business": [0, 0, 1],
+        }
+    )
+
+
+def match(titles, issns=None, journals_df=None, **kwargs):
+    research_df = pd.DataFrame(
+        {
+            "journal_title": titles,
+            "journal_issn": issns if issns is not None else [""] * len(titles),
+        }
+    )
+    return journal_match.match_journals(
+        research_df,
+        make_journals() if journals_df is None else journals_df,
+        **kwargs,
+    )
+
+
+def methods_by_title(report):
+    return report.set_index("journal_title")["method"].to_dict()
+
+
+def test_issn_learned_from_exact_name_wins(tmp_path):
+    cache_path = str(tmp_path / "cache.json")
+    rankings, report = match(
+        ["Journal of Finance", "J. Finance (renamed)"],
+        ["0022-1082", "00221082"],
+        cache_path=cache_path,
+    )
+    methods = methods_by_title(report)
+    assert methods["J. Finance (renamed)"] == "issn"
+    # The ISSN is checked before the name, even for the row that taught it
+    assert methods["Journal of Finance"] == "issn"
+    assert rankings["Financial Times"].tolist() == [1, 1]
+
+
+def test_exact_normalized_name(tmp_path):
+    rankings, report = match(
+        ["ACCOUNTING REVIEW", "the accounting review.", "Unknown Quarterly"],
+        cache_path=str(tmp_path / "cache.json"),
+    )
+    methods = methods_by_title(report)
+    assert methods["ACCOUNTING REVIEW"] == "exact"
+    assert methods["the accounting review."] == "exact"
+    assert methods["Unknown Quarterly"] == "none"
+    assert rankings["UT Dallas"].tolist() == [1, 1, 0]
+    matched = report.set_index("journal_title")["matched_journal"]
+    assert matched["ACCOUNTING REVIEW"] == "The Accounting Review"
+
+
+def test_fuzzy_match_respects_threshold(tmp_path):
+    rankings, report = match([TYPO], cache_path=str(tmp_path / "cache.json"))
+    row = report.iloc[0]
+    assert row["method"] == "fuzzy"
+    assert row["matched_journal"] == "Journal of Financial and Quantitative Analysis"
+    assert journal_match.FUZZY_THRESHOLD <= row["score"] < 1.0
+    assert rankings["General Business"].tolist() == [1]
+
+    rankings, report = match(
+        [TYPO], threshold=0.99, cache_path=str(tmp_path / "strict.json")
+    )
+    assert report.iloc[0]["method"] == "none"
+    assert rankings["General Business"].tolist() == [0]
+
+
+def test_fuzzy_decisions_are_cached(tmp_path, monkeypatch):
+    cache_path = tmp_path / "cache.json"
+    match([TYPO], cache_path=str(cache_path))
+    cache = json.loads(cache_path.read_text())
+    assert "journal of financial and quantitatve analysis" in cache["decisions"]
+
+    def fail(self, key):
+        raise AssertionError("fuzzy index consulted despite cached decision")
+
+    monkeypatch.setattr(journal_match.FuzzyJournalIndex, "best_match", fail)
+    _, report = match([TYPO], cache_path=str(cache_path))
+    assert report.iloc[0]["method"] == "fuzzy"
+
+    # Changing the coded journals invalidates the cached decisions
+    journals_df = make_journals()
+    journals_df.loc[2, "Financial Times"] = 1
+    monkeypatch.undo()
+    match([TYPO], journals_df=journals_df, cache_path=str(cache_path))
+    journals_hash = json.loads(cache_path.read_text())["journals_hash"]
+    assert journals_hash != cache["journals_hash"]
+
+
+def test_report_has_one_row_per_distinct_journal(tmp_path):
+    _, report = match(
+        ["Journal of Finance", "Journal of Finance", "Unknown Quarterly"],
+        cache_path=str(tmp_path / "cache.json"),
+    )
+    assert list(report.columns) == [
+        "journal_title",
+        "journal_issn",
+        "articles",
+        "matched_journal",
+        "method",
+        "score",
+    ]
+    by_title = report.set_index("journal_title")
+    assert by_title.loc["Journal of Finance", "articles"] == 2
+    assert by_title.loc["Journal of Finance", "score"] == 1.0
+    assert pd.isna(by_title.loc["Unknown Quarterly", "matched_journal"])
+
+
+def test_non_integer_ranking_cells_become_missing(tmp_path):
+    journals_df = make_journals()
+    journals_df["Financial Times"] = journals_df["Financial Times"].astype(object)
+    journals_df.loc[0, "Financial Times"] = "Y"
+    journals_df.loc[1, "Financial Times"] = " "
+    rankings, _ = match(
+        ["Journal of Finance", "The Accounting Review", "Unknown Quarterly"],
+        journals_df=journals_df,
+        cache_path=str(tmp_path / "cache.json"),
+    )
+    assert str(rankings["Financial Times"].dtype) == "Int64"
+    assert rankings["Financial Times"].isna().tolist() == [True, True, False]
+    assert rankings["Financial Times"].iloc[2] == 0
+
+
+def test_fuzzy_index_only_scores_journals_that_can_reach_the_threshold():
+    titles = make_journals()["journal_title"]
+    index = journal_match.FuzzyJournalIndex(
+        [journal_match.normalize_journal_name(title) for title in titles]
+    )
+    key, score = index.best_match(journal_match.normalize_journal_name(TYPO))
+    assert key == "journal of financial and quantitative analysis"
+    assert score >= journal_match.FUZZY_THRESHOLD
+    # Shares trigrams with "journal of finance" but is far too long to reach it
+    assert index.best_match("journal of finance and economics of the firm") == (
+        None,
+        0.0,
+    )
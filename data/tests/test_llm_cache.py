@@ -0,0 +1,103 @@
+import pytest
+
+import llm_cache
+
+TEMPLATE = "Is this about sustainability? {string}"
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock)
+    return clock
+
+
+def open_cache(tmp_path, **limits):
+    return llm_cache.LLMCache(path=str(tmp_path / "cache.sqlite"), **limits)
+
+
+def test_key_covers_model_template_and_input(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.set("relevance", "model-a", TEMPLATE, "title: x", {"result": 1})
+    assert cache.get("model-a", TEMPLATE, "title: x") == {"result": 1}
+    assert cache.get("model-b", TEMPLATE, "title: x") is None
+    assert cache.get("model-a", TEMPLATE + " Answer in JSON.", "title: x") is None
+    assert cache.get("model-a", TEMPLATE, "title: y") is None
+    # Fields are separated, so shifting text between them changes the key
+    assert llm_cache.make_key("a", "bc", "d") != llm_cache.make_key("ab", "c", "d")
+    assert (cache.hits, cache.misses) == (1, 3)
+    cache.close()
+
+
+def test_invalidate_stale_only_drops_other_templates_of_namespace(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.set("relevance", "m", "old relevance prompt", "r1", {"result": 1})
+    cache.set("relevance", "m", TEMPLATE, "r2", {"result": 0})
+    cache.set("goals", "m", "old relevance prompt", "r3", {"goals": [7]})
+
+    assert cache.invalidate_stale("relevance", TEMPLATE) == 1
+    assert cache.get("m", "old relevance prompt", "r1") is None
+    assert cache.get("m", TEMPLATE, "r2") == {"result": 0}
+    assert cache.get("m", "old relevance prompt", "r3") == {"goals": [7]}
+    assert cache.invalidate_stale("relevance", TEMPLATE) == 0
+    cache.close()
+
+
+def test_evict_drops_old_then_least_recently_used(tmp_path, clock):
+    cache = open_cache(tmp_path, max_entries=2, max_age_days=1)
+    for i in range(3):
+        clock.now += 10
+        cache.set("relevance", "m", TEMPLATE, f"r{i}", {"result": i})
+    clock.now += 10
+    cache.get("m", TEMPLATE, "r0")
+
+    cache.evict()
+    assert cache.stats()["entries"] == 2
+    # r1 was the least recently used; r0 was read after it was written
+    assert cache.get("m", TEMPLATE, "r1") is None
+    assert cache.get("m", TEMPLATE, "r0") == {"result": 0}
+
+    clock.now += 2 * 86400
+    cache.evict()
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_evict_respects_byte_limit(tmp_path, clock):
+    cache = open_cache(tmp_path, max_bytes=40)
+    for i in range(3):
+        clock.now += 1
+        cache.set("relevance", "m", TEMPLATE, f"r{i}", {"result": "x" * 10})
+    cache.evict()
+    stats = cache.stats()
+    assert stats["bytes"] <= 40
+    assert stats["entries"] == 1
+    assert cache.get("m", TEMPLATE, "r2") is not None
+    cache.close()
+
+
+def test_stats_persist_across_sessions(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.set("relevance", "m", TEMPLATE, "r", {"result": 1})
+    cache.get("m", TEMPLATE, "r")
+    cache.get("m", TEMPLATE, "missing")
+    stats = cache.stats()
+    assert stats["hit_rate"] == 0.5
+    assert (stats["total_hits"], stats["total_misses"]) == (1, 1)
+    cache.close()
+
+    cache = open_cache(tmp_path)
+    assert cache.get("m", TEMPLATE, "r") == {"result": 1}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 0)
+    assert (stats["total_hits"], stats["total_misses"]) == (2, 1)
+    assert stats["entries"] == 1
+    cache.close()
@@ -0,0 +1,42 @@
+import pandas as pd
+
+import main
+from bench_propagation import legacy_propagate
+from fakes import make_research_rows
+
+NAN = float("nan")
+
+
+def make_rows():
+    """
+    Author rows of four articles: a1 is classified on its second row only, a2 on
+    both rows with different goals (the first wins) and some goals missing, a3
+    never, and one row has no article_uuid.
+    """
+    return pd.DataFrame(
+        {
+            "person_uuid": ["p0", "p1", "p2", "p0", "p1", "p2", "p3", "p4"],
+            "article_uuid": ["a1", "a1", "a2", "a2", "a2", "a3", "a3", None],
+            "is_sustain": [NAN, 1.0, 1.0, 0.0, NAN, NAN, NAN, 1.0],
+            "top 1": [NAN, 13.0, 7.0, 0.0, NAN, NAN, NAN, 3.0],
+            "top 2": [NAN, NAN, 9.0, 0.0, NAN, NAN, NAN, NAN],
+            "top 3": [NAN, NAN, NAN, 0.0, NAN, NAN, NAN, NAN],
+        }
+    )
+
+
+def test_propagation_matches_legacy_loop():
+    new = main.propagate_classifications(make_rows())
+    pd.testing.assert_frame_equal(new, legacy_propagate(make_rows()))
+    assert new["is_sustain"].tolist()[:5] == [1.0, 1.0, 1.0, 0.0, 1.0]
+    assert new["top 1"].tolist()[:5] == [13.0, 13.0, 7.0, 0.0, 7.0]
+    assert pd.isna(new.loc[0, "top 2"]) and new.loc[4, "top 2"] == 9.0
+    assert new.loc[5:6, "is_sustain"].isna().all()
+
+
+def test_propagation_matches_legacy_loop_on_synthetic_rows():
+    rows = make_research_rows(2000)
+    rows.loc[rows.index[::7], "top 2"] = NAN
+    pd.testing.assert_frame_equal(
+        main.propagate_classifications(rows.copy()), legacy_propagate(rows.copy())
+    )
@@ -0,0 +1,68 @@
+import tracemalloc
+
+import metrics
+
+
+def test_spans_leave_outside_peak_alone_without_memory_tracing():
+    registry = metrics.Metrics()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        block = bytearray(8 * 2**20)
+        del block
+        with registry.span("untraced"):
+            pass
+        assert tracemalloc.get_traced_memory()[1] >= 8 * 2**20
+    finally:
+        tracemalloc.stop()
+    assert "peak_bytes" not in registry.spans["untraced"]
+
+
+def test_spans_record_peak_with_memory_tracing():
+    registry = metrics.Metrics()
+    registry.reset(trace_memory=True)
+    try:
+        with registry.span("outer"):
+            with registry.span("inner"):
+                block = bytearray(4 * 2**20)
+                del block
+        assert registry.spans["inner"]["peak_bytes"] >= 4 * 2**20
+        assert registry.spans["outer"]["peak_bytes"] >= 4 * 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def test_histogram_memory_is_bounded():
+    histogram = metrics.Histogram(max_samples=100)
+    for i in range(10000):
+        histogram.observe(i / 1000)
+    summary = histogram.summary()
+    assert len(histogram.samples) == 100
+    assert summary["count"] == 10000
+    assert summary["min"] == 0 and summary["max"] == 9.999
+    assert summary["buckets"]["1"] == 1001
+    assert summary["buckets"]["60"] == 10000
+    assert 4 < summary["p50"] < 6
+
+
+def test_report_omits_max_rss_without_resource(monkeypatch):
+    monkeypatch.setattr(metrics, "resource", None)
+    assert "max_rss_bytes" not in metrics.Metrics().report()["run"]
+
+
+def test_max_rss_unit_follows_platform(monkeypatch):
+    class Usage:
+        ru_maxrss = 1000
+
+    class FakeResource:
+        RUSAGE_SELF = 0
+
+        @staticmethod
+        def getrusage(who):
+            return Usage()
+
+    monkeypatch.setattr(metrics, "resource", FakeResource)
+    monkeypatch.setattr(metrics.sys, "platform", "linux")
+    assert metrics.max_rss_bytes() == 1000 * 1024
+    monkeypatch.setattr(metrics.sys, "platform", "darwin")
+    assert metrics.max_rss_bytes() == 1000
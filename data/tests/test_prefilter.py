@@ -0,0 +1,23 @@
+import numpy as np
+
+import fakes
+import prefilter
+
+
+def test_repeated_index_labels_keep_one_row_per_article(fake_service):
+    df = fakes.make_articles(12)
+    # As left by pd.concat of frames without reset_index
+    df.index = [0, 1, 2] * 4
+    scores = prefilter.nearest_goal_similarity(df)
+    thresholds = {
+        "low": float(np.quantile(scores, 0.3)),
+        "high": float(np.quantile(scores, 0.7)),
+    }
+
+    result = prefilter.classify_with_prefilter(df, thresholds=thresholds)
+    assert len(result) == len(df)
+    assert result.index.tolist() == df.index.tolist()
+    assert result["article_uuid"].tolist() == df["article_uuid"].tolist()
+    labels = prefilter.auto_labels(scores, thresholds)
+    assert (result["is_sustain"].to_numpy()[labels == 0] == 0).all()
+    assert (result["is_sustain"].to_numpy()[labels == 1] == 1).all()
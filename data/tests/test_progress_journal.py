@@ -0,0 +1,91 @@
+import pandas as pd
+
+import main
+import progress_journal
+
+
+def make_research(n=4):
+    df = pd.DataFrame(
+        {
+            "article_uuid": [f"a{i}" for i in range(n)],
+            "person_uuid": "p",
+            "title": "t",
+            "abstract": "x",
+        }
+    )
+    return main.classification_status(df)
+
+
+def test_malformed_goals_are_journalled_as_missing(tmp_path):
+    journal = progress_journal.ProgressJournal(path=str(tmp_path / "progress.jsonl"))
+    chunk = pd.DataFrame(
+        {
+            "article_uuid": ["a0", "a1"],
+            "is_sustain": [1, float("nan")],
+            "top 1": ["Goal 13", None],
+            "top 2": ["7", None],
+            "top 3": [0, None],
+            "sdg_attempts": pd.array([1, 2], dtype="Int64"),
+        }
+    )
+    journal.append(chunk, main.JOURNAL_COLUMNS)
+    journal.close()
+
+    records = journal.replay().set_index("article_uuid")
+    assert records.loc["a0", "is_sustain"] == 1
+    assert pd.isna(records.loc["a0", "top 1"])
+    assert records.loc["a0", "top 2"] == 7
+    assert pd.isna(records.loc["a1", "is_sustain"])
+    assert records["sdg_attempts"].tolist() == [1, 2]
+
+
+def test_resume_keeps_journalled_attempts(tmp_path):
+    journal = progress_journal.ProgressJournal(path=str(tmp_path / "progress.jsonl"))
+    journal.append(
+        pd.DataFrame(
+            {
+                "article_uuid": ["a0", "a1", "a2"],
+                "is_sustain": [1, None, None],
+                "top 1": [13, None, None],
+                "top 2": [0, None, None],
+                "top 3": [0, None, None],
+                "sdg_attempts": [1, 2, main.MAX_SDG_ATTEMPTS],
+                "sdg_error": [None, "RateLimitError", "MalformedOutputError"],
+            }
+        ),
+        main.JOURNAL_COLUMNS,
+        main.JOURNAL_TEXT_COLUMNS,
+    )
+    journal.close()
+
+    df = make_research()
+    df, to_process = main.recover_journalled(journal, df, df.copy())
+    # a0 was classified; a2 used up its attempts; a1 and a3 are still to do
+    assert to_process["article_uuid"].tolist() == ["a1", "a3"]
+    assert to_process["sdg_attempts"].tolist() == [2, 0]
+    by_article = df.set_index("article_uuid")
+    assert by_article.loc["a0", "sdg_status"] == "ok"
+    assert by_article.loc["a0", "top 1"] == 13
+    assert by_article.loc["a0", "sdg_attempts"] == 1
+    assert by_article.loc["a2", "sdg_status"] == "failed"
+    assert by_article.loc["a2", "sdg_attempts"] == main.MAX_SDG_ATTEMPTS
+    # The failure reason survives the resume
+    assert by_article.loc["a2", "sdg_error"] == "MalformedOutputError"
+    assert to_process["sdg_error"].iloc[0] == "RateLimitError"
+    assert pd.isna(to_process["sdg_error"].iloc[1])
+
+    df = make_research()
+    _, to_process = main.recover_journalled(journal, df, df.copy(), retry_failed=True)
+    assert to_process["article_uuid"].tolist() == ["a1", "a2", "a3"]
+
+
+def test_resume_from_journal_without_attempts(tmp_path):
+    path = tmp_path / "progress.jsonl"
+    path.write_text('{"article_uuid": "a0", "is_sustain": 0, "top 1": 0}\n')
+    df = make_research(2)
+    df.loc[0, "sdg_attempts"] = 2
+    df, to_process = main.recover_journalled(
+        progress_journal.ProgressJournal(path=str(path)), df, df.copy()
+    )
+    assert to_process["article_uuid"].tolist() == ["a1"]
+    assert df.loc[0, "sdg_status"] == "ok" and df.loc[0, "sdg_attempts"] == 2
@@ -0,0 +1,221 @@
+import asyncio
+
+import pytest
+
+import metrics
+import scheduler
+
+
+class FakeTime:
+    """
+    Stands in for the time module in scheduler: sleeping advances the clock.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(scheduler, "time", clock)
+    monkeypatch.setattr(metrics, "_metrics", metrics.Metrics())
+    return clock
+
+
+def make_scheduler(**kwargs):
+    options = dict(backoff=0, failure_threshold=2, cooldown=10, max_trips=2)
+    options.update(kwargs)
+    return scheduler.AdaptiveScheduler("test", **options)
+
+
+def counter(name, **labels):
+    return metrics.get_metrics().counters.get(metrics.metric_key(name, labels), 0)
+
+
+def test_unpaced_until_first_congestion_signal(clock):
+    sched = make_scheduler()
+    for _ in range(10):
+        sched.acquire()
+    assert clock.now == 1000.0
+    assert sched.rate is None
+
+
+def test_aimd_decrease_and_increase(clock):
+    sched = make_scheduler(max_rate=6)
+    for _ in range(10):
+        sched.acquire()
+    # Pacing starts at the observed 10 requests/s, halved
+    sched.record_failure()
+    assert sched.rate == pytest.approx(5.0)
+    # A second signal within DECREASE_INTERVAL does not cut again
+    sched.record_throttle(retry_after=0)
+    assert sched.rate == pytest.approx(5.0)
+
+    sched.record_success()
+    assert sched.rate == pytest.approx(5.0 + 1 / 5.0)
+    clock.sleep(scheduler.DECREASE_INTERVAL)
+    sched.record_success(latency=sched.latency_target + 1)
+    assert sched.rate == pytest.approx((5.0 + 1 / 5.0) * 0.8)
+
+    # Additive increase until MAX_RATE, where pacing stops again
+    for _ in range(20):
+        sched.record_success()
+    assert sched.rate is None
+
+
+def test_paced_sends_are_spaced(clock):
+    sched = make_scheduler()
+    for _ in range(4):
+        sched.acquire()
+    clock.sleep(scheduler.DECREASE_INTERVAL)
+    sched.record_throttle(retry_after=0)
+    rate = sched.rate
+    start = clock.now
+    for _ in range(3):
+        sched.acquire()
+    assert clock.now - start == pytest.approx(2 / rate)
+
+
+def test_throttle_pauses_senders(clock):
+    sched = make_scheduler()
+    sched.record_throttle(retry_after=7)
+    start = clock.now
+    sched.acquire()
+    assert clock.now - start == pytest.approx(7)
+    assert counter("scheduler_throttled_total", scheduler="test") == 1
+
+
+def test_rate_limit_headers(clock):
+    sched = make_scheduler()
+    sched.acquire()
+    sched.update_from_headers(
+        {"X-RateLimit-Remaining-Requests": "2", "X-RateLimit-Reset-Requests": "20s"}
+    )
+    assert sched.rate == pytest.approx(0.1)
+
+    sched.update_from_headers({"RateLimit-Remaining": "0", "RateLimit-Reset": "30"})
+    start = clock.now
+    sched.acquire()
+    assert clock.now - start >= 30
+
+
+def test_circuit_opens_probes_and_closes(clock, capsys):
+    sched = make_scheduler()
+    sched.record_failure()
+    assert sched.state == "closed"
+    sched.record_failure()
+    assert sched.state == "open"
+    assert counter("scheduler_circuit_opened_total", scheduler="test") == 1
+
+    # Senders wait out the cool-down; the first one after it sends the probe
+    start = clock.now
+    sched.acquire()
+    assert clock.now - start == pytest.approx(10)
+    assert sched.state == "half-open"
+    # Others wait for the probe's outcome
+    assert sched._reserve() == (scheduler.PROBE_POLL_INTERVAL, False)
+
+    sched.record_success()
+    assert sched.state == "closed"
+    assert sched.stats()["trips"] == 0
+    out = capsys.readouterr().out
+    assert "circuit open" in out and "half-open" in out and "circuit closed" in out
+
+
+def test_circuit_breaks_after_repeated_trips(clock):
+    sched = make_scheduler()
+    sched.record_failure()
+    sched.record_failure()
+    sched.acquire()
+    assert sched.state == "half-open"
+    # The probe fails: that is the second trip in a row
+    sched.record_failure()
+    assert sched.broken
+    with pytest.raises(scheduler.CircuitOpenError):
+        sched.acquire()
+
+    sched.reset()
+    assert not sched.broken and sched.state == "closed"
+
+
+def test_call_retries_transient_failures_quietly(clock, capsys):
+    sched = make_scheduler(failure_threshold=5)
+    attempts = []
+
+    def flaky():
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise ConnectionError("reset by peer")
+        return "ok"
+
+    assert sched.call(flaky) == "ok"
+    assert len(attempts) == 3
+    assert counter("scheduler_retries_total", scheduler="test") == 2
+    assert (
+        counter("scheduler_failed_attempts_total", scheduler="test", kind="failure")
+        == 2
+    )
+    # Failed attempts are counted, not printed
+    assert capsys.readouterr().out == ""
+
+
+def test_call_does_not_retry_fatal_errors(clock):
+    sched = make_scheduler()
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise BadRequest("invalid")
+
+    with pytest.raises(BadRequest):
+        sched.call(bad_request)
+    assert len(calls) == 1
+    assert sched.state == "closed"
+
+
+def test_acall_gives_up_when_circuit_breaks(clock):
+    sched = make_scheduler(max_trips=1, max_attempts=5)
+
+    async def failing():
+        raise ServerError("unavailable")
+
+    with pytest.raises(scheduler.CircuitOpenError):
+        asyncio.run(sched.acall(failing))
+    assert sched.broken
+    assert (
+        counter("scheduler_failed_attempts_total", scheduler="test", kind="failure")
+        == 2
+    )
+
+
+def test_error_kind():
+    assert scheduler.error_kind(ServerError()) == "failure"
+    assert scheduler.error_kind(BadRequest()) == "fatal"
+    assert scheduler.error_kind(TimeoutError()) == "failure"
+    assert scheduler.error_kind(ValueError("bad json")) == "retry"
+
+    class Throttled(Exception):
+        status_code = 429
+
+    assert scheduler.error_kind(Throttled()) == "throttle"
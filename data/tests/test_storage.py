@@ -0,0 +1,128 @@
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import storage
+
+
+def make_outputs():
+    return pd.DataFrame(
+        {
+            "person_uuid": ["p0", "p1", "p1"],
+            "active": ["True", "False", True],
+            "article_uuid": ["a0", "a1", "a2"],
+            "abstract": ["x", None, "z"],
+            "publication_year": ["2021", "N/A", 2023],
+            "is_sustain": [1, None, 0],
+            "top 1": [13.0, float("nan"), 0.0],
+            "extra": [1.5, 2.5, 3.5],
+        }
+    )
+
+
+def test_schema_round_trip_keeps_missing_integers(tmp_path):
+    path = str(tmp_path / "store.parquet")
+    storage.write_research_outputs(make_outputs(), path=path)
+    df = storage.read_research_outputs(path=path)
+
+    assert str(df["publication_year"].dtype) == "Int64"
+    assert df["publication_year"].tolist()[0] == 2021
+    assert pd.isna(df["publication_year"].iloc[1])
+    assert str(df["is_sustain"].dtype) == "Int64"
+    assert pd.isna(df["is_sustain"].iloc[1])
+    assert df["top 1"].tolist()[0] == 13
+    assert str(df["active"].dtype) == "boolean"
+    assert df["active"].tolist() == [True, False, True]
+    assert str(df["abstract"].dtype) == "string"
+    # Columns outside the schema are stored as they are
+    assert df["extra"].tolist() == [1.5, 2.5, 3.5]
+    assert not os.path.exists(path + ".tmp")
+
+    projected = storage.read_research_outputs(
+        columns=["article_uuid", "is_sustain", "not stored"], path=path
+    )
+    assert list(projected.columns) == ["article_uuid", "is_sustain"]
+
+
+def test_read_falls_back_to_csv(tmp_path):
+    csv_path = str(tmp_path / "outputs.csv")
+    make_outputs().to_csv(csv_path, index=False)
+    df = storage.read_research_outputs(
+        path=str(tmp_path / "missing.parquet"), csv_path=csv_path
+    )
+    assert str(df["is_sustain"].dtype) == "Int64"
+    assert df["active"].tolist() == [True, False, True]
+    assert (
+        storage.read_research_outputs(
+            path=str(tmp_path / "missing.parquet"),
+            csv_path=str(tmp_path / "missing.csv"),
+        )
+        is None
+    )
+
+
+def test_appender_replaces_store_only_on_commit(tmp_path):
+    path = str(tmp_path / "store.parquet")
+    storage.write_research_outputs(make_outputs().iloc[:1], path=path)
+    columns = ["person_uuid", "article_uuid", "is_sustain"]
+
+    appender = storage.ParquetAppender(path, columns)
+    appender.write(make_outputs().iloc[1:2])
+    appender.write(make_outputs().iloc[:0])
+    appender.write(make_outputs().iloc[2:])
+    assert os.path.exists(path + ".tmp")
+    assert len(storage.read_research_outputs(path=path)) == 1
+    appender.commit()
+
+    assert not os.path.exists(path + ".tmp")
+    assert pq.ParquetFile(path).num_row_groups == 2
+    df = storage.read_research_outputs(path=path)
+    assert list(df.columns) == columns
+    assert df["article_uuid"].tolist() == ["a1", "a2"]
+    assert str(df["is_sustain"].dtype) == "Int64"
+    assert pd.isna(df["is_sustain"].iloc[0])
+
+
+def test_appender_abort_keeps_previous_store(tmp_path):
+    path = str(tmp_path / "store.parquet")
+    storage.write_research_outputs(make_outputs(), path=path)
+    appender = storage.ParquetAppender(path, ["person_uuid", "article_uuid"])
+    appender.write(make_outputs().iloc[:1])
+    appender.abort()
+    assert not os.path.exists(path + ".tmp")
+    assert len(storage.read_research_outputs(path=path)) == 3
+
+
+def test_update_research_columns_rewrites_only_given_columns(tmp_path):
+    path = str(tmp_path / "store.parquet")
+    storage.write_research_outputs(make_outputs(), path=path)
+    before = pq.read_table(path)
+
+    storage.update_research_columns(
+        pd.DataFrame(
+            {"is_sustain": [0, 1, None], "Financial Times": ["1", "Y", 0]},
+            index=[10, 11, 12],
+        ),
+        path=path,
+    )
+    after = pq.read_table(path)
+    assert not os.path.exists(path + ".tmp")
+    assert after.column_names == before.column_names + ["Financial Times"]
+    assert after.column("abstract").equals(before.column("abstract"))
+    assert after.column("publication_year").equals(before.column("publication_year"))
+
+    df = storage.read_research_outputs(path=path)
+    assert df["is_sustain"].tolist()[:2] == [0, 1]
+    assert pd.isna(df["is_sustain"].iloc[2])
+    assert str(df["Financial Times"].dtype) == "Int64"
+    assert df["Financial Times"].isna().tolist() == [False, True, False]
+
+
+def test_update_research_columns_rejects_misaligned_rows(tmp_path):
+    path = str(tmp_path / "store.parquet")
+    storage.write_research_outputs(make_outputs(), path=path)
+    with pytest.raises(ValueError):
+        storage.update_research_columns(pd.DataFrame({"is_sustain": [1]}), path=path)
+    assert len(storage.read_research_outputs(path=path)) == 3
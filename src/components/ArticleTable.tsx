@@ -21,6 +21,34 @@ import { Check, X } from "lucide-react";
 import { ScrollArea } from "@/components/ui/scroll-area";
 import { cn } from "@/lib/utils";
 import { Article } from "@/utils/types";
+import { loadAbstract } from "@/utils/parsing/articleIndex";
+
+// Abstracts are not part of the article index; they are fetched when a dialog opens
+const ArticleAbstract = ({ article }: { article: Article }) => {
+  const [abstract, setAbstract] = useState(article.abstract);
+
+  useEffect(() => {
+    if (article.abstract) return;
+    let cancelled = false;
+    loadAbstract(article.article_uuid)
+      .then((text) => {
+        if (!cancelled) setAbstract(text);
+      })
+      .catch((error) => console.error("Error loading abstract:", error));
+    return () => {
+      cancelled = true;
+    };
+  }, [article]);
+
+  if (!abstract) return null;
+
+  return (
+    <div>
+      <h3 className="text-sm font-semibold mb-1">Abstract</h3>
+      <p className="text-sm text-muted-foreground">{abstract}</p>
+    </div>
+  );
+};
 
 interface ArticleTableProps {
   articles: Article[];
@@ -151,14 +179,7 @@ const ArticleTable = ({ articles, className }: ArticleTableProps) => {
                       
                       <div className="grid grid-cols-1 md:grid-cols-3 gap-4 mt-4">
                         <div className="md:col-span-2 space-y-4">
-                          {article.abstract && (
-                            <div>
-                              <h3 className="text-sm font-semibold mb-1">Abstract</h3>
-                              <p className="text-sm text-muted-foreground">
-                                {article.abstract}
-                              </p>
-                            </div>
-                          )}
+                          <ArticleAbstract article={article} />
                           
                           {article.doi && (
                             <div>
@@ -1,12 +1,10 @@
-
-import { useState, useEffect, useMemo } from "react";
-import { Article, DashboardStats } from "@/utils/types";
-import {
-  calculateStats,
-  getUniqueValues,
-  filterArticles,
-} from "@/utils/csvParser";
+import { useState, useEffect, useCallback, useRef } from "react";
+import { Article, DashboardStats, OverviewStats } from "@/utils/types";
+import { calculateStats, filterArticles } from "@/utils/csvParser";
+import { loadArticleIndex } from "@/utils/parsing/articleIndex";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
+import { Skeleton } from "@/components/ui/skeleton";
+import { useToast } from "@/components/ui/use-toast";
 import FilterBar from "./FilterBar";
 import {
   BarChart3,
@@ -28,38 +26,108 @@ import JournalsTab from "./dashboard-tabs/JournalsTab";
 import DetailsTab from "./dashboard-tabs/DetailsTab";
 
 interface DashboardProps {
-  articles: Article[];
+  overview: OverviewStats;
+  departments: string[];
+  years: string[];
   className?: string;
 }
 
-const Dashboard = ({ articles, className }: DashboardProps) => {
+interface Filters {
+  department: string | null;
+  yearRange: [string | null, string | null];
+  goals: number[] | null;
+  isSustainable: boolean | null;
+  generalBusiness: boolean | null;
+  topJournals: boolean | null;
+}
+
+// The filters FilterBar starts with: General Business journals only, which is
+// the view the precomputed overview describes
+const DEFAULT_FILTERS: Filters = {
+  department: null,
+  yearRange: [null, null],
+  goals: null,
+  isSustainable: null,
+  generalBusiness: true,
+  topJournals: false,
+};
+
+const isDefaultView = (filters: Filters) =>
+  filters.department === null &&
+  filters.yearRange[0] === null &&
+  filters.yearRange[1] === null &&
+  filters.goals === null &&
+  filters.isSustainable === null &&
+  filters.generalBusiness === true &&
+  !filters.topJournals;
+
+const Dashboard = ({ overview, departments, years, className }: DashboardProps) => {
+  const [articles, setArticles] = useState<Article[] | null>(null);
+  const [filters, setFilters] = useState<Filters>(DEFAULT_FILTERS);
   const [stats, setStats] = useState<DashboardStats | null>(null);
   const [filteredArticles, setFilteredArticles] = useState<Article[]>([]);
-  const [departments, setDepartments] = useState<string[]>([]);
-  const [years, setYears] = useState<string[]>([]);
   const [currentTab, setCurrentTab] = useState<string>("overview");
+  const articleIndex = useRef<Promise<void> | null>(null);
+  const { toast } = useToast();
+
+  // The overview is built from the precomputed aggregates; the article index is
+  // only loaded once a filter or another tab needs the individual articles
+  const loadArticles = useCallback(() => {
+    if (articleIndex.current) {
+      return;
+    }
+    articleIndex.current = loadArticleIndex()
+      .then(({ articles: loaded }) => {
+        setArticles(loaded);
+        toast({
+          title: "Data loaded successfully",
+          description: `Loaded ${loaded.length} articles from the dataset`,
+        });
+      })
+      .catch((error) => {
+        articleIndex.current = null;
+        console.error("Error loading article index:", error);
+        toast({
+          title: "Error loading data",
+          description:
+            "Could not load the article index. Please check the console for details.",
+          variant: "destructive",
+        });
+      });
+  }, [toast]);
 
   useEffect(() => {
-    if (articles.length > 0) {
-      const businessArticles = articles.filter(
-        (a) => a.general_business === "1"
-      );
+    if (!articles) {
+      return;
+    }
+
+    let filtered = [...articles];
 
-      const newStats = calculateStats(businessArticles);
-      setStats(newStats);
-      setFilteredArticles(businessArticles);
+    if (filters.generalBusiness) {
+      filtered = filtered.filter(a => a.general_business === "1");
+    }
 
-      setDepartments(getUniqueValues(articles, "department"));
-      setYears(getUniqueValues(articles, "publication_year"));
+    if (filters.topJournals) {
+      filtered = filtered.filter(a => a.ut_dallas === "1" || a.financial_times === "1");
     }
-  }, [articles]);
 
-  useEffect(() => {
-    if (filteredArticles.length > 0) {
-      const newStats = calculateStats(filteredArticles);
-      setStats(newStats);
+    filtered = filterArticles(
+      filtered,
+      filters.department,
+      filters.yearRange,
+      filters.goals,
+      filters.isSustainable
+    );
+
+    console.log(
+      `Filtered articles: ${filtered.length} (from ${articles.length})`
+    );
+    setFilteredArticles(filtered);
+
+    if (filtered.length > 0) {
+      setStats(calculateStats(filtered));
     }
-  }, [filteredArticles]);
+  }, [articles, filters]);
 
   const handleFilterChange = (
     department: string | null,
@@ -69,42 +137,41 @@ const Dashboard = ({ articles, className }: DashboardProps) => {
     generalBusiness: boolean | null,
     topJournals: boolean | null
   ) => {
-    console.log("Applying filters:", {
+    const next = {
       department,
       yearRange,
       goals,
       isSustainable,
       generalBusiness,
       topJournals,
-    });
+    };
+    console.log("Applying filters:", next);
 
-    let filtered = [...articles];
-    
-    if (generalBusiness) {
-      filtered = filtered.filter(a => a.general_business === "1");
+    // Until the article index is needed, the overview already shows this view
+    if (!articles && isDefaultView(next)) {
+      return;
     }
+    setFilters(next);
+    loadArticles();
+  };
 
-    if (topJournals) {
-      filtered = filtered.filter(a => a.ut_dallas === "1" || a.financial_times === "1");
+  const handleTabChange = (value: string) => {
+    setCurrentTab(value);
+    if (value !== "overview") {
+      loadArticles();
     }
-
-    filtered = filterArticles(
-      filtered,
-      department,
-      yearRange,
-      goals,
-      isSustainable
-    );
-
-    console.log(
-      `Filtered articles: ${filtered.length} (from ${articles.length})`
-    );
-    setFilteredArticles(filtered);
   };
 
-  if (!stats) {
-    return <div>Loading dashboard...</div>;
-  }
+  const loadingTab = (
+    <div className="space-y-4">
+      <Skeleton className="h-[300px] w-full rounded-lg" />
+      <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+        <Skeleton className="h-[100px] rounded-lg" />
+        <Skeleton className="h-[100px] rounded-lg" />
+        <Skeleton className="h-[100px] rounded-lg" />
+      </div>
+    </div>
+  );
 
   return (
     <div className={className}>
@@ -113,13 +180,14 @@ const Dashboard = ({ articles, className }: DashboardProps) => {
           departments={departments}
           years={years}
           onFilterChange={handleFilterChange}
+          onOpen={loadArticles}
         />
       </div>
 
       <Tabs
         defaultValue="overview"
         className="mb-6"
-        onValueChange={(value) => setCurrentTab(value)}
+        onValueChange={handleTabChange}
       >
         <TabsList className="grid grid-cols-7 mb-4">
           <TabsTrigger value="overview" className="flex items-center gap-1">
@@ -153,31 +221,35 @@ const Dashboard = ({ articles, className }: DashboardProps) => {
         </TabsList>
 
         <TabsContent value="overview" className="pt-4">
-          <OverviewTab stats={stats} />
+          <OverviewTab stats={stats ?? overview} />
         </TabsContent>
 
         <TabsContent value="goals" className="pt-4">
-          <GoalsTab stats={stats} />
+          {stats ? <GoalsTab stats={stats} /> : loadingTab}
         </TabsContent>
 
         <TabsContent value="journals" className="pt-4">
-          <JournalsTab stats={stats} articles={filteredArticles} />
+          {stats ? (
+            <JournalsTab stats={stats} articles={filteredArticles} />
+          ) : (
+            loadingTab
+          )}
         </TabsContent>
 
         <TabsContent value="faculty" className="pt-4">
-          <FacultyTab stats={stats} />
+          {stats ? <FacultyTab stats={stats} /> : loadingTab}
         </TabsContent>
 
         <TabsContent value="departments" className="pt-4">
-          <DepartmentsTab stats={stats} />
+          {stats ? <DepartmentsTab stats={stats} /> : loadingTab}
         </TabsContent>
 
         <TabsContent value="trends" className="pt-4">
-          <TrendsTab stats={stats} />
+          {stats ? <TrendsTab stats={stats} /> : loadingTab}
         </TabsContent>
 
         <TabsContent value="details" className="pt-4">
-          <DetailsTab articles={filteredArticles} />
+          {articles ? <DetailsTab articles={filteredArticles} /> : loadingTab}
         </TabsContent>
       </Tabs>
     </div>
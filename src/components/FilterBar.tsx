@@ -20,6 +20,7 @@ interface FilterBarProps {
     generalBusiness: boolean | null,
     topJournals: boolean | null
   ) => void;
+  onOpen?: () => void;
 }
 
 const GOAL_NAMES = [
@@ -42,7 +43,7 @@ const GOAL_NAMES = [
   "Partnerships for the Goals"
 ];
 
-const FilterBar = ({ departments, years, onFilterChange }: FilterBarProps) => {
+const FilterBar = ({ departments, years, onFilterChange, onOpen }: FilterBarProps) => {
   const [selectedDepartment, setSelectedDepartment] = useState<string | null>(null);
   const [selectedYearStart, setSelectedYearStart] = useState<string | null>(null);
   const [selectedYearEnd, setSelectedYearEnd] = useState<string | null>(null);
@@ -143,7 +144,13 @@ const FilterBar = ({ departments, years, onFilterChange }: FilterBarProps) => {
 
   return (
     <div className="flex items-center space-x-2 mb-4 animate-fade-in">
-      <Popover open={filtersOpen} onOpenChange={setFiltersOpen}>
+      <Popover
+        open={filtersOpen}
+        onOpenChange={(open) => {
+          setFiltersOpen(open);
+          if (open) onOpen?.();
+        }}
+      >
         <PopoverTrigger asChild>
           <Button 
             variant="outline" 
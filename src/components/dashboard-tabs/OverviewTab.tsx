@@ -1,4 +1,4 @@
-import { DashboardStats } from "@/utils/types";
+import { OverviewStats } from "@/utils/types";
 import StatCard from "@/components/StatCard";
 import {
   Card,
@@ -27,7 +27,7 @@ import AnnualPublicationChart from "../charts/AnnualPublicationChart";
 import { getSDGColor } from "@/components/SDGIcon";
 
 interface OverviewTabProps {
-  stats: DashboardStats;
+  stats: OverviewStats;
 }
 
 const OverviewTab = ({ stats }: OverviewTabProps) => {
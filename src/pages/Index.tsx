@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react";
-import { parseCSV } from "@/utils/parsing/csvParser";
-import { Article } from "@/utils/types";
+import { loadAggregates } from "@/utils/parsing/aggregates";
+import { OverviewStats } from "@/utils/types";
 import Dashboard from "@/components/Dashboard";
 import { useToast } from "@/components/ui/use-toast";
 import { ArrowUp } from "lucide-react";
@@ -8,45 +8,37 @@ import { format } from "date-fns";
 import { Skeleton } from "@/components/ui/skeleton";
 
 const Index = () => {
-  const [articles, setArticles] = useState<Article[]>([]);
+  const [overview, setOverview] = useState<OverviewStats | null>(null);
+  const [departments, setDepartments] = useState<string[]>([]);
+  const [years, setYears] = useState<string[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [lastUpdated, setLastUpdated] = useState<string | null>(null);
   const { toast } = useToast();
 
   useEffect(() => {
-    const loadCSVData = async () => {
+    const loadOverview = async () => {
       setIsLoading(true);
       try {
-        const response = await fetch("/person_research_outputs.csv");
-        const csvText = await response.text();
-        const csvBlob = new Blob([csvText], { type: "text/csv" });
-        const csvFile = new File([csvBlob], "person_research_outputs.csv", {
-          type: "text/csv",
-        });
-
-        // Get the last modified date from the response headers
-        const lastModified = response.headers.get("last-modified");
-        if (lastModified) {
-          const date = new Date(lastModified);
-          setLastUpdated(format(date, "MMM d, yyyy"));
-        } else {
-          // If no last-modified header, use current date
-          setLastUpdated(format(new Date(), "MMM d, yyyy"));
-        }
-
-        const parsedData = await parseCSV(csvFile);
-        setArticles(parsedData);
+        // The first view only needs the precomputed aggregates; the dashboard
+        // loads the article index when it is first needed
+        const loaded = await loadAggregates();
 
-        toast({
-          title: "Data loaded successfully",
-          description: `Loaded ${parsedData.length} articles from the dataset`,
-        });
+        // Use the aggregates' last-modified date, or today when the host sends none
+        setLastUpdated(
+          format(
+            loaded.lastModified ? new Date(loaded.lastModified) : new Date(),
+            "MMM d, yyyy"
+          )
+        );
+        setOverview(loaded.overview);
+        setDepartments(loaded.departments);
+        setYears(loaded.years);
       } catch (error) {
-        console.error("Error loading CSV:", error);
+        console.error("Error loading aggregates:", error);
         toast({
           title: "Error loading data",
           description:
-            "Could not load the CSV file. Please check the console for details.",
+            "Could not load the dashboard aggregates. Please check the console for details.",
           variant: "destructive",
         });
       } finally {
@@ -54,7 +46,7 @@ const Index = () => {
       }
     };
 
-    loadCSVData();
+    loadOverview();
   }, [toast]);
 
   const scrollToTop = () => {
@@ -86,7 +78,7 @@ const Index = () => {
       </header>
 
       <main className="container mx-auto py-6 px-6">
-        {isLoading ? (
+        {isLoading || !overview ? (
           <div className="space-y-4">
             <Skeleton className="h-[300px] w-full rounded-lg" />
             <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
@@ -96,7 +88,11 @@ const Index = () => {
             </div>
           </div>
         ) : (
-          <Dashboard articles={articles} />
+          <Dashboard
+            overview={overview}
+            departments={departments}
+            years={years}
+          />
         )}
       </main>
 
@@ -0,0 +1,106 @@
+import { Article } from "../types";
+
+// Written by the pipeline's aggregates stage (data/aggregates.py)
+export const ARTICLE_INDEX_URL = "/aggregates/article_index.json.gz";
+export const ABSTRACTS_URL = "/aggregates/abstracts.json.gz";
+
+interface ArticleIndex {
+  articles: {
+    article_uuid: string[];
+    title: string[];
+    year: string[];
+    doi: string[];
+    journal_title: string[];
+    journal_issn: string[];
+    is_sustain: number[];
+    goals: number[][];
+    financial_times: number[];
+    ut_dallas: number[];
+    general_business: number[];
+  };
+  persons: {
+    person_uuid: string[];
+    name: string[];
+    email: string[];
+    department: string[];
+    active: string[];
+  };
+  authorships: {
+    article: number[];
+    person: number[];
+  };
+}
+
+// Parse a gzip-compressed JSON response. Hosts that serve the file with
+// Content-Encoding: gzip hand over the decompressed JSON instead.
+const readCompressedJson = async <T>(response: Response): Promise<T> => {
+  const bytes = new Uint8Array(await response.arrayBuffer());
+  if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+    const stream = new Blob([bytes])
+      .stream()
+      .pipeThrough(new DecompressionStream("gzip"));
+    return JSON.parse(await new Response(stream).text()) as T;
+  }
+  return JSON.parse(new TextDecoder().decode(bytes)) as T;
+};
+
+// Load the slim article index and expand it into one Article per authorship.
+// Abstracts are left empty; see loadAbstract.
+export const loadArticleIndex = async (
+  url: string = ARTICLE_INDEX_URL
+): Promise<{ articles: Article[]; lastModified: string | null }> => {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Could not load ${url}: ${response.status}`);
+  }
+  const index = await readCompressedJson<ArticleIndex>(response);
+  const { articles, persons, authorships } = index;
+
+  const rows = authorships.article.map((a, i) => {
+    const p = authorships.person[i];
+    const goals = articles.goals[a];
+    return {
+      person_uuid: persons.person_uuid[p],
+      name: persons.name[p],
+      email: persons.email[p],
+      department: persons.department[p],
+      article_uuid: articles.article_uuid[a],
+      title: articles.title[a],
+      publication_year: articles.year[a],
+      doi: articles.doi[a],
+      abstract: "",
+      journal_title: articles.journal_title[a],
+      journal_issn: articles.journal_issn[a],
+      is_sustain: articles.is_sustain[a],
+      top_1: goals[0],
+      top_2: goals[1],
+      top_3: goals[2],
+      financial_times: String(articles.financial_times[a]),
+      ut_dallas: String(articles.ut_dallas[a]),
+      general_business: String(articles.general_business[a]),
+      active: persons.active[p],
+    };
+  });
+
+  return { articles: rows, lastModified: response.headers.get("last-modified") };
+};
+
+let abstracts: Promise<Record<string, string>> | null = null;
+
+// Fetch an article's abstract, loading the abstracts file on first use
+export const loadAbstract = async (articleUuid: string): Promise<string> => {
+  if (!abstracts) {
+    abstracts = fetch(ABSTRACTS_URL)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Could not load ${ABSTRACTS_URL}: ${response.status}`);
+        }
+        return readCompressedJson<Record<string, string>>(response);
+      })
+      .catch((error) => {
+        abstracts = null;
+        throw error;
+      });
+  }
+  return (await abstracts)[articleUuid] || "";
+};
@@ -128,6 +128,27 @@ export interface DashboardStats {
   goalMetrics?: GoalMetrics;
 }
 
+// The parts of DashboardStats the overview shows, available from the precomputed
+// aggregates before the article index is loaded
+export type OverviewStats = Pick<
+  DashboardStats,
+  | "totalArticles"
+  | "sustainableArticles"
+  | "uniqueArticles"
+  | "totalFaculty"
+  | "engagingFaculty"
+  | "totalDepartments"
+  | "avgArticlesPerFaculty"
+  | "avgSustainableArticlesPerFaculty"
+  | "sustainabilityRatio"
+  | "facultyEngagementRatio"
+  | "topJournalArticles"
+  | "sustainableTopJournalArticles"
+  | "avgTopJournalArticlesPerFaculty"
+  | "goalDistribution"
+  | "annualTrends"
+>;
+
 export interface FacultyContribution {
   person_uuid: string;
   name: string;